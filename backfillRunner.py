@@ -0,0 +1,111 @@
+"""장기간(STRT_DD~END_DD) 이론가 산출을 영업일 구간별로 나누어 병렬 실행
+  * 기간을 영업일 partition(DAYS_PER_PARTITION 영업일씩)으로 나누고 ProcessPoolExecutor 로 동시에 산출
+  * 각 프로세스는 자기 partition 의 기초정보를 조회, 산출하여 partition 별 Parquet 파일로 저장
+  * 모든 partition 이 끝나면 일자 순서대로 합쳐 최종 파일(writeOutput sink)로 저장
+  * 일자간에는 서로 의존하지 않으므로 결과는 calcTheoPrice_db 를 한 번에 실행한 것과 같음
+"""
+
+import functools
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import orcl
+import snapshotCache
+import writeOutput
+import calcTheoPrice_db
+
+STRT_DD = "20230102"
+END_DD = "20231228"
+DAYS_PER_PARTITION = 5              # partition 하나의 영업일수
+MAX_WORKERS = os.cpu_count()        # 동시에 실행하는 프로세스 수
+# 최종 파일 형식. 장기간 결과는 엑셀 시트 최대 행 수(writeOutput.XLSX_MAX_ROWS)를 넘으므로 xlsx 를 쓰지 않음
+RAWDATA_FORMAT = "parquet"
+RESULT_FORMAT = "parquet"
+
+env = "PD_CS_CCP"
+
+
+def make_partitions(biz_days, days_per_partition: int = DAYS_PER_PARTITION):
+    """ 정렬된 영업일 목록을 days_per_partition 영업일씩 [(시작일, 종료일), ...] 으로 나눔
+    """
+    biz_days = list(biz_days)
+    return [(biz_days[i], biz_days[min(i + days_per_partition, len(biz_days)) - 1])
+            for i in range(0, len(biz_days), days_per_partition)]
+
+
+def run_partition(pool_factory, cache_factory, strt_dd, end_dd, out_dir, use_pushdown=False):
+    """ (작업 프로세스) partition 하나의 이론가를 산출하여 out_dir 에 rawdata, result Parquet 파일로 저장
+    * pool_factory, cache_factory 는 프로세스 간에 넘길 수 있어야 함 (모듈 수준 함수 또는 functools.partial)
+
+    Return:
+        (rawdata 파일경로, result 파일경로). 산출 대상이 없으면 파일이 만들어지지 않음
+    """
+    raw_path = os.path.join(out_dir, f"rawdata_{strt_dd}_{end_dd}.parquet")
+    result_path = os.path.join(out_dir, f"result_{strt_dd}_{end_dd}.parquet")
+    cache = cache_factory() if cache_factory is not None else None
+    with writeOutput.ParquetSink(raw_path, dtypes=calcTheoPrice_db.COLUMN_DTYPES) as raw_sink, \
+            writeOutput.ParquetSink(result_path, dtypes=calcTheoPrice_db.RESULT_DTYPES) as result_sink:
+        calcTheoPrice_db.run_pipeline(pool_factory(), strt_dd, end_dd,
+                                      [(raw_sink, None), (result_sink, calcTheoPrice_db.make_result)],
+                                      cache=cache, use_pushdown=use_pushdown)
+    return raw_path, result_path
+
+
+def merge_partitions(paths, sink):
+    """ partition 파일(Parquet)을 순서대로 읽어 sink 에 이어서 씀 (없는 파일은 건너뜀)
+    """
+    for path in paths:
+        if os.path.exists(path):
+            sink.write(pd.read_parquet(path))
+
+
+def run_backfill(pool_factory, strt_dd, end_dd, raw_path, result_path, cache_factory=None,
+                 days_per_partition: int = DAYS_PER_PARTITION, max_workers: int = MAX_WORKERS, use_pushdown=False):
+    """ [strt_dd, end_dd] 기간을 영업일 partition 으로 나누어 병렬 산출한 뒤 raw_path, result_path 로 합쳐 저장
+    * 파일 형식은 확장자로 정함 (writeOutput.make_sink)
+
+    Return:
+        partition 목록 [(시작일, 종료일), ...]
+    """
+    cache = cache_factory() if cache_factory is not None else None
+    pool = pool_factory()
+    try:
+        custom_bd, _ = calcTheoPrice_db.load_calendar(pool, cache)
+    finally:
+        pool.close()
+    partitions = make_partitions(calcTheoPrice_db.make_biz_days(strt_dd, end_dd, custom_bd), days_per_partition)
+    if not partitions:
+        return partitions
+
+    # partition 파일은 최종 파일과 같은 디스크의 임시 폴더에 쓰고, 합친 뒤 지움
+    out_dir = tempfile.mkdtemp(prefix="backfill_", dir=os.path.dirname(os.path.abspath(result_path)))
+    try:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(partitions))) as executor:
+            futures = [executor.submit(run_partition, pool_factory, cache_factory, part_strt_dd, part_end_dd, out_dir, use_pushdown)
+                       for part_strt_dd, part_end_dd in partitions]
+            outputs = [future.result() for future in futures]
+
+        with writeOutput.make_sink(raw_path, dtypes=calcTheoPrice_db.COLUMN_DTYPES) as raw_sink:
+            merge_partitions([raw for raw, _ in outputs], raw_sink)
+        with writeOutput.make_sink(result_path, dtypes=calcTheoPrice_db.RESULT_DTYPES) as result_sink:
+            merge_partitions([result for _, result in outputs], result_sink)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+    return partitions
+
+
+if __name__ == "__main__":
+    if (END_DD < STRT_DD):
+        print("Date error : END_DD should be equal or greater than STRT_DD")
+        exit()
+
+    pool_factory = functools.partial(orcl.RDB_pool, env)
+    use_cache = calcTheoPrice_db.USE_SNAPSHOT_CACHE and not calcTheoPrice_db.USE_PUSHDOWN_QUERY
+    cache_factory = functools.partial(snapshotCache.SnapshotCache, env) if use_cache else None
+
+    run_backfill(pool_factory, STRT_DD, END_DD,
+                 f"rawdata_theoPrcFromCSDB_{env}_{STRT_DD}_{END_DD}.{RAWDATA_FORMAT}",
+                 f"result_theoPrcFromCSDB_{env}_{STRT_DD}_{END_DD}.{RESULT_FORMAT}",
+                 cache_factory=cache_factory, use_pushdown=calcTheoPrice_db.USE_PUSHDOWN_QUERY)
@@ -0,0 +1,398 @@
+"""이론가 산출 벤치마크 (오라클 없이 syntheticData 의 SQLite 대체 DB 로 실행)
+  * scale(1배, 10배, 100배)별 가상 시장에 대해 단계별 소요시간 측정
+    - generate : 가상 데이터 생성 및 SQLite 저장
+    - fetch : 테이블별 조회(load_source_tables), fetch_pushdown : 조인까지 DB 에서 처리한 조회(load_input_set)
+    - merge : 기초정보 조인(build_raw_data)
+    - classify : 산출방법 규칙(howCalcTheo_batch) (배당가치 선택은 merge 에 포함)
+    - remain_dys_next : 다음 영업일 잔존일수(calc_remain_dys_next_day_batch). 문자열 키로 따로 찾은 값과 다르면 mismatches 에 기록
+    - price : 일자별 이론가 산출(calucTheoPriceFromDF_batch). 가상 데이터의 기준 종목(syntheticData.reference_isu_cds)을 종목별 calcTheoPrice 로
+      따로 산출한 값과의 최대 차이(max_abs_diff), DB 이론가와의 최대 차이(max_db_diff)를 기록하고 허용오차를 넘으면 mismatches 에 기록
+    - formula : 별표별 calcTheoPrice.calcTheoPrice(종목별 호출), formula_batch : 별표별 calcTheoPrice_batch
+    - implied_volt : 옵션 일부 행(--sample-rows)을 FINAL_VOLT 로 산출한 가격에서 내재변동성 역산(impliedVolt_batch).
+      FINAL_VOLT 를 되찾지 못하거나 역산한 변동성으로 다시 산출한 가격이 다르면 mismatches 에 기록
+    - export : 파일 형식별 저장(writeOutput sink)
+  * 종목별 호출은 오래 걸리므로 일부 행(--sample-rows)만 측정하여 행당 시간으로 비교
+  * 결과는 results 폴더에 JSON 으로 저장하고, 기준 결과(baseline.json)보다 느려진 단계(--tolerance 초과)나
+    결과가 틀린 단계(mismatches)가 있으면 종료코드 1
+
+  사용법:
+    python benchmarks/runBenchmarks.py --scales 1 10 100
+    python benchmarks/runBenchmarks.py --scales 1 --save-baseline
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+import syntheticData          # 저장소 최상위 경로를 sys.path 에 추가하므로 먼저 import
+import calcTheoPrice
+import calcTheoPrice_db
+import impliedVolt
+import writeOutput
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+BASELINE_FILE = "baseline.json"
+
+SCALES = [1, 10, 100]
+REPEAT = 3                  # 단계별 반복 횟수 (가장 짧은 시간을 사용)
+SAMPLE_ROWS = 2000          # 종목별 호출, 내재변동성 역산을 측정하는 행 수
+TOLERANCE = 0.25            # 기준 결과보다 이 비율 이상 느려지면 성능저하로 봄
+MIN_SECONDS = 0.05          # 이보다 짧은 단계는 측정오차가 커서 성능저하 판정에서 제외
+EXPORT_FORMATS = ["parquet", "csv", "xlsx"]
+PRICE_TOL = 1e-8            # 종목별 calcTheoPrice 로 산출한 기준 이론가와의 허용오차
+DB_PRICE_TOL = 0.005 + 1e-9 # 기준 종목의 DB 이론가(기준 이론가를 소수점 2자리로 반올림)와의 허용오차
+IMPL_VOLT_TOL = 1e-6        # 역산한 변동성과 FINAL_VOLT 의 허용오차
+IMPL_PRC_TOL = 1e-6         # 역산한 변동성으로 다시 산출한 가격의 허용오차
+IMPL_VOLT_MIN_VEGA = 0.01   # vega 가 이보다 작으면 가격으로 변동성을 구분할 수 없으므로 변동성 오차는 보지 않고 가격 오차만 봄
+
+
+def _timeit(func, repeat: int = REPEAT):
+    """ func() 을 repeat 번 실행
+
+    Return:
+        마지막 실행결과, 실행시간(초) 목록
+    """
+    seconds = []
+    result = None
+    for _ in range(max(repeat, 1)):
+        result = None
+        strt = time.perf_counter()
+        result = func()
+        seconds.append(time.perf_counter() - strt)
+    return result, seconds
+
+
+class BenchRecorder:
+
+    def __init__(self, repeat: int = REPEAT):
+        """ 단계별 측정결과 기록
+        """
+        self.repeat = repeat
+        self.records = []
+
+    def measure(self, scale, stage, func, rows, case="", repeat=None):
+        """ func() 의 실행시간을 측정하여 기록하고 실행결과를 돌려줌
+        * rows : 처리한 행 수 (행당 시간 산출용). 실행 후에 알 수 있으면(조회, 조인 등) 실행결과로 행 수를 구하는 함수
+        """
+        result, seconds = _timeit(func, self.repeat if repeat is None else repeat)
+        best = min(seconds)
+        if callable(rows):
+            rows = rows(result)
+        self.records.append({
+            'scale': scale, 'stage': stage, 'case': case, 'rows': int(rows),
+            'seconds': best, 'median_seconds': statistics.median(seconds), 'repeat': len(seconds),
+            'us_per_row': best / rows * 1e6 if rows else None,
+        })
+        print(f"  {scale:>4}x {stage:<15} {case:<28} rows={rows:>9,} {best:10.4f}s", flush=True)
+        return result
+
+    def skip(self, scale, stage, case, reason):
+        """ 측정하지 않은 단계 기록"""
+        self.records.append({'scale': scale, 'stage': stage, 'case': case, 'skipped': reason})
+        print(f"  {scale:>4}x {stage:<15} {case:<28} skipped : {reason}", flush=True)
+
+
+def _formula_inputs(rawData):
+    """ rawData 의 calcTheoPrice 입력 컬럼 (calcTheoPrice 인자 순서)"""
+    floats = [calcTheoPrice._asFloatArray(rawData[col]) for col in
+              ('ULY_PRC', 'EXER_PRC', 'REMAIN_DYS', 'DOM_RISKFRE_INT', 'FORN_RISKFRE_INT', 'DIV_VAL', 'FINAL_VOLT')]
+    codes = [np.asarray(rawData[col], dtype=object) for col in ('RGHT_TP_CD', 'HOW_CALC_CD')]
+    extra = [calcTheoPrice._asFloatArray(rawData[col]) for col in ('STDGOOD_BND_EXP', 'BND_YD', 'STORG_COST')]
+    return floats + codes + extra
+
+
+def _rfr_inputs(rawData):
+    """ rawData 의 calcTheoPriceRFR 입력 컬럼"""
+    return [rawData[col].to_numpy(dtype=object) for col in
+            ('LSTTRD_DD', 'APPL_STRT_DD', 'APPL_END_DD', 'FINAL_YN', 'FINAL_INT', 'MM3_GOVBND_STRIP_INT', 'FWD_INT', 'INT_SPD', 'DD')]
+
+
+def reference_price(rows):
+    """ 종목별 calcTheoPrice/calcTheoPriceRFR 로 산출한 이론가 (calcTheoPrice_batch 와 별개로 산출한 검증 기준)"""
+    is_rfr = (rows['HOW_CALC_CD'] == "별표9의2").to_numpy()
+    prc = np.full(len(rows), np.nan)
+    prc[~is_rfr] = [calcTheoPrice.calcTheoPrice(*row) for row in zip(*[a.tolist() for a in _formula_inputs(rows[~is_rfr])])]
+    prc[is_rfr] = [calcTheoPrice.calcTheoPriceRFR(*row) for row in zip(*_rfr_inputs(rows[is_rfr]))]
+    return prc
+
+
+def check_reference(recorder, days, reference):
+    """ 기준 종목 행의 이론가를 종목별 공식으로 산출한 기준 이론가, DB 이론가와 비교하여 마지막 기록(price)에 추가
+    """
+    rows = pd.concat([day[day['ISU_CD'].isin(reference)] for day in days], ignore_index=True)
+    diff = np.abs(calcTheoPrice._asFloatArray(rows['THEO_PRC']) - reference_price(rows))
+    db_diff = np.abs(calcTheoPrice._asFloatArray(rows['THEO_PRC_DIFF_DB_AND_PYTHON']))
+    recorder.records[-1]['reference_rows'] = len(rows)
+    recorder.records[-1]['mismatches'] = int((~(diff <= PRICE_TOL) | ~(db_diff <= DB_PRICE_TOL)).sum())
+    recorder.records[-1]['max_abs_diff'] = float(np.nanmax(diff, initial=0.0))
+    recorder.records[-1]['max_db_diff'] = float(np.nanmax(db_diff, initial=0.0))
+
+
+def expected_remain_dys_next_day(rawData):
+    """ 다음 영업일의 같은 종목 REMAIN_DYS (종목이 없으면 0, 값이 비어 있으면 NaN). calc_remain_dys_next_day_batch 검증용으로, 키를 문자열로 바꾸어 따로 찾음
+    * rawData 는 [시작일, 종료일] 의 모든 영업일을 포함하므로 rawData 안의 다음 일자가 다음 영업일
+    """
+    keys = pd.DataFrame({'ISU_CD': rawData['ISU_CD'].astype(str).to_numpy(), 'DD': rawData['DD'].astype(str).to_numpy(),
+                         'REMAIN_DYS': calcTheoPrice._asFloatArray(rawData['REMAIN_DYS'])})
+    days = sorted(keys['DD'].unique())
+    keys['NEXT_DD'] = keys['DD'].map(dict(zip(days[:-1], days[1:])))
+    next_day = keys.drop_duplicates(['ISU_CD', 'DD'])[['ISU_CD', 'DD', 'REMAIN_DYS']].rename(columns={'DD': 'NEXT_DD', 'REMAIN_DYS': 'EXPECTED'})
+    merged = keys.merge(next_day, on=['ISU_CD', 'NEXT_DD'], how='left', indicator=True)
+    return np.where(merged['_merge'] == 'both', merged['EXPECTED'], 0.0)
+
+
+def _option_inputs(options):
+    """ 옵션 행의 impliedVolt_batch 입력 (target_prc 제외)"""
+    floats = [calcTheoPrice._asFloatArray(options[col]) for col in
+              ('ULY_PRC', 'EXER_PRC', 'REMAIN_DYS', 'DOM_RISKFRE_INT', 'FORN_RISKFRE_INT', 'DIV_VAL')]
+    return floats + [options['RGHT_TP_CD'].to_numpy(dtype=object), options['HOW_CALC_CD'].to_numpy(dtype=object)]
+
+
+def option_model_price(options, volt):
+    """ 옵션 행을 변동성 volt 로 산출한 가격 (별표15/16 : calcTheoPrice_binomial_batch, 별표17 : calcTheoPrice_bs_batch)"""
+    uly_prc, exer_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, div_val, rght_tp_cd, how_calc_cd = _option_inputs(options)
+    is_tree = np.isin(how_calc_cd, ["별표15", "별표16"])
+    prc = np.full(len(options), np.nan)
+    prc[is_tree] = calcTheoPrice.calcTheoPrice_binomial_batch(uly_prc[is_tree], exer_prc[is_tree], remain_dys[is_tree], dom_riskfre_int[is_tree],
+                                                              div_val[is_tree], volt[is_tree], rght_tp_cd[is_tree])
+    prc[~is_tree] = calcTheoPrice.calcTheoPrice_bs_batch(uly_prc[~is_tree], exer_prc[~is_tree], remain_dys[~is_tree], dom_riskfre_int[~is_tree],
+                                                         forn_riskfre_int[~is_tree], volt[~is_tree], rght_tp_cd[~is_tree])
+    return prc
+
+
+def bench_implied_volt(recorder, scale, rawData, sample_rows):
+    """ 옵션(별표15/16/17) 일부 행의 내재변동성 역산 시간과 round-trip 검증
+    * FINAL_VOLT 로 산출한 가격을 초기값 없이(VOLT_INIT) 역산하여 FINAL_VOLT 를 되찾는지 확인
+    """
+    options = rawData[rawData['HOW_CALC_CD'].isin(["별표15", "별표16", "별표17"]) & rawData['RGHT_TP_CD'].isin(['C', 'P'])
+                      & (rawData['SPD_COMPST_CD'] == ' ') & rawData['FINAL_VOLT'].notna()].iloc[:sample_rows]
+    if len(options) == 0:
+        recorder.skip(scale, "implied_volt", "", "no options")
+        return
+    final_volt = calcTheoPrice._asFloatArray(options['FINAL_VOLT'])
+    target_prc = option_model_price(options, final_volt)
+    inputs = _option_inputs(options)
+    volt, converged = recorder.measure(scale, "implied_volt", lambda: impliedVolt.impliedVolt_batch(target_prc, *inputs), len(options), repeat=1)
+
+    uly_prc, exer_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, div_val, _, how_calc_cd = inputs
+    is_tree = np.isin(how_calc_cd, ["별표15", "별표16"])
+    vega = np.empty(len(options))
+    for tree in (True, False):
+        rows = is_tree == tree
+        vega[rows] = impliedVolt._vega(tree, uly_prc[rows], exer_prc[rows], remain_dys[rows], dom_riskfre_int[rows], forn_riskfre_int[rows],
+                                       div_val[rows], final_volt[rows])
+    volt_diff = np.abs(volt - final_volt)
+    prc_diff = np.abs(option_model_price(options, volt) - target_prc)
+    bad = ~converged | ((vega >= IMPL_VOLT_MIN_VEGA) & ~(volt_diff <= IMPL_VOLT_TOL)) | ~(prc_diff <= IMPL_PRC_TOL)
+    recorder.records[-1]['mismatches'] = int(bad.sum())
+    # 역산하지 못한 행(NaN)은 mismatches 에만 셈
+    recorder.records[-1]['max_volt_diff'] = float(np.max(np.where((vega >= IMPL_VOLT_MIN_VEGA) & converged, volt_diff, 0.0)))
+    recorder.records[-1]['max_prc_diff'] = float(np.max(np.where(converged, prc_diff, 0.0)))
+
+
+def bench_formulas(recorder, scale, rawData, sample_rows):
+    """ 별표별 종목별 호출(calcTheoPrice.calcTheoPrice)과 배열 호출(calcTheoPrice_batch) 시간
+    """
+    rawData = rawData[rawData['SPD_COMPST_CD'] == ' ']
+    for how_calc_cd, rows in rawData.groupby('HOW_CALC_CD', observed=True, sort=True):
+        if how_calc_cd in ("", "이론가 산출대상 상품 아님"):
+            continue
+        sample = rows.iloc[:sample_rows]
+        if how_calc_cd == "별표9의2":
+            args = _rfr_inputs(rows)
+            sample_args = list(zip(*_rfr_inputs(sample)))
+            recorder.measure(scale, "formula", lambda: [calcTheoPrice.calcTheoPriceRFR(*row) for row in sample_args], len(sample), how_calc_cd)
+            recorder.measure(scale, "formula_batch", lambda: calcTheoPrice.calcTheoPriceRFR_batch(*args), len(rows), how_calc_cd)
+        else:
+            args = _formula_inputs(rows)
+            sample_args = list(zip(*[a.tolist() for a in _formula_inputs(sample)]))
+            recorder.measure(scale, "formula", lambda: [calcTheoPrice.calcTheoPrice(*row) for row in sample_args], len(sample), how_calc_cd)
+            recorder.measure(scale, "formula_batch", lambda: calcTheoPrice.calcTheoPrice_batch(*args), len(rows), how_calc_cd)
+
+
+def bench_export(recorder, scale, days, formats, work_dir):
+    """ 파일 형식별로 일자별 rawData 와 결과(make_result)를 각각 sink 에 쓰는 시간 (이론가는 미리 산출)
+    """
+    rows = sum(len(day) for day in days)
+    for fmt in formats:
+        for name, transform, dtypes in (("rawdata", None, calcTheoPrice_db.COLUMN_DTYPES), ("result", calcTheoPrice_db.make_result, calcTheoPrice_db.RESULT_DTYPES)):
+            case = f"{name}.{fmt}"
+            if fmt == "xlsx" and rows > writeOutput.XLSX_MAX_ROWS:
+                recorder.skip(scale, "export", case, f"{rows:,} rows exceed the xlsx sheet limit")
+                continue
+
+            def export():
+                with writeOutput.make_sink(os.path.join(work_dir, f"{name}_{scale}x.{fmt}"), dtypes=dtypes) as sink:
+                    for day in days:
+                        sink.write(day if transform is None else transform(day))
+
+            recorder.measure(scale, "export", export, rows, case, repeat=1)
+
+
+def bench_scale(recorder, scale, strt_dd, end_dd, work_dir, formats=EXPORT_FORMATS, sample_rows=SAMPLE_ROWS, seed=syntheticData.SEED,
+                reuse_db=False, pushdown=True):
+    """ scale 배 가상 시장의 단계별 벤치마크
+    """
+    db_path = os.path.join(work_dir, f"krx_{scale}x_{strt_dd}_{end_dd}_{seed}.db")
+    if reuse_db and os.path.exists(db_path):
+        recorder.skip(scale, "generate", "", f"reused {db_path}")
+    else:
+        recorder.measure(scale, "generate", lambda: syntheticData.make_local_db(db_path, scale, strt_dd, end_dd, seed),
+                         lambda table_rows: sum(table_rows.values()), repeat=1)
+
+    pool = syntheticData.local_pool(db_path)
+    try:
+        # 조인 결과는 행 수만 남기고 버림 (테이블별 조회결과와 동시에 메모리에 두지 않도록 먼저 실행)
+        if pushdown:
+            recorder.measure(scale, "fetch_pushdown", lambda: len(calcTheoPrice_db.load_input_set(pool, strt_dd, end_dd)), lambda rows: rows)
+        custom_bd, tables = recorder.measure(scale, "fetch", lambda: calcTheoPrice_db.load_source_tables(pool, strt_dd, end_dd),
+                                             lambda result: sum(len(table) for table in result[1].values()))
+    finally:
+        pool.close()
+
+    rawData = recorder.measure(scale, "merge", lambda: calcTheoPrice_db.build_raw_data(tables, custom_bd, strt_dd, end_dd), len)
+    rows = len(rawData)
+    del tables
+
+    recorder.measure(scale, "classify", lambda: calcTheoPrice_db.howCalcTheo_batch(rawData), rows)
+
+    next_remain_dys = recorder.measure(scale, "remain_dys_next", lambda: calcTheoPrice_db.calc_remain_dys_next_day_batch(rawData, rawData, custom_bd), rows)
+    expected = expected_remain_dys_next_day(rawData)
+    recorder.records[-1]['mismatches'] = int((~np.isclose(next_remain_dys.to_numpy(dtype=float), expected, equal_nan=True)).sum())
+    recorder.records[-1]['found'] = int(np.count_nonzero(expected))
+
+    days = recorder.measure(scale, "price", lambda: [calcTheoPrice_db.calucTheoPriceFromDF_batch(day).reset_index(drop=True)
+                                                     for _, day in rawData.groupby('DD', sort=True)], rows)
+    check_reference(recorder, days, syntheticData.reference_isu_cds(syntheticData.make_instruments(scale, strt_dd, seed)))
+
+    bench_formulas(recorder, scale, rawData, sample_rows)
+    bench_implied_volt(recorder, scale, rawData, sample_rows)
+    del rawData
+    bench_export(recorder, scale, days, formats, work_dir)
+
+
+def _git_commit():
+    """ 현재 git commit (git 이 없으면 None)"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_info(args):
+    """ 실행환경 정보"""
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'strt_dd': args.strt_dd,
+        'end_dd': args.end_dd,
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'sample_rows': args.sample_rows,
+    }
+
+
+def _key(record):
+    return (record['scale'], record['stage'], record['case'])
+
+
+def compare(records, baseline_records, tolerance: float = TOLERANCE, min_seconds: float = MIN_SECONDS):
+    """ 기준 결과와 단계별 소요시간(행 수가 다르면 행당 시간) 비교
+
+    Return:
+        단계별 비교 DataFrame (REGRESSION : 기준보다 tolerance 이상 느려짐)
+    """
+    baseline = {_key(record): record for record in baseline_records if 'seconds' in record}
+    rows = []
+    for record in records:
+        base = baseline.get(_key(record))
+        if 'seconds' not in record or base is None:
+            continue
+        if record['rows'] == base['rows'] or not record['rows'] or not base['rows']:
+            ratio = record['seconds'] / base['seconds'] if base['seconds'] else np.nan
+        else:
+            ratio = record['us_per_row'] / base['us_per_row'] if base['us_per_row'] else np.nan
+        rows.append({'scale': record['scale'], 'stage': record['stage'], 'case': record['case'],
+                     'baseline_seconds': base['seconds'], 'seconds': record['seconds'], 'ratio': ratio,
+                     'REGRESSION': bool(ratio > 1 + tolerance and max(record['seconds'], base['seconds']) >= min_seconds)})
+    return pd.DataFrame(rows, columns=['scale', 'stage', 'case', 'baseline_seconds', 'seconds', 'ratio', 'REGRESSION'])
+
+
+def save_report(report, results_dir, name):
+    """ 결과를 results_dir/name 에 JSON 으로 저장"""
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, name)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    return path
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="이론가 산출 벤치마크 (SQLite 가상 시장)")
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES, help="가상 시장 규모 (1배 = 하루 약 1만 6천 종목)")
+    parser.add_argument("--strt-dd", default=syntheticData.STRT_DD)
+    parser.add_argument("--end-dd", default=syntheticData.END_DD)
+    parser.add_argument("--seed", type=int, default=syntheticData.SEED)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--sample-rows", type=int, default=SAMPLE_ROWS, help="종목별 호출, 내재변동성 역산 측정 행 수")
+    parser.add_argument("--formats", nargs="+", default=EXPORT_FORMATS, choices=EXPORT_FORMATS)
+    parser.add_argument("--no-pushdown", action="store_true", help="fetch_pushdown 단계 생략")
+    parser.add_argument("--work-dir", default=None, help="SQLite 파일과 출력파일 경로 (없으면 임시 폴더)")
+    parser.add_argument("--reuse-db", action="store_true", help="work-dir 에 같은 조건의 SQLite 파일이 있으면 다시 만들지 않음")
+    parser.add_argument("--results-dir", default=RESULTS_DIR)
+    parser.add_argument("--baseline", default=None, help=f"비교할 기준 결과 (기본 : results-dir/{BASELINE_FILE})")
+    parser.add_argument("--save-baseline", action="store_true", help=f"이번 결과를 results-dir/{BASELINE_FILE} 로도 저장")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    recorder = BenchRecorder(args.repeat)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        work_dir = args.work_dir or tmp_dir
+        os.makedirs(work_dir, exist_ok=True)
+        for scale in args.scales:
+            print(f"[scale {scale}x]", flush=True)
+            bench_scale(recorder, scale, args.strt_dd, args.end_dd, work_dir, args.formats, args.sample_rows, args.seed,
+                        args.reuse_db, not args.no_pushdown)
+
+    report = {'run': run_info(args), 'results': recorder.records}
+    path = save_report(report, args.results_dir, f"bench_{datetime.datetime.now():%Y%m%d_%H%M%S}.json")
+    print(f"saved : {path}")
+
+    baseline_path = args.baseline or os.path.join(args.results_dir, BASELINE_FILE)
+    regressions = 0
+    if os.path.exists(baseline_path):
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+        result = compare(recorder.records, baseline['results'], args.tolerance)
+        if len(result):
+            print(f"compared with {baseline_path} ({baseline['run'].get('git_commit')})")
+            print(result.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+        regressions = int(result['REGRESSION'].sum())
+    mismatches = [record for record in recorder.records if record.get('mismatches')]
+    for record in mismatches:
+        print(f"MISMATCH {record['scale']}x {record['stage']} : {record['mismatches']:,} rows differ from the expected result")
+    if args.save_baseline:
+        print(f"baseline : {save_report(report, args.results_dir, BASELINE_FILE)}")
+    return 1 if regressions or mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
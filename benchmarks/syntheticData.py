@@ -0,0 +1,324 @@
+"""벤치마크용 가상 시장 데이터와 오라클 테이블 대체 DB(SQLite)
+  * KRX 파생상품 시장과 비슷한 구성의 종목(코스피200 옵션, 주식선물/옵션, 국채선물, 통화선물/옵션, 금선물, RFR 선물 등)을
+    scale 배(기초자산 수를 scale 배로 복제)로 생성
+  * 조회 SQL(loadData.TABLE_SQL, loadData.make_input_set_query)이 읽는 테이블/컬럼과 같은 형태로 만들어 SQLite 파일로 저장하므로
+    오라클 없이 calcTheoPrice_db 의 조회부터 파일 저장까지 그대로 실행 가능
+  * 같은 (scale, 기간, seed) 이면 항상 같은 데이터
+"""
+
+import datetime
+import functools
+import os
+import sqlite3
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orcl
+import bizCalendar
+import calcTheoPrice
+
+STRT_DD = "20231204"
+END_DD = "20231205"
+SEED = 20231204
+REFERENCE_ISU_COUNT = 200       # 별표별로 DB 이론가를 종목별 calcTheoPrice 로 산출하는 종목 수 (벤치마크의 검증 기준)
+
+# 휴장일(TBCS_HOLDY)
+HOLIDAYS = ['20231003', '20231009', '20231225', '20231229', '20240101', '20240209', '20240212', '20240301', '20240410',
+            '20240501', '20240506', '20240515', '20240606', '20240815', '20240916', '20240917', '20240918', '20241003',
+            '20241009', '20241225', '20241231']
+
+DOM_RISKFRE_INT = 0.0384        # 국내무위험금리
+DVAL_COLS = ['FSETLPRC_DIV_PRSNT_VAL', 'FSETLPRC_DIV_FUT_VAL', 'FBASPRC_DIV_PRSNT_VAL', 'FBASPRC_DIV_FUT_VAL',
+             'AFADJ_DIV_PRSNT_VAL', 'AFADJ_DIV_FUT_VAL', 'AFEXDIV_DIV_PRSNT_VAL', 'AFEXDIV_DIV_FUT_VAL']
+
+# 테이블별 인덱스 (오라클 테이블의 PK/일자 인덱스에 해당하는 복합 인덱스)
+TABLE_INDEXES = {
+    'TBCS_DRV_ISU': ['END_DD', 'STRT_DD'],
+    'TBCS_ULY': ['END_DD', 'STRT_DD'],
+    'TBCS_STORG_COST': ['DD', 'ULY_ID'],
+    'TBCS_THEO_PRC_VAR': ['CALC_DD', 'ISU_CD'],
+    'TBCS_VOLT': ['DD', 'ISU_CD'],
+    'TBCS_BYDD_DRV_ISU': ['DD', 'ISU_CD'],
+    'TBCS_DVAL': ['DD', 'PROD_ID', 'EXPMM'],
+    'TBCS_THEO_PRC_RFR_FUT': ['DD', 'ISU_CD'],
+    'TBCS_THEO_PRC': ['DD', 'ISU_CD'],
+}
+
+# 종목정보(TBCS_DRV_ISU) 컬럼
+ISU_COLS = ['STRT_DD', 'END_DD', 'ISU_CD', 'ISU_KOR_NM', 'PROD_ID', 'ULY_ID', 'FORPRC_ULY_ID', 'SPD_COMPST_CD', 'ULY_TP_CD',
+            'RGHT_TP_CD', 'EXER_PRC', 'EXP_DD', 'MKT_DTL_ID']
+
+_STOCKS = [f"S{i:03d}" for i in range(200)]
+
+# 상품군 (1배 기준 하루 약 1만 6천 종목)
+# * uly_ids : 기초자산ID 목록. scale 배이면 '_1', '_2', ... 를 붙여 복제
+# * fixed_forprc : 가격용기초자산ID 를 복제 전 기초자산ID 로 고정 (산출방법이 가격용기초자산ID 로 정해지는 상품)
+# * months : 결제월 (시작일 기준 몇 개월 후), strikes : 결제월별 행사가격 수 (0 이면 선물)
+# * uly_prc, forn_int, bnd_exp : 스칼라 또는 기초자산별 목록, uly_prc_disp : 기초자산간 가격 분산(로그)
+# * div_yield : 연 배당수익률 (TBCS_DVAL), spreads : 최근월-원월 스프레드 종목 생성 여부
+PRODUCT_FAMILIES = [
+    dict(name="코스피200옵션", how_calc_cd="별표15", mkt='SPI', uly_tp='IDX', rghts=('C', 'P'), uly_ids=['K2I', 'MKI', 'WKI', 'WKM', 'KQI'],
+         months=range(7), strikes=40, strike_step=0.0075, uly_prc=336.0, uly_prc_disp=0.5, volt=0.19, div_yield=0.013),
+    dict(name="주식옵션", how_calc_cd="별표16", mkt='EQU', uly_tp='EQU', rghts=('C', 'P'), uly_ids=_STOCKS[:47],
+         months=[0, 1, 2, 3, 6, 9], strikes=16, strike_step=0.025, uly_prc=72600.0, uly_prc_disp=2.0, volt=0.36, div_yield=0.02),
+    dict(name="주식선물", how_calc_cd="별표8", mkt='EQU', uly_tp='EQU', rghts=('F',), uly_ids=_STOCKS,
+         months=[0, 1, 2, 3, 6, 9, 12, 18, 24], uly_prc=50800.0, uly_prc_disp=2.0, div_yield=0.02, spreads=True),
+    dict(name="지수선물", how_calc_cd="별표7", mkt='SPI', uly_tp='IDX', rghts=('F',), uly_ids=['K2I', 'MKI', 'KQI'] + [f"X{i:02d}" for i in range(14)],
+         months=[0, 3, 6, 9, 12, 18], uly_prc=910.0, uly_prc_disp=1.0, div_yield=0.013, spreads=True),
+    dict(name="국채선물", how_calc_cd="별표9", mkt='BND', uly_tp='BON', rghts=('F',), uly_ids=['KTB3', 'KTB5', 'KT10', 'KT30'],
+         months=[0, 3, 6], uly_prc=0.0, bnd_exp=[3, 5, 10, 30], bnd_yd=0.0357),
+    dict(name="3개월무위험지표금리선물", how_calc_cd="별표9의2", mkt='BND', uly_tp='IRT', rghts=('F',), uly_ids=['KOF'],
+         months=range(0, 33, 3)),
+    dict(name="통화선물", how_calc_cd="별표12", mkt='CUR', uly_tp='CUR', rghts=('F',), uly_ids=['USD', 'JPY', 'EUR', 'CNH'],
+         months=range(20), uly_prc=[1304.0, 885.0, 1408.0, 180.5], forn_int=[0.0535, -0.0005, 0.0390, 0.0250]),
+    dict(name="미국달러옵션", how_calc_cd="별표17", mkt='CUR', uly_tp='CUR', rghts=('C', 'P'), uly_ids=['USD'], fixed_forprc=True,
+         months=[0, 1, 2, 3], strikes=20, strike_step=0.01, uly_prc=1304.0, forn_int=0.0535, volt=0.085),
+    dict(name="금선물", how_calc_cd="별표13", mkt='COM', uly_tp='COM', rghts=('F',), uly_ids=['KGD'], fixed_forprc=True,
+         months=[0, 2, 4, 6, 8, 10, 12], uly_prc=87300.0, storg_cost=4.5),
+    dict(name="산출대상아닌선물", how_calc_cd="이론가 산출대상 상품 아님", mkt='SPI', uly_tp='IDX', rghts=('F',),
+         uly_ids=['VKI', 'XA4', 'XA5', 'EST'], fixed_forprc=True, months=range(12)),
+]
+
+
+def _uniform(keys, seed):
+    """ key(문자열 배열)별로 정해지는 [0, 1) 난수 (같은 key 는 같은 값)"""
+    hashed = pd.util.hash_array(np.asarray(keys, dtype=object), hash_key=f"{seed:016d}"[:16])
+    return (hashed >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+def _perUly(value, uly_count, replicas):
+    """ 상품군의 스칼라 또는 기초자산별 목록 값을 복제된 기초자산 순서의 배열로"""
+    value = np.broadcast_to(np.asarray(value, dtype=np.float64), (uly_count,))
+    return np.tile(value, replicas)
+
+
+def _expiry(strt_dd, months):
+    """ 결제월(시작일 기준 몇 개월 후)별 만기일 : 해당 월 두 번째 목요일 (시작일이 그 달 만기일 이후이면 다음 달부터)"""
+    strt = datetime.datetime.strptime(strt_dd, "%Y%m%d").date()
+
+    def second_thursday(offset):
+        y, m = divmod(strt.month - 1 + offset, 12)
+        first = datetime.date(strt.year + y, m + 1, 1)
+        return first + datetime.timedelta(days=(3 - first.weekday()) % 7 + 7)
+
+    shift = 1 if second_thursday(0) < strt else 0
+    return [second_thursday(month + shift).strftime("%Y%m%d") for month in months]
+
+
+def make_instruments(scale: int = 1, strt_dd: str = STRT_DD, seed: int = SEED):
+    """ 종목 기준정보 (TBCS_DRV_ISU 컬럼 + 벤치마크용 컬럼)
+    * 벤치마크용 컬럼 : FAMILY(상품군), HOW_CALC_CD(상품군의 산출방법), BASE_PRC(기초자산 기준가격), DIV_YIELD, FORN_RISKFRE_INT, STDGOOD_BND_EXP, BND_YD, STORG_COST, VOLT
+    """
+    frames = []
+    for fam_no, family in enumerate(PRODUCT_FAMILIES):
+        base_ids = list(family['uly_ids'])
+        uly_ids = np.array([uly if r == 0 else f"{uly}_{r}" for r in range(scale) for uly in base_ids], dtype=object)
+        forprc_ids = np.tile(np.array(base_ids, dtype=object), scale) if family.get('fixed_forprc') else uly_ids
+        n_uly = len(uly_ids)
+        base_prc = _perUly(family.get('uly_prc', np.nan), len(base_ids), scale)
+        base_prc = base_prc * np.exp(family.get('uly_prc_disp', 0.0) * (_uniform(uly_ids, seed) - 0.5))
+        months = list(family['months'])
+        exp_dd = np.array(_expiry(strt_dd, months), dtype=object)
+        rghts = family['rghts']
+        strikes = family.get('strikes', 0) if rghts != ('F',) else 0
+
+        # (기초자산, 결제월, 행사가격, 권리유형) 조합
+        n_strike = max(strikes, 1)
+        uly_idx, month_idx, strike_idx, rght_idx = [a.ravel() for a in np.meshgrid(
+            np.arange(n_uly), np.arange(len(months)), np.arange(n_strike), np.arange(len(rghts)), indexing='ij')]
+        spd = np.full(len(uly_idx), ' ', dtype=object)
+        if family.get('spreads'):
+            # 최근월 - 원월 스프레드
+            s_uly, s_month = [a.ravel() for a in np.meshgrid(np.arange(n_uly), np.arange(1, len(months)), indexing='ij')]
+            uly_idx = np.concatenate([uly_idx, s_uly])
+            month_idx = np.concatenate([month_idx, s_month])
+            strike_idx = np.concatenate([strike_idx, np.zeros(len(s_uly), dtype=int)])
+            rght_idx = np.concatenate([rght_idx, np.zeros(len(s_uly), dtype=int)])
+            spd = np.concatenate([spd, np.full(len(s_uly), '1', dtype=object)])
+        n = len(uly_idx)
+
+        prc = base_prc[uly_idx]
+        if strikes:
+            moneyness = 1 + family['strike_step'] * (strike_idx - (strikes - 1) / 2)
+            digits = 2 - np.floor(np.log10(prc)).astype(int)            # 유효숫자 3자리
+            exer_prc = np.array([round(x, d) for x, d in zip(prc * moneyness, digits)])
+        else:
+            exer_prc = np.zeros(n)
+        rght = np.asarray(rghts, dtype=object)[rght_idx]
+        is_option = rght != 'F'
+        isu_cd = pd.Index([f"KR4{fam_no:02d}{i:07d}" for i in range(n)], dtype=object)
+        name = pd.Series(uly_ids[uly_idx]) + " " + pd.Series(rght) + " " + pd.Series(exp_dd[month_idx]).str[:6]
+        name = name.where(~is_option, name + " " + pd.Series(exer_prc).map("{:g}".format))
+        name = name.where(spd == ' ', name + " SP")
+
+        frames.append(pd.DataFrame({
+            'STRT_DD': "20230101",
+            'END_DD': "20991231",
+            'ISU_CD': isu_cd,
+            'ISU_KOR_NM': family['name'] + " " + name.to_numpy(dtype=object),
+            'PROD_ID': np.where(is_option, "KRDRVOP", "KRDRVFU") + forprc_ids[uly_idx].astype(str),
+            'ULY_ID': uly_ids[uly_idx],
+            'FORPRC_ULY_ID': forprc_ids[uly_idx],
+            'SPD_COMPST_CD': spd,
+            'ULY_TP_CD': family['uly_tp'],
+            'RGHT_TP_CD': rght,
+            'EXER_PRC': exer_prc,
+            'EXP_DD': exp_dd[month_idx],
+            'MKT_DTL_ID': family['mkt'],
+            'FAMILY': family['name'],
+            'HOW_CALC_CD': np.where(spd == ' ', family['how_calc_cd'], "스프레드"),
+            'BASE_PRC': prc,
+            'DIV_YIELD': family.get('div_yield', 0.0),
+            'FORN_RISKFRE_INT': _perUly(family.get('forn_int', 0.0), len(base_ids), scale)[uly_idx],
+            'STDGOOD_BND_EXP': _perUly(family.get('bnd_exp', np.nan), len(base_ids), scale)[uly_idx],
+            'BND_YD': family.get('bnd_yd', np.nan),
+            'STORG_COST': family.get('storg_cost', np.nan),
+            'VOLT': family.get('volt', np.nan),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def reference_isu_cds(isu, count: int = REFERENCE_ISU_COUNT):
+    """ DB 이론가를 종목별 calcTheoPrice 로 산출하는 기준 종목코드 (스프레드, 산출대상 아닌 종목 제외. 별표별로 종목코드 순 처음 count 개)
+    """
+    priced = isu[(isu['SPD_COMPST_CD'] == ' ') & (isu['HOW_CALC_CD'] != "이론가 산출대상 상품 아님")]
+    return set(priced.sort_values('ISU_CD').groupby('HOW_CALC_CD', sort=False).head(count)['ISU_CD'])
+
+
+def make_days(strt_dd: str = STRT_DD, end_dd: str = END_DD):
+    """ 직전 영업일부터 end_dd 까지의 영업일 (TBCS_THEO_PRC_VAR 는 직전 영업일도 조회함)"""
+    calendar = bizCalendar.BusinessCalendar(HOLIDAYS)
+    return [calendar.previous_n_business_day(strt_dd, 1)] + list(calendar.make_biz_days(strt_dd, end_dd))
+
+
+def make_tables(scale: int = 1, strt_dd: str = STRT_DD, end_dd: str = END_DD, seed: int = SEED):
+    """ scale 배 가상 시장의 오라클 테이블별 DataFrame dict (TBCS_HOLDY, TBCS_DRV_ISU, ..., TBCS_THEO_PRC)
+    * 기초자산가격은 일자별로 변동(일 1%), 변동성은 행사가격별 smile, 배당은 상품/결제월별
+    * DB 이론가(TBCS_THEO_PRC)는 소수점 2자리로 반올림. 기준 종목(reference_isu_cds)은 종목별 calcTheoPrice/calcTheoPriceRFR 로,
+      나머지는 calcTheoPrice_batch 로 산출 (나머지는 데이터 양을 채우는 용도로, 검증 기준이 아님)
+    """
+    isu = make_instruments(scale, strt_dd, seed)
+    days = make_days(strt_dd, end_dd)
+    n = len(isu)
+    is_option = (isu['RGHT_TP_CD'] != 'F').to_numpy()
+    is_spread = (isu['SPD_COMPST_CD'] != ' ').to_numpy()
+    how_calc_cd = isu['HOW_CALC_CD'].to_numpy()
+    has_var = ~is_spread & ~np.isin(how_calc_cd, ["별표9의2", "이론가 산출대상 상품 아님"])
+    has_dval = (isu['DIV_YIELD'] > 0).to_numpy()
+    is_rfr = how_calc_cd == "별표9의2"
+    is_gold = how_calc_cd == "별표13"
+    is_reference = isu['ISU_CD'].isin(reference_isu_cds(isu)).to_numpy()
+    reference_rfr = is_reference[is_rfr]
+    exp_ordinal = bizCalendar.toOrdinal(isu['EXP_DD'].to_numpy(dtype=object))
+    exer_prc = isu['EXER_PRC'].to_numpy()
+    expmm = isu['EXP_DD'].str[:6].to_numpy(dtype=object)
+
+    tables = {name: [] for name in TABLE_INDEXES if name not in ('TBCS_DRV_ISU', 'TBCS_ULY')}
+    for day_no, dd in enumerate(days):
+        dd_ordinal = bizCalendar.toOrdinal(dd)
+        remain_dys = (exp_ordinal - dd_ordinal).astype(np.float64)
+        t = remain_dys / calcTheoPrice.YEAR_DAYS
+        # 기초자산가격 : 기초자산별 일 1% 변동 (같은 기초자산의 종목은 같은 가격)
+        shock = _uniform(isu['ULY_ID'].to_numpy(dtype=object) + f"@{dd}", seed) - 0.5
+        uly_prc = isu['BASE_PRC'].to_numpy() * np.exp(0.02 * shock * (day_no > 0))
+        log_moneyness = np.log(np.where(is_option, exer_prc, 1.0) / np.where(is_option, uly_prc, 1.0))
+        volt = isu['VOLT'].to_numpy() * (1 - 0.5 * log_moneyness + 2.0 * log_moneyness ** 2)
+        div_prsnt = uly_prc * (1 - np.exp(-isu['DIV_YIELD'].to_numpy() * t))
+        div_fut = div_prsnt * (1 + DOM_RISKFRE_INT * t)
+        dom_int = np.full(n, DOM_RISKFRE_INT)
+        forn_int = isu['FORN_RISKFRE_INT'].to_numpy()
+        bnd_yd = isu['BND_YD'].to_numpy()
+        storg_cost = isu['STORG_COST'].to_numpy()
+
+        var = pd.DataFrame({'CALC_DD': dd, 'ISU_CD': isu['ISU_CD'], 'ULY_PRC': np.where(how_calc_cd == "별표9", 0.0, uly_prc),
+                            'REMAIN_DYS': remain_dys, 'DOM_RISKFRE_INT': dom_int, 'FORN_RISKFRE_INT': forn_int,
+                            'BND_YD': np.where(np.isnan(bnd_yd), 0.0, bnd_yd), 'THEO_PRC_USE_TP_CD': '01', 'SEQ': '1'})
+        tables['TBCS_THEO_PRC_VAR'].append(var[has_var])
+        if day_no == 0:
+            continue            # 직전 영업일은 TBCS_THEO_PRC_VAR 만 조회됨
+
+        tables['TBCS_VOLT'].append(pd.DataFrame({'DD': dd, 'ISU_CD': isu['ISU_CD'][is_option], 'FINAL_VOLT': volt[is_option], 'FINAL_VOLT_TP_CD': 'AL'}))
+        tables['TBCS_BYDD_DRV_ISU'].append(pd.DataFrame({'DD': dd, 'ISU_CD': isu['ISU_CD'], 'PROD_ID': isu['PROD_ID'], 'EXPMM': expmm}))
+        dval = pd.DataFrame({'DD': dd, 'PROD_ID': isu['PROD_ID'], 'EXPMM': expmm, 'PRSNT': div_prsnt, 'FUT': div_fut})[has_dval]
+        dval = dval.drop_duplicates(['PROD_ID', 'EXPMM'])
+        for col in DVAL_COLS:
+            dval[col] = dval['PRSNT'] if col.endswith('PRSNT_VAL') else dval['FUT']
+        tables['TBCS_DVAL'].append(dval.drop(columns=['PRSNT', 'FUT']))
+        if is_gold.any():
+            tables['TBCS_STORG_COST'].append(pd.DataFrame({'DD': dd, 'ULY_ID': isu['ULY_ID'][is_gold], 'STORG_COST': storg_cost[is_gold]}).drop_duplicates('ULY_ID'))
+
+        # RFR 선물 : 기준기간(만기 3개월 전 ~ 만기 전일)이 시작되었으면 확정금리(FINAL_YN='Y') 사용
+        exp_dd = isu['EXP_DD'].to_numpy(dtype=object)[is_rfr]
+        appl_strt_dd = bizCalendar.fromOrdinal(bizCalendar.toOrdinal(exp_dd) - 91)
+        appl_end_dd = bizCalendar.fromOrdinal(bizCalendar.toOrdinal(exp_dd) - 1)
+        elapsed = np.maximum(dd_ordinal - bizCalendar.toOrdinal(appl_strt_dd), 0)
+        rfr = pd.DataFrame({'DD': dd, 'ISU_CD': isu['ISU_CD'][is_rfr], 'LSTTRD_DD': exp_dd, 'APPL_STRT_DD': appl_strt_dd, 'APPL_END_DD': appl_end_dd,
+                            'FINAL_YN': np.where(elapsed > 0, 'Y', 'N'), 'FINAL_INT': 1 + 0.035 * elapsed / calcTheoPrice.YEAR_DAYS,
+                            'MM3_GOVBND_STRIP_INT': 3.5, 'FWD_INT': 3.55 - 0.01 * np.arange(is_rfr.sum()), 'INT_SPD': 0.01, 'PRC_TP_CD': 'S'})
+        rfr['THEO_INT'] = rfr['FWD_INT'] - rfr['INT_SPD']
+        tables['TBCS_THEO_PRC_RFR_FUT'].append(rfr)
+
+        # DB 이론가
+        div_val = np.where(np.isin(how_calc_cd, ["별표15", "별표16"]), div_prsnt, np.where(np.isin(how_calc_cd, ["별표7", "별표8"]), div_fut, np.nan))
+        theo_prc = calcTheoPrice.calcTheoPrice_batch(uly_prc, exer_prc, remain_dys, dom_int, forn_int, div_val, volt, isu['RGHT_TP_CD'], how_calc_cd,
+                                                     isu['STDGOOD_BND_EXP'], bnd_yd, storg_cost)
+        theo_prc[is_rfr] = calcTheoPrice.calcTheoPriceRFR_batch(rfr['LSTTRD_DD'], rfr['APPL_STRT_DD'], rfr['APPL_END_DD'], rfr['FINAL_YN'], rfr['FINAL_INT'],
+                                                                rfr['MM3_GOVBND_STRIP_INT'], rfr['FWD_INT'], rfr['INT_SPD'], np.full(len(rfr), dd, dtype=object))
+        # 기준 종목은 배열 공식과 별개인 종목별 공식으로 다시 산출
+        reference_args = [a[is_reference].tolist() for a in (uly_prc, exer_prc, remain_dys, dom_int, forn_int, div_val, volt, isu['RGHT_TP_CD'].to_numpy(),
+                                                              how_calc_cd, isu['STDGOOD_BND_EXP'].to_numpy(dtype=float), bnd_yd, storg_cost)]
+        reference_prc = np.array([calcTheoPrice.calcTheoPrice(*row) if row[8] != "별표9의2" else np.nan for row in zip(*reference_args)], dtype=float)
+        reference_prc[is_rfr[is_reference]] = [calcTheoPrice.calcTheoPriceRFR(*row, dd) for row in
+                                               rfr[['LSTTRD_DD', 'APPL_STRT_DD', 'APPL_END_DD', 'FINAL_YN', 'FINAL_INT', 'MM3_GOVBND_STRIP_INT',
+                                                    'FWD_INT', 'INT_SPD']][reference_rfr].itertuples(index=False)]
+        theo_prc[is_reference] = reference_prc
+        priced = ~is_spread & (how_calc_cd != "이론가 산출대상 상품 아님")
+        prc = pd.DataFrame({'DD': dd, 'ISU_CD': isu['ISU_CD'], 'VOLT_TP_CD': '00', 'SETL_THEO_PRC': np.round(theo_prc, 2)})[priced]
+        # 옵션은 다른 변동성 유형(01)의 이론가도 있음 (build_raw_data 에서 걸러짐)
+        other = prc[is_option[priced]].assign(VOLT_TP_CD='01', SETL_THEO_PRC=lambda f: np.round(f['SETL_THEO_PRC'] * 1.01, 2))
+        tables['TBCS_THEO_PRC'].append(pd.concat([prc, other], ignore_index=True))
+
+    tables = {name: pd.concat(frames, ignore_index=True) for name, frames in tables.items()}
+    tables['TBCS_DRV_ISU'] = isu[ISU_COLS]
+    uly = isu[isu['ULY_TP_CD'] == 'BON'].drop_duplicates('ULY_ID')
+    tables['TBCS_ULY'] = pd.DataFrame({'STRT_DD': "20230101", 'END_DD': "20991231", 'ULY_ID': uly['ULY_ID'], 'STDGOOD_BND_EXP': uly['STDGOOD_BND_EXP']})
+    tables['TBCS_HOLDY'] = pd.DataFrame({'CALND_ID': 'COMMON', 'HOLDY_DD': HOLIDAYS})
+    return tables
+
+
+def write_sqlite(tables, path):
+    """ 테이블별 DataFrame 을 SQLite 파일로 저장 (기존 파일은 지움)
+
+    Return:
+        테이블별 행 수 dict
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    connection = sqlite3.connect(path)
+    try:
+        for name, frame in tables.items():
+            frame.to_sql(name, connection, index=False, chunksize=100000)
+            if name in TABLE_INDEXES:
+                connection.execute(f"CREATE INDEX IX_{name} ON {name} ({', '.join(TABLE_INDEXES[name])})")
+        connection.commit()
+    finally:
+        connection.close()
+    return {name: len(frame) for name, frame in tables.items()}
+
+
+def make_local_db(path, scale: int = 1, strt_dd: str = STRT_DD, end_dd: str = END_DD, seed: int = SEED):
+    """ scale 배 가상 시장을 SQLite 파일(path)로 생성
+
+    Return:
+        테이블별 행 수 dict
+    """
+    return write_sqlite(make_tables(scale, strt_dd, end_dd, seed), path)
+
+
+def local_pool(path, max: int = 4):
+    """ SQLite 파일(path)을 오라클 대신 조회하는 커넥션 풀
+    """
+    return orcl.RDB_pool(max=max, connect=functools.partial(sqlite3.connect, path, check_same_thread=False), name="LOCAL")
@@ -0,0 +1,139 @@
+"""영업일 달력
+  * 휴장일 정보(TBCS_HOLDY)로 영업일을 한 번만 만들어 정렬된 정수(1970-01-01 기준 일수) 배열로 보관하고,
+    일수 계산, n영업일 전후 일자, 기간 내 영업일을 searchsorted 로 산출
+  * 일자는 'YYYYMMDD' 문자열(스칼라 또는 배열)로 주고 받음
+"""
+
+import datetime
+import functools
+import numpy as np
+import pandas as pd
+
+CALND_STRT_DD = "19900101"      # 달력 시작일
+CALND_END_DD = "20991231"       # 달력 종료일
+WEEKMASK = (1, 1, 1, 1, 1, 0, 0)  # 월~일 중 영업요일
+
+_EPOCH = datetime.date(1970, 1, 1).toordinal()
+
+
+@functools.lru_cache(maxsize=65536)
+def _strToOrdinal(dd):
+    dd = str(dd)
+    return datetime.date(int(dd[:4]), int(dd[4:6]), int(dd[6:8])).toordinal() - _EPOCH
+
+def toOrdinal(dd):
+    """'YYYYMMDD'(스칼라 또는 배열)를 1970-01-01 기준 일수(int)로 변환
+    * 빈 일자(None, NaN, NaT 등)는 NaN (배열에 빈 일자가 있으면 float 배열)
+    """
+    if np.ndim(dd) == 0:
+        if pd.isna(dd):
+            return np.nan
+        if isinstance(dd, (pd.Timestamp, datetime.date, np.datetime64)):
+            return int(np.datetime64(dd, 'D').astype(np.int64))
+        return _strToOrdinal(dd)
+    dd = np.asarray(dd)
+    if dd.dtype.kind == 'M':
+        missing = np.isnat(dd)
+        ordinals = dd.astype('datetime64[D]').astype(np.int64)
+    else:
+        # 같은 일자가 반복되는 경우가 대부분이므로 고유값만 변환 (빈 일자는 code -1)
+        codes, uniques = pd.factorize(dd.ravel(), use_na_sentinel=True)
+        ordinals = np.array([_strToOrdinal(u) for u in uniques], dtype=np.int64)[codes].reshape(dd.shape)
+        missing = (codes == -1).reshape(dd.shape)
+    if missing.any():
+        ordinals = np.where(missing, np.nan, ordinals)
+    return ordinals
+
+def fromOrdinal(ordinal):
+    """1970-01-01 기준 일수(int, 스칼라 또는 배열)를 'YYYYMMDD'로 변환
+    """
+    if np.ndim(ordinal) == 0:
+        return datetime.date.fromordinal(int(ordinal) + _EPOCH).strftime('%Y%m%d')
+    dates = np.asarray(ordinal, dtype=np.int64).astype('datetime64[D]')
+    return pd.DatetimeIndex(dates.ravel()).strftime('%Y%m%d').to_numpy(dtype=object).reshape(dates.shape)
+
+def count_days(strt_dd, end_dd, inclusive="both"):
+    """두 일자 사이의 (달력)일수 산출. pd.date_range(strt_dd, end_dd, inclusive=inclusive) 의 길이와 같음
+    """
+    diff = toOrdinal(end_dd) - toOrdinal(strt_dd)
+    days = diff + {"both": 1, "left": 0, "right": 0, "neither": -1}[inclusive]
+    if inclusive in ("left", "right"):
+        days = np.where(diff == 0, 1, days)     # 시작일과 종료일이 같으면 pd.date_range 는 그 하루를 포함
+    if np.ndim(days) == 0:
+        return np.nan if np.isnan(days) else max(int(days), 0)     # 빈 일자가 있으면 NaN
+    return np.maximum(days, 0)
+
+
+class BusinessCalendar:
+
+    def __init__(self, holidays=(), strt_dd=CALND_STRT_DD, end_dd=CALND_END_DD, weekmask=WEEKMASK):
+        """휴장일 목록('YYYYMMDD')으로 [strt_dd, end_dd] 기간의 영업일 달력을 생성
+        """
+        days = np.arange(toOrdinal(strt_dd), toOrdinal(end_dd) + 1, dtype=np.int64)
+        weekday = (days + 3) % 7            # 1970-01-01 은 목요일 (월요일=0)
+        is_biz = np.asarray(weekmask, dtype=bool)[weekday]
+        if len(holidays):
+            is_biz &= ~np.isin(days, toOrdinal(np.asarray(list(holidays))))
+        self.biz_days = days[is_biz]
+        self._biz_days_str = fromOrdinal(self.biz_days)
+
+    @classmethod
+    def from_holdy(cls, holidays: pd.DataFrame, **kwargs):
+        """TBCS_HOLDY 조회결과(HOLDY_DD 컬럼)로 영업일 달력을 생성
+        """
+        holdy_dd = holidays['HOLDY_DD']
+        if pd.api.types.is_datetime64_any_dtype(holdy_dd):
+            holdy_dd = holdy_dd.dt.strftime('%Y%m%d')
+        return cls(holdy_dd.dropna().astype(str).tolist(), **kwargs)
+
+    @staticmethod
+    def _ordinal(dd):
+        """일자를 일수로 변환 (빈 일자가 있으면 ValueError)"""
+        ordinal = toOrdinal(dd)
+        if np.any(np.isnan(ordinal)):
+            raise ValueError("Date error : missing date")
+        return ordinal
+
+    def _fromIndex(self, idx):
+        """영업일 배열의 위치(idx)를 'YYYYMMDD'로 변환"""
+        if np.any((np.asarray(idx) < 0) | (np.asarray(idx) >= len(self.biz_days))):
+            raise ValueError("Date error : result is out of the calendar range")
+        if np.ndim(idx) == 0:
+            return self._biz_days_str[int(idx)]
+        return self._biz_days_str[idx]
+
+    def is_business_day(self, dd):
+        """영업일 여부"""
+        ordinal = toOrdinal(dd)
+        idx = np.searchsorted(self.biz_days, ordinal, side='left')
+        return self.biz_days[np.minimum(idx, len(self.biz_days) - 1)] == ordinal
+
+    def next_n_business_day(self, bas_dd, n=1):
+        """기준일자의 n영업일 후 일자. 기준일자가 영업일이 아니면 다음 영업일을 1영업일 후로 봄
+        (pd.to_datetime(bas_dd) + CustomBusinessDay * n 과 같음)
+        """
+        idx = np.searchsorted(self.biz_days, self._ordinal(bas_dd), side='right')
+        return self._fromIndex(idx + n - 1)
+
+    def previous_n_business_day(self, bas_dd, n=1):
+        """기준일자의 n영업일 전 일자. 기준일자가 영업일이 아니면 직전 영업일을 1영업일 전으로 봄
+        """
+        idx = np.searchsorted(self.biz_days, self._ordinal(bas_dd), side='left')
+        return self._fromIndex(idx - n)
+
+    def make_biz_days(self, strt_dd, end_dd):
+        """[strt_dd, end_dd] 기간 내의 영업일자 배열
+        """
+        lo = np.searchsorted(self.biz_days, self._ordinal(strt_dd), side='left')
+        hi = np.searchsorted(self.biz_days, self._ordinal(end_dd), side='right')
+        return self._biz_days_str[lo:hi]
+
+    def count_biz_days(self, strt_dd, end_dd, inclusive="both"):
+        """두 일자 사이의 영업일수 (스칼라 또는 배열, 빈 일자가 있으면 NaN)
+        """
+        strt, end = toOrdinal(strt_dd), toOrdinal(end_dd)
+        lo = np.searchsorted(self.biz_days, strt, side='right' if inclusive in ("right", "neither") else 'left')
+        hi = np.searchsorted(self.biz_days, end, side='right' if inclusive in ("both", "right") else 'left')
+        days = np.maximum(hi - lo, 0)
+        missing = np.isnan(strt) | np.isnan(end)
+        return np.where(missing, np.nan, days) if np.any(missing) else days
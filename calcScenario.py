@@ -0,0 +1,90 @@
+"""증거금 산출용 시나리오(기초자산가격 x 변동성 충격) 이론가 재산출
+  * 종목 x 시나리오 전체를 calcTheoPrice.calcTheoPrice_batch 로 한 번에 계산하되,
+    한 번에 계산하는 (종목 x 시나리오) 수를 CHUNK_CELLS 이하로 나누어 메모리 사용량을 제한
+  * 결과는 종목별 시나리오 손익 행렬(종목 x 시나리오)로, 종목 x 시나리오 행의 긴 DataFrame 을 만들지 않음
+  * 선물 공식(별표7~13)도 같은 충격을 적용하여 산출 (기초자산가격을 쓰지 않는 공식은 손익이 0)
+"""
+
+import numpy as np
+import pandas as pd
+import calcTheoPrice
+
+CHUNK_CELLS = 200000        # 한 번에 계산하는 (종목 x 시나리오) 수
+
+# 이론가 산출 입력 컬럼 (calcTheoPrice.calcTheoPrice_batch 인자 순서)
+PRICE_INPUT_COLS = ['ULY_PRC', 'EXER_PRC', 'REMAIN_DYS', 'DOM_RISKFRE_INT', 'FORN_RISKFRE_INT', 'DIV_VAL', 'FINAL_VOLT',
+                    'RGHT_TP_CD', 'HOW_CALC_CD', 'STDGOOD_BND_EXP', 'BND_YD', 'STORG_COST']
+
+
+def makeScenarioGrid(uly_shocks, volt_shocks=(0.0,)):
+    """ 기초자산가격 충격(비율, 예: -0.1 = 10% 하락)과 변동성 충격의 모든 조합
+
+        Return:
+            uly_shock, volt_shock : 시나리오별 충격 배열 (기초자산가격 충격이 바깥 순서)
+    """
+    uly_shock, volt_shock = np.meshgrid(np.asarray(uly_shocks, dtype=float), np.asarray(volt_shocks, dtype=float), indexing='ij')
+    return uly_shock.ravel(), volt_shock.ravel()
+
+
+def _shockedVolt(volt_annual, volt_shock, volt_shock_type):
+    """ 변동성 충격 적용 ('relative' : volt*(1+충격), 'absolute' : volt+충격). 0 이하가 되지 않도록 함"""
+    if volt_shock_type == 'relative':
+        volt = volt_annual * (1 + volt_shock)
+    elif volt_shock_type == 'absolute':
+        volt = volt_annual + volt_shock
+    else:
+        raise ValueError(f"Unknown volt_shock_type : {volt_shock_type}")
+    return np.maximum(volt, 1e-8)
+
+
+def calcScenario_batch(uly_prc, exer_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, div_val, volt_annual, FUTOPT_TP_CD, how_calc_cd,
+                       stdgood_bnd_exp, bnd_yd, storg_cost, uly_shock, volt_shock, volt_shock_type='relative', chunk_cells: int = CHUNK_CELLS):
+    """ 종목 x 시나리오 이론가 산출(배열 입력)
+
+        Args:
+            calcTheoPrice.calcTheoPrice_batch 와 같은 종목별 배열
+            uly_shock, volt_shock : 시나리오별 충격 배열 (makeScenarioGrid)
+            volt_shock_type : 'relative' 또는 'absolute'
+
+        Return:
+            base_prc : 종목별 충격 전 이론가
+            pnl : (종목 x 시나리오) 시나리오 이론가 - 충격 전 이론가
+    """
+    n = len(np.atleast_1d(np.asarray(FUTOPT_TP_CD, dtype=object)))
+    FUTOPT_TP_CD = calcTheoPrice._asCodeArray(FUTOPT_TP_CD, n)
+    how_calc_cd = calcTheoPrice._asCodeArray(how_calc_cd, n)
+    floats = [np.broadcast_to(calcTheoPrice._asFloatArray(v), (n,)) for v in
+              (uly_prc, exer_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, div_val, volt_annual, stdgood_bnd_exp, bnd_yd, storg_cost)]
+    uly_shock = np.asarray(uly_shock, dtype=float)
+    volt_shock = np.asarray(volt_shock, dtype=float)
+    n_scen = len(uly_shock)
+
+    base_prc = calcTheoPrice.calcTheoPrice_batch(*floats[:7], FUTOPT_TP_CD, how_calc_cd, *floats[7:])
+    pnl = np.empty((n, n_scen))
+    rows_per_chunk = max(1, chunk_cells // max(n_scen, 1))
+    for strt in range(0, n, rows_per_chunk):
+        rows = slice(strt, min(strt + rows_per_chunk, n))
+        # (종목 x 시나리오) 를 1차원으로 펼쳐 한 번에 산출
+        uly, exer, dys, dom, forn, div, volt, bnd_exp, yd, storg = [np.repeat(v[rows], n_scen) for v in floats]
+        m = len(uly) // n_scen
+        uly = uly * (1 + np.tile(uly_shock, m))
+        volt = _shockedVolt(volt, np.tile(volt_shock, m), volt_shock_type)
+        prc = calcTheoPrice.calcTheoPrice_batch(uly, exer, dys, dom, forn, div, volt, np.repeat(FUTOPT_TP_CD[rows], n_scen),
+                                                np.repeat(how_calc_cd[rows], n_scen), bnd_exp, yd, storg)
+        pnl[rows] = prc.reshape(m, n_scen) - base_prc[rows, None]
+    return base_prc, pnl
+
+
+def calcScenarioFromDF(rawData, uly_shock, volt_shock, volt_shock_type='relative', chunk_cells: int = CHUNK_CELLS):
+    """ 이론가 산출 기초정보(rawData)의 종목별 시나리오 손익
+    * 스프레드 종목과 RFR 선물(별표9의2)은 기초자산가격/변동성 충격의 영향이 없으므로 손익 0
+
+        Return:
+            (DD, ISU_CD) 행 x (ULY_SHOCK, VOLT_SHOCK) 시나리오 열의 손익 DataFrame
+    """
+    _, pnl = calcScenario_batch(*[rawData[col] for col in PRICE_INPUT_COLS], uly_shock, volt_shock, volt_shock_type, chunk_cells)
+    no_shock = ((rawData['SPD_COMPST_CD'] != ' ') | (rawData['HOW_CALC_CD'] == "별표9의2")).to_numpy()
+    pnl[no_shock] = 0
+    columns = pd.MultiIndex.from_arrays([np.asarray(uly_shock, dtype=float), np.asarray(volt_shock, dtype=float)], names=['ULY_SHOCK', 'VOLT_SHOCK'])
+    index = pd.MultiIndex.from_frame(rawData[['DD', 'ISU_CD']])
+    return pd.DataFrame(pnl, index=index, columns=columns)
@@ -7,11 +7,11 @@
     * 통화, 채권, 일반상품 이론가 추가 필요
 """
 
+import functools
 import math
 import numpy as np
 import pandas as pd
-from scipy.stats import norm
-from scipy.interpolate import interp1d
+import bizCalendar
 
 YEAR_DAYS = 365     # 1년
 TIME_STEP = 49      # 옵션 이항모델로 산출시, 단계의 수
@@ -24,22 +24,95 @@ def remainDysAnnual(remain_dys):
 
 def calc_days(strt_Dd, end_dd, inclusive):    
     """일자간 차이 산출"""
-    strt_Dd = pd.to_datetime(strt_Dd, format='%Y%m%d')
-    end_dd = pd.to_datetime(end_dd, format='%Y%m%d')
-    dates=pd.date_range(start=strt_Dd, end=end_dd, inclusive=inclusive)
-    return len(dates)
+    return bizCalendar.count_days(strt_Dd, end_dd, inclusive)
 
 def calcKRWintBySwapPoint(swapPoint, uly_prc, remain_dys, rf):
     remain_dys_annual = remainDysAnnual(remain_dys)           # 잔존만기(연 환산)
     r = swapPoint * (1 + rf * remain_dys_annual) / uly_prc * (1/remain_dys_annual) + rf
     return r
 
+def calcKRWintBySwapPoint_batch(swapPoint, uly_prc, remain_dys, rf):
+    """calcKRWintBySwapPoint 의 배열 버전 (통화선물 결제월 전체의 내재 원화금리를 한 번에 산출)"""
+    swapPoint, uly_prc, remain_dys, rf = [_asFloatArray(v) for v in (swapPoint, uly_prc, remain_dys, rf)]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return calcKRWintBySwapPoint(swapPoint, uly_prc, remain_dys, rf)
+
+def interpLinear(x, y, input):
+    """선형보간, 구간 밖은 양 끝 두 점의 기울기로 선형외삽 (interp1d(kind='linear', fill_value='extrapolate') 와 같음)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    order = np.argsort(x, kind='stable')
+    x, y = x[order], y[order]
+    input = np.asarray(input, dtype=np.float64)
+    result = np.interp(input, x, y)
+    if len(x) > 1:
+        lo_slope = (y[1] - y[0]) / (x[1] - x[0])
+        hi_slope = (y[-1] - y[-2]) / (x[-1] - x[-2])
+        result = np.where(input < x[0], y[0] + (input - x[0]) * lo_slope, result)
+        result = np.where(input > x[-1], y[-1] + (input - x[-1]) * hi_slope, result)
+    return result
+
 def inpoDormInt(x, y, input):
-    x = np.array(x)
-    y = np.array(y)
+    return interpLinear(x, y, input)
+
+def normCdf(x):
+    """표준정규분포 누적확률 (스칼라)"""
+    return 0.5 * math.erfc(-x / math.sqrt(2))
+
+@functools.lru_cache(maxsize=None)
+def binomCoef(time_step):
+    """이항모델의 단계 수(time_step)별 이항계수 nCk 와 log(nCk) 를 k=0..n 순서로 산출 (단계 수별로 1회만 계산)
+    """
+    coef = np.array([float(math.comb(time_step, k)) for k in range(time_step+1)])
+    log_coef = np.array([math.lgamma(time_step+1) - math.lgamma(k+1) - math.lgamma(time_step-k+1) for k in range(time_step+1)])
+    coef.flags.writeable = False
+    log_coef.flags.writeable = False
+    return coef, log_coef
+
+def _factorizeRows(*cols):
+    """여러 배열을 행 단위 key로 보고 고유한 조합을 찾음 (NaN도 하나의 값으로 취급)
+
+        Return:
+            codes : 입력 행별 고유조합 번호
+            uniques : 고유조합별 각 배열 값 list
+    """
+    codes = np.zeros(len(cols[0]), dtype=np.int64)
+    for col in cols:
+        col_codes, col_uniques = pd.factorize(col, use_na_sentinel=False)
+        codes, _ = pd.factorize(codes*len(col_uniques) + col_codes)
+    first = np.empty(codes.max()+1 if len(codes) else 0, dtype=np.int64)
+    first[codes[::-1]] = np.arange(len(codes))[::-1]
+    return codes, [np.asarray(col)[first] for col in cols]
+
+def _bondFuturePrice(stdgood_bnd_exp, bnd_yd):
+    """별표9 표준물 채권가격: 연 5% 6개월 이표(2.5)의 연금현가 + 원금(100) 현가 (배열도 가능)
+
+        sum_{i=1..n} 2.5/(1+y)^i + 100/(1+y)^n = 2.5 * (1-(1+y)^-n)/y + 100*(1+y)^-n
+        (y = 채권수익률/2, n = 2*표준물 만기(년))
+    """
+    y = bnd_yd/2
+    n = 2*stdgood_bnd_exp
+    discount = (1+y) ** (-1*n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annuity = np.where(y == 0, n, (1-discount)/np.where(y == 0, 1, y))
+    return (5/2) * annuity + 100 * discount
+
+@functools.lru_cache(maxsize=4096)
+def bondFuturePrice(stdgood_bnd_exp, bnd_yd):
+    """별표9 국채선물 이론가 (표준물 만기, 채권수익률)별 memo
+    """
+    return float(_bondFuturePrice(stdgood_bnd_exp, bnd_yd))
+
+def calcBondFuture_batch(stdgood_bnd_exp, bnd_yd):
+    """별표9 국채선물 이론가 산출(배열 입력)
 
-    result = interp1d(x, y, kind='linear', fill_value='extrapolate')    
-    return result(input)
+        같은 날 같은 (표준물 만기, 채권수익률)을 갖는 종목이 대부분이므로 고유한 조합만 계산하여 펼침
+    """
+    stdgood_bnd_exp = np.trunc(_asFloatArray(stdgood_bnd_exp))
+    bnd_yd = _asFloatArray(bnd_yd)
+    codes, (exp_keys, yd_keys) = _factorizeRows(stdgood_bnd_exp, bnd_yd)
+    return _bondFuturePrice(exp_keys, yd_keys)[codes]
 
 def calcTheoPrice_future(uly_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, div_val, how_calc_cd, stdgood_bnd_exp, bnd_yd, storg_cost):    
     """선물 이론가 산출
@@ -68,11 +141,7 @@ def calcTheoPrice_future(uly_prc, remain_dys, dom_riskfre_int, forn_riskfre_int,
         return theo_prc
 
     elif how_calc_cd == "별표9":
-        theo_prc = 0
-        stdgood_bnd_exp = int(stdgood_bnd_exp)
-        for i in range(1,2*stdgood_bnd_exp+1):
-            theo_prc += (5/2) / pow(1+bnd_yd/2,i)
-        theo_prc += 100/pow(1+bnd_yd/2, 2*stdgood_bnd_exp)
+        theo_prc = bondFuturePrice(int(stdgood_bnd_exp), bnd_yd)
         return theo_prc
 
     elif how_calc_cd == "별표12":
@@ -104,64 +173,31 @@ def calcTheoPrice_option(uly_prc, exer_prc, remain_dys, dom_riskfre_int, forn_ri
     """
     remain_dys_annual = remainDysAnnual(remain_dys)           # 잔존만기(연 환산)
     
-    if how_calc_cd == "별표15":
+    if how_calc_cd in ["별표15", "별표16"]:
         u = math.exp(volt_annual*math.sqrt(remain_dys_annual/TIME_STEP))
         d = math.exp(-1 * volt_annual*math.sqrt(remain_dys_annual/TIME_STEP))
         p = (math.exp(dom_riskfre_int*remain_dys_annual/TIME_STEP)-d)/(u-d)
         q = 1-p
-
-        ST = []
-        payoff=[]
-        if FUTOPT_TP_CD == 'C':
-            for k in range(TIME_STEP+1):
-                ST.append((uly_prc-div_val) * (u**k) * (d ** (TIME_STEP-k)))                                      # Binomial Tree의 매 state
-                payoff.append(max(((uly_prc-div_val) * (u**k) * (d ** (TIME_STEP-k)) - exer_prc),0))              # 매 state의 Payoff
-        else:
-            for k in range(TIME_STEP+1):
-                ST.append((uly_prc-div_val) * (u**k) * (d ** (TIME_STEP-k)))                                      # Binomial Tree의 매 state
-                payoff.append(max(exer_prc - ((uly_prc-div_val) * (u**k) * (d ** (TIME_STEP-k))),0))              # 매 state의 Payoff
-
-        # 이론가 산출
-        theo_prc_future = 0
-        for k in range(TIME_STEP+1):
-            theo_prc_future += math.factorial(TIME_STEP)/(math.factorial(TIME_STEP-k)*math.factorial(k)) * (p ** k) * (q ** (TIME_STEP-k)) *payoff[k]       # 이론가의 미래가치
-        theo_prc = math.exp(-1*dom_riskfre_int*remain_dys_annual)*theo_prc_future       # 이론가격, 현재가치
-
-        return theo_prc
-
-    elif how_calc_cd == "별표16":
-        u = math.exp(volt_annual*math.sqrt(remain_dys_annual/TIME_STEP))        
-        d = math.exp(-1 * volt_annual*math.sqrt(remain_dys_annual/TIME_STEP))
-        p = (math.exp(dom_riskfre_int*remain_dys_annual/TIME_STEP)-d)/(u-d)
-        q = 1-p
-
-        ST = []
-        payoff=[]
-        if FUTOPT_TP_CD == 'C':
-            for k in range(TIME_STEP+1):
-                ST.append((uly_prc-div_val) * (u**k) * (d ** (TIME_STEP-k)))                                      # Binomial Tree의 매 state
-                payoff.append(max(((uly_prc-div_val) * (u**k) * (d ** (TIME_STEP-k)) - exer_prc),0))              # 매 state의 Payoff
-        else:
-            for k in range(TIME_STEP+1):
-                ST.append((uly_prc-div_val) * (u**k) * (d ** (TIME_STEP-k)))                                      # Binomial Tree의 매 state
-                payoff.append(max(exer_prc - ((uly_prc-div_val) * (u**k) * (d ** (TIME_STEP-k))),0))              # 매 state의 Payoff
+        coef = binomCoef(TIME_STEP)[0].tolist()
 
         # 이론가 산출
         theo_prc_future = 0
         for k in range(TIME_STEP+1):
-            theo_prc_future += math.factorial(TIME_STEP)/(math.factorial(TIME_STEP-k)*math.factorial(k)) * (p ** k) * (q ** (TIME_STEP-k)) *payoff[k]       # 이론가의 미래가치
+            ST = (uly_prc-div_val) * (u**k) * (d ** (TIME_STEP-k))                                                  # Binomial Tree의 매 state
+            payoff = max(ST - exer_prc, 0) if FUTOPT_TP_CD == 'C' else max(exer_prc - ST, 0)                        # 매 state의 Payoff
+            theo_prc_future += coef[k] * (p ** k) * (q ** (TIME_STEP-k)) * payoff                                   # 이론가의 미래가치
         theo_prc = math.exp(-1*dom_riskfre_int*remain_dys_annual)*theo_prc_future       # 이론가격, 현재가치
 
         return theo_prc
 
     elif how_calc_cd == "별표17":
         theo_prc = 0
-        d1= (math.log(uly_prc / exer_prc) + (dom_riskfre_int - forn_riskfre_int + (volt_annual ** 2)/2) * remain_dys_annual) / volt_annual * math.sqrt(remain_dys_annual)
+        d1= (math.log(uly_prc / exer_prc) + (dom_riskfre_int - forn_riskfre_int + (volt_annual ** 2)/2) * remain_dys_annual) / (volt_annual * math.sqrt(remain_dys_annual))
         d2 = d1 - volt_annual * math.sqrt(remain_dys_annual)
         if FUTOPT_TP_CD == 'C':
-            theo_prc = uly_prc * math.exp(-1*forn_riskfre_int*remain_dys_annual) * norm.cdf(d1) - exer_prc * math.exp(-1*dom_riskfre_int*remain_dys_annual) * norm.cdf(d2)
+            theo_prc = uly_prc * math.exp(-1*forn_riskfre_int*remain_dys_annual) * normCdf(d1) - exer_prc * math.exp(-1*dom_riskfre_int*remain_dys_annual) * normCdf(d2)
         else:
-            theo_prc = exer_prc * math.exp(-1*dom_riskfre_int*remain_dys_annual) * norm.cdf(-1*d2) - uly_prc * math.exp(-1*forn_riskfre_int*remain_dys_annual) * norm.cdf(-1*d1)
+            theo_prc = exer_prc * math.exp(-1*dom_riskfre_int*remain_dys_annual) * normCdf(-1*d2) - uly_prc * math.exp(-1*forn_riskfre_int*remain_dys_annual) * normCdf(-1*d1)
 
         return theo_prc
 
@@ -204,6 +240,215 @@ def calcTheoPriceRFR(lsttrd_dd, appl_strt_dd, appl_end_dd, final_yn, final_int,
     theo_prc = 100 - theo_int
     return theo_prc
 
+
+def _asFloatArray(values):
+    """입력값을 float64 numpy 배열로 변환 (None은 NaN)"""
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_numeric_dtype(values.dtype):
+        return values.to_numpy(dtype=np.float64, na_value=np.nan)      # nullable 정수 등
+    values = np.asarray(values)
+    if values.dtype.kind in 'biuf':
+        return values.astype(np.float64, copy=False).ravel()
+    return pd.to_numeric(pd.Series(values.ravel(), dtype=object), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+def _asCodeArray(values, n):
+    """코드값(별표번호, 선물옵션구분코드 등)을 길이 n의 object 배열로 변환"""
+    values = np.asarray(values, dtype=object)
+    if values.ndim == 0:
+        values = np.full(n, values.item(), dtype=object)
+    return values.ravel()
+
+def calcTheoPrice_future_batch(uly_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, div_val, how_calc_cd, stdgood_bnd_exp, bnd_yd, storg_cost):
+    """선물 이론가 산출(배열 입력)
+
+        calcTheoPrice_future 와 같은 공식을 별표번호별로 묶어 한 번에 계산
+
+        Args:
+            calcTheoPrice_future 와 동일하며, 각 인자는 같은 길이의 numpy 배열
+            how_calc_cd : 별표번호 배열
+
+        Return:
+            theo_prc : 이론가 배열 (산출대상이 아니면 0)
+    """
+    theo_prc = np.zeros(len(uly_prc))
+    remain_dys_annual = remainDysAnnual(remain_dys)           # 잔존만기(연 환산)
+
+    for code in pd.unique(how_calc_cd):
+        idx = np.flatnonzero(how_calc_cd == code)
+        t = remain_dys_annual[idx]
+        if code in ["별표7", "별표8", "별표8의2"]:
+            theo_prc[idx] = uly_prc[idx] * (1 + dom_riskfre_int[idx]*t)-div_val[idx]
+
+        elif code == "별표9":
+            theo_prc[idx] = calcBondFuture_batch(stdgood_bnd_exp[idx], bnd_yd[idx])
+
+        elif code == "별표12":
+            theo_prc[idx] = uly_prc[idx] * (1 + dom_riskfre_int[idx]*t)/(1 + forn_riskfre_int[idx]*t)
+
+        elif code == "별표13":
+            theo_prc[idx] = uly_prc[idx] * (1 + dom_riskfre_int[idx]*t)+storg_cost[idx]
+
+    return theo_prc
+
+def calcTheoPrice_option_batch(uly_prc, exer_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, div_val, volt_annual, FUTOPT_TP_CD, how_calc_cd):
+    """옵션 이론가 산출(배열 입력)
+
+        calcTheoPrice_option 과 같은 공식을 별표번호별로 묶어 한 번에 계산
+
+        Args:
+            calcTheoPrice_option 과 동일하며, 각 인자는 같은 길이의 numpy 배열
+
+        Return:
+            theo_prc : 이론가 배열 (산출대상이 아니면 0)
+    """
+    theo_prc = np.zeros(len(uly_prc))
+
+    for code in pd.unique(how_calc_cd):
+        idx = np.flatnonzero(how_calc_cd == code)
+        r = dom_riskfre_int[idx]
+        volt = volt_annual[idx]
+        if code in ["별표15", "별표16"]:
+            theo_prc[idx] = calcTheoPrice_binomial_batch(uly_prc[idx], exer_prc[idx], remain_dys[idx], r, div_val[idx], volt, FUTOPT_TP_CD[idx])
+
+        elif code == "별표17":
+            theo_prc[idx] = calcTheoPrice_bs_batch(uly_prc[idx], exer_prc[idx], remain_dys[idx], r, forn_riskfre_int[idx], volt, FUTOPT_TP_CD[idx])
+
+    return theo_prc
+
+def binomialTree(uly_prc, remain_dys, dom_riskfre_int, div_val, volt_annual, time_step=TIME_STEP):
+    """이항모델의 만기 state와 state별 할인 확률가중치 산출(배열 입력)
+
+        u, d, p 는 (잔존일수, 변동성, 금리)에만, 만기 state는 여기에 (기초자산가격-배당)만 더해 결정되므로
+        같은 값을 갖는 시리즈(동일 기초자산/만기의 행사가격들)는 한 번만 계산
+
+        Return:
+            ST : (시리즈 x 노드) 만기 state 행렬
+            weight : (시리즈 x 노드) nCk * p^k * q^(n-k) * exp(-rT) 행렬
+            series : 입력 행별 시리즈 번호 (ST, weight의 행 번호)
+    """
+    remain_dys_annual = remainDysAnnual(remain_dys)           # 잔존만기(연 환산)
+    series, (t, volt, r, s) = _factorizeRows(remain_dys_annual, volt_annual, dom_riskfre_int, uly_prc-div_val)
+
+    u = np.exp(volt*np.sqrt(t/time_step))
+    d = np.exp(-1 * volt*np.sqrt(t/time_step))
+    p = (np.exp(r*t/time_step)-d)/(u-d)
+    q = 1-p
+
+    k = np.arange(time_step+1)
+    log_coef = binomCoef(time_step)[1]
+    ST = s[:, None] * (u[:, None]**k) * (d[:, None]**(time_step-k))                                    # Binomial Tree의 매 state
+    # nCk * p^k * q^(n-k) 를 log 공간에서 계산하여 단계 수가 커져도 overflow 되지 않도록 함 (p, q 의 부호는 별도로 반영)
+    log_weight = log_coef + k*np.log(np.abs(p))[:, None] + (time_step-k)*np.log(np.abs(q))[:, None] - (r*t)[:, None]
+    sign = np.where(p[:, None] < 0, (-1.0)**k, 1.0) * np.where(q[:, None] < 0, (-1.0)**(time_step-k), 1.0)
+    weight = sign * np.exp(log_weight)
+    return ST, weight, series
+
+def calcTheoPrice_binomial_batch(uly_prc, exer_prc, remain_dys, dom_riskfre_int, div_val, volt_annual, FUTOPT_TP_CD, time_step=TIME_STEP):
+    """별표15, 별표16 이항모델 옵션 이론가 산출(배열 입력)
+
+        시리즈별 만기 state를 공유하고, 옵션체인 전체를 (종목 x 노드) payoff 행렬과 가중치 행렬의 곱으로 산출
+
+        Return:
+            theo_prc : 이론가 배열
+    """
+    ST, weight, series = binomialTree(uly_prc, remain_dys, dom_riskfre_int, div_val, volt_annual, time_step)
+    ST = ST[series]
+    exer_prc = np.asarray(exer_prc)[:, None]
+    payoff = np.where((np.asarray(FUTOPT_TP_CD) == 'C')[:, None], np.maximum(ST - exer_prc, 0), np.maximum(exer_prc - ST, 0))       # 매 state의 Payoff
+    return np.einsum('ij,ij->i', payoff, weight[series])
+
+def calcTheoPrice_bs_batch(uly_prc, exer_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, volt_annual, FUTOPT_TP_CD, greeks=False):
+    """별표17 통화옵션(Garman-Kohlhagen) 이론가 및 민감도 산출(배열 입력)
+
+        Args:
+            uly_prc : 기초자산 가격
+            exer_prc : 행사가격
+            remain_dys : 잔존일수
+            dom_riskfre_int : 국내무위험금리
+            forn_riskfre_int : 국외무위험금리
+            volt_annual : 연 변동성
+            FUTOPT_TP_CD : 선물옵션구분코드 (C:콜옵션, P:풋옵션)
+            greeks : True 이면 이론가와 함께 민감도를 산출
+
+        Return:
+            greeks=False : 이론가 배열
+            greeks=True : {'THEO_PRC', 'DELTA', 'GAMMA', 'VEGA', 'THETA'} 배열 dict
+                * VEGA : 변동성 1(=100%p) 변화당 가격변화
+                * THETA : 1년 경과당 가격변화 (1일 기준은 YEAR_DAYS 로 나누어 사용)
+    """
+    from scipy.special import ndtr            # scipy 는 이 함수를 처음 호출할 때 import (선물만 산출하거나 import 만 할 때는 불러오지 않음)
+
+    uly_prc, exer_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, volt_annual = [
+        _asFloatArray(v) for v in (uly_prc, exer_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, volt_annual)]
+    is_call = _asCodeArray(FUTOPT_TP_CD, len(uly_prc)) == 'C'
+    t = remainDysAnnual(remain_dys)           # 잔존만기(연 환산)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volt_sqrt_t = volt_annual * np.sqrt(t)
+        d1 = (np.log(uly_prc / exer_prc) + (dom_riskfre_int - forn_riskfre_int + (volt_annual ** 2)/2) * t) / volt_sqrt_t
+        d2 = d1 - volt_sqrt_t
+        forn_df = np.exp(-1*forn_riskfre_int*t)
+        dom_df = np.exp(-1*dom_riskfre_int*t)
+        # 풋옵션은 N(-d1), N(-d2) 를 사용하므로 부호(sign)만 바꾸어 콜/풋을 같은 식으로 산출
+        sign = np.where(is_call, 1.0, -1.0)
+        nd1 = ndtr(sign*d1)
+        nd2 = ndtr(sign*d2)
+        theo_prc = sign * (uly_prc * forn_df * nd1 - exer_prc * dom_df * nd2)
+        if not greeks:
+            return theo_prc
+
+        pdf_d1 = np.exp(-0.5 * d1**2) / math.sqrt(2*math.pi)
+        return {
+            'THEO_PRC': theo_prc,
+            'DELTA': sign * forn_df * nd1,
+            'GAMMA': forn_df * pdf_d1 / (uly_prc * volt_sqrt_t),
+            'VEGA': uly_prc * forn_df * pdf_d1 * np.sqrt(t),
+            'THETA': -1 * uly_prc * forn_df * pdf_d1 * volt_annual / (2*np.sqrt(t))
+                     + sign * (forn_riskfre_int * uly_prc * forn_df * nd1 - dom_riskfre_int * exer_prc * dom_df * nd2),
+        }
+
+def calcTheoPrice_batch(uly_prc, exer_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, div_val, volt_annual, FUTOPT_TP_CD, how_calc_cd, stdgood_bnd_exp, bnd_yd, storg_cost):
+    """ 이론가 일괄 산출을 위한 함수
+        * calcTheoPrice 와 인자가 같으나, 각 인자에 종목수만큼의 배열(numpy, list, Series)을 넣어 호출
+        * 스칼라 값을 넣으면 전 종목에 같은 값을 사용
+        * 종목별로 calcTheoPrice 를 호출한 결과와 (부동소수점 오차 범위 내에서) 같은 값을 돌려줌
+
+        Return:
+            theo_prc : 이론가 배열
+    """
+    n = len(np.atleast_1d(np.asarray(FUTOPT_TP_CD, dtype=object)))
+    FUTOPT_TP_CD = _asCodeArray(FUTOPT_TP_CD, n)
+    how_calc_cd = _asCodeArray(how_calc_cd, n)
+    uly_prc, exer_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, div_val, volt_annual, stdgood_bnd_exp, bnd_yd, storg_cost = [
+        np.broadcast_to(_asFloatArray(v), (n,)) for v in (uly_prc, exer_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, div_val, volt_annual, stdgood_bnd_exp, bnd_yd, storg_cost)]
+
+    theo_prc = np.zeros(n)
+    is_future = FUTOPT_TP_CD == 'F'
+    is_option = (FUTOPT_TP_CD == 'C') | (FUTOPT_TP_CD == 'P')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if is_future.any():
+            idx = np.flatnonzero(is_future)
+            theo_prc[idx] = calcTheoPrice_future_batch(uly_prc[idx], remain_dys[idx], dom_riskfre_int[idx], forn_riskfre_int[idx], div_val[idx], how_calc_cd[idx], stdgood_bnd_exp[idx], bnd_yd[idx], storg_cost[idx])
+        if is_option.any():
+            idx = np.flatnonzero(is_option)
+            theo_prc[idx] = calcTheoPrice_option_batch(uly_prc[idx], exer_prc[idx], remain_dys[idx], dom_riskfre_int[idx], forn_riskfre_int[idx], div_val[idx], volt_annual[idx], FUTOPT_TP_CD[idx], how_calc_cd[idx])
+    return theo_prc
+
+def calcTheoPriceRFR_batch(lsttrd_dd, appl_strt_dd, appl_end_dd, final_yn, final_int, mm3_govbnd_strip_int, fwd_int, int_spd, calc_dd):
+    """calcTheoPriceRFR 의 배열 버전"""
+    final_yn = np.asarray(final_yn, dtype=object)
+    final_int, mm3_govbnd_strip_int, fwd_int, int_spd = [_asFloatArray(v) for v in (final_int, mm3_govbnd_strip_int, fwd_int, int_spd)]
+
+    theo_int = fwd_int - int_spd
+    is_final = final_yn == 'Y'
+    if is_final.any():
+        idx = np.flatnonzero(is_final)
+        x = calc_days(np.asarray(calc_dd, dtype=object)[idx], np.asarray(appl_strt_dd, dtype=object)[idx], "left")
+        N = calc_days(np.asarray(appl_strt_dd, dtype=object)[idx], np.asarray(appl_end_dd, dtype=object)[idx], "both")
+        strip_int = 1 + mm3_govbnd_strip_int[idx]/100 * (N-x) / YEAR_DAYS
+        theo_int[idx] = YEAR_DAYS/N*(final_int[idx]*strip_int-1)*100
+    theo_prc = 100 - theo_int
+    return theo_prc
+
 ### 단일 값을 넣어서 테스트할 수 있게 만듬
 if __name__ == "__main__":
 
@@ -6,200 +6,407 @@
     * 통화, 채권, 일반상품 이론가 추가 필요
 """
 
+import argparse
+import contextlib
+import datetime
+import os
+import sys
 import orcl
+import numpy as np
 import pandas as pd
+import bizCalendar
 import calcTheoPrice
+import impliedVolt
+import loadData
+import snapshotCache
+import stageTimer
+import writeOutput
 
 STRT_DD = "20231204"
 END_DD = "20231205"
 THEO_PRC_USE_TP_CD = "01"           # 01 : 정산가/증거금기준가 산출용, 02 : 기준가/호가한도계산 산출용
 PRC_TP_CD = 'S'
+USE_SNAPSHOT_CACHE = True          # 조회결과를 로컬 스냅샷 캐시(snapshotCache.SNAPSHOT_DIR)에 저장하고 재사용
+USE_PUSHDOWN_QUERY = False         # 테이블별로 조회하지 않고 DB 에서 조인까지 마친 결과를 한 번에 조회 (캐시 사용 안함)
+CALC_IMPLIED_VOLT = False          # DB 이론가로 옵션 내재변동성을 역산하여 FINAL_VOLT 와 비교 (IMPL_VOLT, IMPL_VOLT_DIFF 컬럼 추가)
+DROP_DEBUG_COLS = True             # 산출에 쓰지 않는 배당 원천 컬럼 등(DEBUG_COLS)을 산출 전에 버림
+RAWDATA_FORMAT = "parquet"         # 산출 기초정보 전체 파일 형식 (parquet, csv, xlsx)
+RESULT_FORMAT = "xlsx"             # 결과 파일 형식 (parquet, csv, xlsx)
+RUN_REPORT = True                  # 단계별 소요시간/메모리 실행 보고서(JSON) 저장 (stageTimer)
+PROFILE = False                    # 실행 보고서에 cProfile 결과 포함 (pstats 파일도 저장)
+TRACE_MEMORY = False               # 실행 보고서에 tracemalloc 할당량 포함
+
+# rawData 컬럼 형식 (메모리 사용량을 줄이기 위해 조회 직후 변환)
+# * 일자 : YYYYMMDD 정수(int32, 빈 값이 있으면 Int32). 순서 비교와 bizCalendar 일수 계산에 그대로 사용
+# * 코드/ID : category. 조인 키(ISU_CD, ULY_ID)는 조인이 끝난 뒤 변환
+# * 정수 값 : nullable 정수 (값이 모두 정수일 때만)
+DATE_COLS = ['DD', 'CALC_DD', 'STRT_DD', 'END_DD', 'EXP_DD', 'LSTTRD_DD', 'APPL_STRT_DD', 'APPL_END_DD']
+CATEGORY_COLS = ['PROD_ID', 'FORPRC_ULY_ID', 'SPD_COMPST_CD', 'ULY_TP_CD', 'RGHT_TP_CD', 'MKT_DTL_ID', 'FINAL_VOLT_TP_CD', 'VOLT_TP_CD',
+                 'THEO_PRC_USE_TP_CD', 'FINAL_YN']
+KEY_CATEGORY_COLS = ['ISU_CD', 'ULY_ID']
+INT_COLS = {'REMAIN_DYS': 'Int16', 'STDGOOD_BND_EXP': 'Int8'}
+DEBUG_COLS = ['CALC_DD', 'FSETLPRC_DIV_PRSNT_VAL', 'FSETLPRC_DIV_FUT_VAL', 'FBASPRC_DIV_PRSNT_VAL', 'FBASPRC_DIV_FUT_VAL',
+              'AFADJ_DIV_PRSNT_VAL', 'AFADJ_DIV_FUT_VAL', 'AFEXDIV_DIV_PRSNT_VAL', 'AFEXDIV_DIV_FUT_VAL']
+
+# 결과 파일 컬럼 (rawData 컬럼명 : 결과 파일 컬럼명)
+RESULT_COLUMNS = {
+    'DD': "일자", 'ISU_CD': "종목코드", 'ULY_ID': "기초자산ID", 'FORPRC_ULY_ID': "가격용기초자산ID", 'ULY_TP_CD': "기초자산유형코드", 'PROD_ID': "상품ID", 'ISU_KOR_NM': "종목한글명",
+    'THEO_PRC_USE_TP_CD': "이론가격용용도구분코드(01:정산가/증거금기준가용, 02:기준가/호가한도계산용)", 'RGHT_TP_CD': "선물옵션구분코드", 'EXER_PRC': "행사가격", 'ULY_PRC': "기초자산가격",
+    'REMAIN_DYS': "잔존일수", 'DOM_RISKFRE_INT': "국내무위험금리", 'FORN_RISKFRE_INT': "해외무위험금리", 'FINAL_VOLT': "내재변동성", 'FINAL_VOLT_TP_CD': "변동성유형코드",
+    'DIV_VAL': "배당가치", 'BND_YD': "채권수익률", 'STORG_COST': "금선물 g당 보관료",
+    'THEO_PRC_DB': "이론가격(DB)", 'THEO_PRC': "이론가격(산출)", 'THEO_PRC_DIFF_DB_AND_PYTHON': "이론가격 차이(산출-DB)", 'HOW_CALC_CD': "산출방법",
+}
+# 내재변동성 역산(calcImpliedVoltFromDF)을 한 경우에 결과 파일에 추가하는 컬럼
+IMPL_VOLT_COLUMNS = {'IMPL_VOLT': "역산변동성(DB 이론가)", 'IMPL_VOLT_DIFF': "변동성 차이(역산-내재변동성)"}
+
+# 파일 컬럼 타입 (writeOutput.ParquetSink 의 dtypes). 값이 모두 빈 일자가 먼저 저장되어도 파일 전체에서 같은 타입이 되도록 미리 정함
+FLOAT_COLS = ['EXER_PRC', 'ULY_PRC', 'DOM_RISKFRE_INT', 'FORN_RISKFRE_INT', 'BND_YD', 'STORG_COST', 'FINAL_VOLT', 'DIV_VAL', 'FINAL_INT', 'MM3_GOVBND_STRIP_INT',
+              'FWD_INT', 'INT_SPD', 'THEO_INT', 'THEO_PRC_DB', 'THEO_PRC', 'THEO_PRC_DIFF_DB_AND_PYTHON', 'IMPL_VOLT', 'IMPL_VOLT_DIFF'] + [col for col in DEBUG_COLS if col not in DATE_COLS]
+# (일자 DD 는 항상 값이 있으므로 int32, 나머지 일자는 빈 값이 있을 수 있으므로 Int32)
+COLUMN_DTYPES = {**{col: 'int32' if col == 'DD' else 'Int32' for col in DATE_COLS},
+                 **{col: 'str' for col in CATEGORY_COLS + KEY_CATEGORY_COLS + ['ISU_KOR_NM', 'HOW_CALC_CD']},
+                 **INT_COLS,
+                 **{col: 'float64' for col in FLOAT_COLS}}
+RESULT_DTYPES = {name: COLUMN_DTYPES[col] for col, name in {**RESULT_COLUMNS, **IMPL_VOLT_COLUMNS}.items()}
 
 # 환경명
 env = "PD_CS_CCP"
-conn_oracle = orcl.RDB_client(env)
 
-def makeCustomBd(holidays : pd.DataFrame):
-    """ 휴장일 정보를 이용하여 영업일 달력을 생성
+def makeBizCalendar(holidays : pd.DataFrame):
+    """ 휴장일 정보를 이용하여 영업일 달력(BusinessCalendar)을 생성
     """
-    holidays['HOLDY_DD']=pd.to_datetime(holidays['HOLDY_DD'], format='%Y%m%d')
-    custom_bd = pd.tseries.offsets.CustomBusinessDay(holidays=holidays['HOLDY_DD'].tolist())
-    return custom_bd
+    return bizCalendar.BusinessCalendar.from_holdy(holidays)
 
 def next_n_business_day(bas_dd, n, custom_bd):
-    """ 기준일자의 n일 후의 영업일
+    """ 기준일자의 n일 후의 영업일 (custom_bd 는 BusinessCalendar)
     """
-    bas_dd = pd.to_datetime(bas_dd, format='%Y%m%d')
-    return(bas_dd + custom_bd * n).strftime('%Y%m%d')    
+    return custom_bd.next_n_business_day(bas_dd, n)
 
 def previous_n_business_day(bas_dd, n, custom_bd):
-    """ 기준일자의 n일 전 영업일
+    """ 기준일자의 n일 전 영업일 (custom_bd 는 BusinessCalendar)
     """
-    bas_dd = pd.to_datetime(bas_dd, format='%Y%m%d')
-    return(bas_dd - custom_bd * n).strftime('%Y%m%d')
+    return custom_bd.previous_n_business_day(bas_dd, n)
 
 def make_biz_days(strt_dd, end_dd, custom_bd):
-    """ 주어진 기간 내의 영업일자를 생성
+    """ 주어진 기간 내의 영업일자를 생성 (custom_bd 는 BusinessCalendar)
     """
-    strt_dd = pd.to_datetime(strt_dd, format='%Y%m%d')
-    end_dd = pd.to_datetime(end_dd, format='%Y%m%d')
-    return pd.date_range(start=strt_dd, end=end_dd, freq=custom_bd)    
+    return custom_bd.make_biz_days(strt_dd, end_dd)
     
 
-def howCalcTheo(rawData):
-    """ 어떤 공식으로 이론가격을 산출할지 결정    
-    
+def merge_effective_dated(left, ref, on='DD', strt_col='STRT_DD', end_col='END_DD'):
+    """ 유효기간(STRT_DD~END_DD)이 있는 기준정보 테이블을 일자별로 펼쳐 붙임
+    * pd.merge(left, ref, how='cross') 후 ref[strt_col] <= left[on] <= ref[end_col] 로 거르고 strt_col, end_col 을 지운 것과 같은 결과(행 순서 포함)
+    * 교차곱을 만들지 않고, 일자순으로 정렬한 left 에서 기준정보 행별로 유효기간에 해당하는 구간만 searchsorted 로 찾아 펼침
+    """
+    left_dd = left[on].to_numpy(dtype=str)
+    left_order = np.argsort(left_dd, kind='stable')
+    sorted_dd = left_dd[left_order]
+
+    valid = (ref[strt_col].notna() & ref[end_col].notna()).to_numpy()
+    lo = np.searchsorted(sorted_dd, ref[strt_col].to_numpy(dtype=str), side='left')
+    hi = np.searchsorted(sorted_dd, ref[end_col].to_numpy(dtype=str), side='right')
+    counts = np.where(valid, np.maximum(hi - lo, 0), 0)
+
+    # 기준정보 행(ref_idx)마다 [lo, hi) 구간의 left 행 번호를 이어 붙임
+    ref_idx = np.repeat(np.arange(len(ref)), counts)
+    starts = np.cumsum(counts) - counts
+    left_idx = left_order[np.repeat(lo, counts) + np.arange(counts.sum()) - np.repeat(starts, counts)]
+
+    order = np.lexsort((ref_idx, left_idx))         # 교차곱과 같이 left 행 순서, 그 안에서 ref 행 순서
+    left_idx, ref_idx = left_idx[order], ref_idx[order]
+    result = pd.concat([left.iloc[left_idx].reset_index(drop=True),
+                        ref.drop(columns=[strt_col, end_col]).iloc[ref_idx].reset_index(drop=True)], axis=1)
+    return result
+
+
+def merge_reference(left, ref, on='DD', strt_col='STRT_DD', end_col='END_DD'):
+    """ 기준정보 테이블을 일자별로 붙임
+    * ref 에 일자(on) 컬럼이 있으면(캐시에서 읽은 일자별 행, loadData.fetch_tables_cached) 일자로 바로 붙이고,
+      없으면 유효기간으로 펼쳐 붙임 (merge_effective_dated). 결과 컬럼 순서는 같음
+    """
+    if on not in ref.columns:
+        return merge_effective_dated(left, ref, on, strt_col, end_col)
+    return pd.merge(left, ref.drop(columns=[strt_col, end_col]), on=on, how='inner')
+
+
+def compact_table(frame):
+    """ 조회결과의 컬럼을 DATE_COLS, CATEGORY_COLS, INT_COLS 형식으로 변환 (조인 키 ISU_CD, ULY_ID 는 그대로 둠)
+    """
+    frame = frame.copy(deep=False)
+    for col in frame.columns:
+        if col in DATE_COLS:
+            dates = pd.to_numeric(frame[col], errors='coerce')
+            frame[col] = dates.astype('Int32') if dates.isna().any() else dates.astype(np.int32)
+        elif col in CATEGORY_COLS:
+            frame[col] = frame[col].astype('category')
+        elif col in INT_COLS:
+            values = pd.to_numeric(frame[col], errors='coerce')
+            if (values.dropna() % 1 == 0).all():
+                frame[col] = values.astype(INT_COLS[col])
+    return frame
+
+
+def compact_raw_data(rawData, drop_debug_cols=DROP_DEBUG_COLS):
+    """ 조인이 끝난 rawData 의 조인 키를 category 로 바꾸고, drop_debug_cols 이면 DEBUG_COLS 를 버림
+    """
+    for col in KEY_CATEGORY_COLS:
+        if col in rawData.columns:
+            rawData[col] = rawData[col].astype('category')
+    if drop_debug_cols:
+        rawData = rawData.drop(columns=[col for col in DEBUG_COLS if col in rawData.columns])
+    return rawData
+
+
+def merge_left(left, right, on, right_on=None):
+    """ pd.merge(left, right, left_on=on, right_on=right_on, how='left') 와 같은 결과
+    * right 의 키가 유일하면 키 인덱스로 행 위치를 찾아 right 컬럼만 left 에 붙임 (left 를 복사하지 않고 그대로 바꿈)
+    * 키가 중복되면 pd.merge 사용
+    """
+    right_on = on if right_on is None else right_on
+    right_keys = pd.MultiIndex.from_frame(right[right_on])
+    if not right_keys.is_unique:
+        return pd.merge(left, right, left_on=on, right_on=right_on, how='left')
+    pos = right_keys.get_indexer(pd.MultiIndex.from_frame(left[on]))
+    shared = [r for l, r in zip(on, right_on) if l == r]
+    for col in right.columns:
+        if col not in shared:
+            values = right[col]
+            if values.dtype.kind in 'iu':
+                values = values.astype(values.dtype.name.capitalize())     # 없는 행이 NA 가 되도록 nullable 정수로
+            if isinstance(values.dtype, pd.api.extensions.ExtensionDtype):
+                taken = values.array.take(pos, allow_fill=True)
+            else:
+                taken = pd.api.extensions.take(values.to_numpy(), pos, allow_fill=True)    # 없는 행은 NaN
+            left[col] = pd.Series(taken, index=left.index)
+    return left
+
+
+# 이론가 산출방법 규칙 : 위에서부터 처음으로 모든 조건을 만족하는 규칙의 산출방법을 사용 (스프레드, 산출대상 아님, 별표 순)
+# 조건은 (컬럼, 'in' 또는 'notin', 값 목록)
+HOW_CALC_RULES = [
+    ("스프레드", [('SPD_COMPST_CD', 'notin', [' '])]),
+    ("이론가 산출대상 상품 아님", [('FORPRC_ULY_ID', 'in', ["VKI", "XA4", "XA5", "EST"])]),
+    ("별표7", [('MKT_DTL_ID', 'in', ["SPI"]), ('ULY_TP_CD', 'in', ["IDX"]), ('RGHT_TP_CD', 'in', ["F"])]),
+    ("별표8", [('MKT_DTL_ID', 'in', ["EQU"]), ('ULY_TP_CD', 'in', ["EQU"]), ('RGHT_TP_CD', 'in', ["F"])]),
+    ("별표9", [('ULY_TP_CD', 'in', ["BON"]), ('RGHT_TP_CD', 'in', ["F"])]),
+    ("별표9의2", [('ULY_TP_CD', 'in', ["IRT"]), ('RGHT_TP_CD', 'in', ["F"])]),
+    ("별표12", [('ULY_TP_CD', 'in', ["CUR"]), ('RGHT_TP_CD', 'in', ["F"])]),
+    ("별표13", [('ULY_TP_CD', 'in', ["COM"]), ('FORPRC_ULY_ID', 'in', ["KGD"]), ('RGHT_TP_CD', 'in', ["F"])]),
+    ("별표15", [('MKT_DTL_ID', 'in', ["SPI"]), ('ULY_TP_CD', 'in', ["IDX"]), ('RGHT_TP_CD', 'in', ["C", "P"])]),
+    ("별표16", [('MKT_DTL_ID', 'in', ["EQU"]), ('ULY_TP_CD', 'in', ["EQU"]), ('RGHT_TP_CD', 'in', ["C", "P"])]),
+    ("별표17", [('ULY_TP_CD', 'in', ["CUR"]), ('FORPRC_ULY_ID', 'in', ["USD"]), ('RGHT_TP_CD', 'in', ["C", "P"])]),
+]
+HOW_CALC_DEFAULT = ""       # 어느 규칙에도 맞지 않는 경우
+
+# 배당가치 규칙 : (산출방법 목록, DIV_VAL 로 사용할 컬럼). 해당 없으면 NaN
+DIV_VAL_RULES = [
+    (["별표7", "별표8", "별표8의2"], 'FSETLPRC_DIV_FUT_VAL'),
+    (["별표15", "별표16"], 'FSETLPRC_DIV_PRSNT_VAL'),
+]
+
+
+def howCalcTheo_batch(rawData):
+    """ 어떤 공식(파생상품시장 업무규정 시행세칙의 별표번호)으로 이론가격을 산출할지 DataFrame 전체에 한 번에 결정
+    * HOW_CALC_RULES 를 컬럼별 mask 로 평가
+
     ** 참고 : 이론가격이 산출되지 않는 예외 규정
     * 나. 코스피고배당50선물거래, 코스피배당성장50선물거래, 코스피200변동성지수선물거래 및 돈육선물거래의 경우: 전일의 기초자산기준가격
     * 다. 해외지수선물거래의 경우: 최종거래일이 동일한 유렉스 유로스톡스50선물의 정산가격(유렉스가 정하는 기준과 방법에 따라 산출하는 최종거래일이 동일한 결제월종목의 직전 거래일 전일의 정산가격을 말한다)
-    
-    Args:
-        rawData : 이론가격 산출 기초정보
 
     Return:
-        이론가를 산출하는 파생상품시장 업무규정 시행세칙의 별표번호를 return      
+        행별 산출방법 (Categorical)
     """
-    uly_id = rawData['FORPRC_ULY_ID'] 
-    mkt_dtl_id = rawData['MKT_DTL_ID'] 
-    uly_tp_cd = rawData['ULY_TP_CD'] 
-    RGHT_TP_CD = rawData['RGHT_TP_CD'] 
-    SPD_COMPST_CD = rawData['SPD_COMPST_CD']
-    if SPD_COMPST_CD != ' ':
-        how_calc_cd = "스프레드"
-    elif uly_id in ["VKI", "XA4", "XA5", "XA4", "EST"]:
-        how_calc_cd = "이론가 산출대상 상품 아님"
-    elif mkt_dtl_id in ["SPI"] and uly_tp_cd in ["IDX"] and RGHT_TP_CD=="F":
-        how_calc_cd = "별표7"
-    elif mkt_dtl_id in ["EQU"] and uly_tp_cd in ["EQU"] and RGHT_TP_CD=="F":
-        how_calc_cd = "별표8"
-    elif uly_tp_cd in ["BON"] and RGHT_TP_CD=="F":
-        how_calc_cd = "별표9"
-    elif uly_tp_cd in ["IRT"] and RGHT_TP_CD=="F":
-        how_calc_cd = "별표9의2"
-    elif uly_tp_cd in ["CUR"] and RGHT_TP_CD=="F":
-        how_calc_cd = "별표12"
-    elif uly_tp_cd in ["COM"] and uly_id in ["KGD"] and RGHT_TP_CD=="F":
-        how_calc_cd = "별표13"
-    elif mkt_dtl_id in ["SPI"] and uly_tp_cd in ["IDX"] and RGHT_TP_CD in ["C", "P"]:
-        how_calc_cd = "별표15"
-    elif mkt_dtl_id in ["EQU"] and uly_tp_cd in ["EQU"] and RGHT_TP_CD in ["C", "P"]:
-        how_calc_cd = "별표16"
-    elif uly_tp_cd in ["CUR"] and uly_id in ["USD"] and RGHT_TP_CD in ["C", "P"]:
-        how_calc_cd = "별표17"
-    else: how_calc_cd = ""
-    rawData['HOW_CALC_CD'] = how_calc_cd
-    return rawData
+    masks = {}
+    conditions = []
+    for _, rule in HOW_CALC_RULES:
+        cond = np.ones(len(rawData), dtype=bool)
+        for col, op, values in rule:
+            key = (col, tuple(values))
+            if key not in masks:
+                masks[key] = rawData[col].isin(values).to_numpy()
+            cond &= masks[key] if op == 'in' else ~masks[key]
+        conditions.append(cond)
+    categories = [how_calc_cd for how_calc_cd, _ in HOW_CALC_RULES] + [HOW_CALC_DEFAULT]
+    codes = np.select(conditions, np.arange(len(HOW_CALC_RULES)), default=len(HOW_CALC_RULES))
+    return pd.Categorical.from_codes(codes, categories=categories)
 
 
-def calucTheoPriceFromDF(rawData):
-    """Pandas의 DataFrame에서 이론가 산출 기본정보를 가져와 이론가를 산출
+def read_div_val_batch(rawData):
+    """ 산출방법별 배당가치(DIV_VAL) 컬럼 선택을 DataFrame 전체에 한 번에 적용 (DIV_VAL_RULES)
+
+    Return:
+        행별 배당가치 배열
     """
-    if rawData['SPD_COMPST_CD'] != ' ':
-        rawData['THEO_PRC'] = 0
-        return rawData
-    rght_tp_cd = rawData['RGHT_TP_CD']
-    uly_prc = rawData['ULY_PRC']
-    exer_prc = rawData['EXER_PRC']
-    remain_dys = rawData['REMAIN_DYS']
-    volt_annual = rawData['FINAL_VOLT']
     how_calc_cd = rawData['HOW_CALC_CD']
-        
-    dom_riskfre_int = rawData['DOM_RISKFRE_INT']
-    forn_riskfre_int = rawData['FORN_RISKFRE_INT']
-    
-    stdgood_bnd_exp = rawData['STDGOOD_BND_EXP']    
-    bnd_yd = rawData['BND_YD']    
-    div_val = rawData['DIV_VAL']
-    storg_cost = rawData['STORG_COST']
-    if how_calc_cd == "별표9의2":
-        rawData['THEO_PRC'] = calcTheoPrice.calcTheoPriceRFR(rawData['LSTTRD_DD'], rawData['APPL_STRT_DD'], rawData['APPL_END_DD'], rawData['FINAL_YN'], rawData['FINAL_INT'], rawData['MM3_GOVBND_STRIP_INT'], rawData['FWD_INT'], rawData['INT_SPD'], rawData['DD'])
+    conditions = [how_calc_cd.isin(codes).to_numpy() for codes, _ in DIV_VAL_RULES]
+    choices = [pd.to_numeric(rawData[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan) for _, col in DIV_VAL_RULES]
+    return np.select(conditions, choices, default=np.nan)
+
+
+def calucTheoPriceFromDF_batch(rawData, timer=None):
+    """Pandas의 DataFrame 전체를 한 번에 이론가 산출 (스프레드 종목은 0)
+    * timer(stageTimer.StageTimer)를 주면 산출방법(HOW_CALC_CD)별로 나누어 산출하고 별표별 종목 수와 산출시간을 기록
+    """
+    if timer is None:
+        theo_prc = calcTheoPrice.calcTheoPrice_batch(rawData['ULY_PRC'], rawData['EXER_PRC'], rawData['REMAIN_DYS'], rawData['DOM_RISKFRE_INT'], rawData['FORN_RISKFRE_INT'],
+            rawData['DIV_VAL'], rawData['FINAL_VOLT'], rawData['RGHT_TP_CD'], rawData['HOW_CALC_CD'], rawData['STDGOOD_BND_EXP'], rawData['BND_YD'], rawData['STORG_COST'])
+
+        is_rfr = (rawData['HOW_CALC_CD'] == "별표9의2").to_numpy()
+        if is_rfr.any():
+            rfr = rawData.loc[is_rfr]
+            theo_prc[is_rfr] = calcTheoPrice.calcTheoPriceRFR_batch(rfr['LSTTRD_DD'], rfr['APPL_STRT_DD'], rfr['APPL_END_DD'], rfr['FINAL_YN'], rfr['FINAL_INT'], rfr['MM3_GOVBND_STRIP_INT'], rfr['FWD_INT'], rfr['INT_SPD'], rfr['DD'])
     else:
-        rawData['THEO_PRC'] = calcTheoPrice.calcTheoPrice(uly_prc, exer_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, div_val, volt_annual, rght_tp_cd, how_calc_cd, stdgood_bnd_exp, bnd_yd, storg_cost)
-    rawData['THEO_PRC_DIFF_DB_AND_PYTHON'] = rawData['THEO_PRC'] - rawData['THEO_PRC_DB']
-    
+        theo_prc = np.zeros(len(rawData))
+        for how_calc_cd, idx in rawData.groupby('HOW_CALC_CD', observed=True, sort=False).indices.items():
+            with timer.formula(how_calc_cd, len(idx)):
+                rows = rawData.iloc[idx]
+                if how_calc_cd == "별표9의2":
+                    theo_prc[idx] = calcTheoPrice.calcTheoPriceRFR_batch(rows['LSTTRD_DD'], rows['APPL_STRT_DD'], rows['APPL_END_DD'], rows['FINAL_YN'], rows['FINAL_INT'], rows['MM3_GOVBND_STRIP_INT'], rows['FWD_INT'], rows['INT_SPD'], rows['DD'])
+                else:
+                    theo_prc[idx] = calcTheoPrice.calcTheoPrice_batch(rows['ULY_PRC'], rows['EXER_PRC'], rows['REMAIN_DYS'], rows['DOM_RISKFRE_INT'], rows['FORN_RISKFRE_INT'],
+                        rows['DIV_VAL'], rows['FINAL_VOLT'], rows['RGHT_TP_CD'], rows['HOW_CALC_CD'], rows['STDGOOD_BND_EXP'], rows['BND_YD'], rows['STORG_COST'])
+    theo_prc[(rawData['SPD_COMPST_CD'] != ' ').to_numpy()] = 0
+
+    rawData['THEO_PRC'] = theo_prc
+    rawData['THEO_PRC_DIFF_DB_AND_PYTHON'] = theo_prc_diff(rawData)
     return rawData
 
 
-def calc_remain_dys_next_day(df, df_old, custom_bd):
-    isu_cd = df['ISU_CD']
-    dd = df['DD']
-    next_day = next_n_business_day(dd, 1, custom_bd)
-    if df_old.loc[(df_old['ISU_CD'] == isu_cd) & (df_old['DD'] == next_day), 'REMAIN_DYS'].empty:
-        next_remain_dys = 0
-    else:
-        next_remain_dys = df_old.loc[(df_old['ISU_CD'] == isu_cd) & (df_old['DD'] == next_day), 'REMAIN_DYS'].values[0]    
-    return next_remain_dys
+def theo_prc_diff(rawData):
+    """ 이론가 차이(산출-DB). 스프레드 종목은 비교하지 않음(NaN)
+    """
+    return (rawData['THEO_PRC'] - rawData['THEO_PRC_DB']).where(rawData['SPD_COMPST_CD'] == ' ')
+
+
+def calcImpliedVoltFromDF(rawData, prc_col='THEO_PRC_DB'):
+    """ 옵션 가격(prc_col, 기본은 DB 이론가)으로 내재변동성을 역산하여 FINAL_VOLT 와 비교
+    * IMPL_VOLT : 내재변동성 (옵션이 아니거나 역산되지 않으면 NaN)
+    * IMPL_VOLT_DIFF : 내재변동성 - FINAL_VOLT
+    """
+    volt, _ = impliedVolt.impliedVolt_batch(rawData[prc_col], rawData['ULY_PRC'], rawData['EXER_PRC'], rawData['REMAIN_DYS'], rawData['DOM_RISKFRE_INT'],
+        rawData['FORN_RISKFRE_INT'], rawData['DIV_VAL'], rawData['RGHT_TP_CD'], rawData['HOW_CALC_CD'], volt_init=rawData['FINAL_VOLT'])
+    rawData['IMPL_VOLT'] = volt
+    rawData['IMPL_VOLT_DIFF'] = rawData['IMPL_VOLT'] - rawData['FINAL_VOLT']
+    return rawData
+
+
+def make_result(rawData):
+    """ 이론가 산출결과(rawData)에서 결과 파일 컬럼만 골라 한글 컬럼명으로 바꿈
+    """
+    columns = dict(RESULT_COLUMNS)
+    columns.update({col: name for col, name in IMPL_VOLT_COLUMNS.items() if col in rawData.columns})
+    return rawData[list(columns)].rename(columns=columns)
+
+
+def write_by_day(rawData, sinks, timer=None, implied_volt=CALC_IMPLIED_VOLT):
+    """ 일자(DD)별로 이론가를 산출하여, 하루치가 끝날 때마다 sink 에 씀
+    * sinks : [(sink, rawData 를 sink 에 쓸 형태로 바꾸는 함수(None 이면 그대로)), ...]
+    * implied_volt 이면 이론가 산출 뒤 내재변동성도 역산 (calcImpliedVoltFromDF)
+    * timer(stageTimer.StageTimer)를 주면 일자별 'price', 'implied_volt', 'export:sink 종류' 단계로 기록
+    """
+    for dd, dayData in rawData.groupby('DD', sort=True):
+        with stageTimer.stage(timer, "price", dd=int(dd)) as stage:
+            dayData = calucTheoPriceFromDF_batch(dayData, timer).reset_index(drop=True)
+            stage.rows = len(dayData)
+        if implied_volt:
+            with stageTimer.stage(timer, "implied_volt", dd=int(dd)) as stage:
+                dayData = calcImpliedVoltFromDF(dayData)
+                stage.rows = len(dayData)
+        for sink, transform in sinks:
+            with stageTimer.stage(timer, f"export:{type(sink).__name__}", dd=int(dd), path=sink.path) as stage:
+                stage.rows = len(dayData)
+                sink.write(dayData if transform is None else transform(dayData))
+
+
+def calc_remain_dys_next_day_batch(df, df_old, custom_bd):
+    """ df 의 행별로 같은 종목의 다음 영업일 잔존일수(df_old 의 REMAIN_DYS, 없으면 0)를 Series 로 산출
+    * 다음 영업일은 일자(DD)별로 한 번만 구하고, REMAIN_DYS 는 (ISU_CD, DD) 인덱스로 한 번에 조회
+    * 다음 영업일('YYYYMMDD')은 df_old['DD'] 형식(정수 일자 등)으로 바꾸어 찾음
+    """
+    dd_codes, dd_uniques = pd.factorize(df['DD'])
+    next_days = custom_bd.next_n_business_day(np.asarray(dd_uniques, dtype=object), 1)
+    next_days = np.asarray(next_days).astype(df_old['DD'].to_numpy().dtype)
+
+    old_remain_dys = df_old.drop_duplicates(subset=['ISU_CD', 'DD'], keep='first').set_index(['ISU_CD', 'DD'])['REMAIN_DYS']
+    loc = old_remain_dys.index.get_indexer(pd.MultiIndex.from_arrays([df['ISU_CD'].to_numpy(), next_days[dd_codes]]))
+    next_remain_dys = np.where(loc >= 0, old_remain_dys.to_numpy()[loc], 0)
+    return pd.Series(next_remain_dys, index=df.index, name='NEXT_REMAIN_DYS')
 
 # 잔존일수 계산
 def calc_remaindys(dd, exp_dd, inclusive):    
-    dd = pd.to_datetime(dd, format='%Y%m%d')
-    exp_dd = pd.to_datetime(exp_dd, format='%Y%m%d')
-    dates=pd.date_range(start=dd, end=exp_dd, inclusive=inclusive)
-    return len(dates)
+    return bizCalendar.count_days(dd, exp_dd, inclusive)
 
-def read_div_val(rawData):
-    how_calc_cd = rawData['HOW_CALC_CD']
-    if how_calc_cd in ["별표7", "별표8", "별표8의2"]:
-        rawData['DIV_VAL'] = rawData['FSETLPRC_DIV_FUT_VAL']
-    elif how_calc_cd in ["별표15", "별표16"]:
-        rawData['DIV_VAL'] = rawData['FSETLPRC_DIV_PRSNT_VAL']
-    return rawData
+def load_calendar(pool, cache=None, timer=None):
+    """ 휴장일(TBCS_HOLDY)을 조회하여 영업일 달력을 만듦 (cache 를 주면 캐시에서 읽음)
 
-        
-### 실행시, 기본적으로 특정일자(DAY)의 모든 종목에 대해 이론가를 산출
-### * 리스트로 특정 종목만 지정시, 특정 종목에 대해서만 산출
-if __name__ == "__main__":
-    if (END_DD < STRT_DD):
-        print("Date error : END_DD should be equal or greater than STRT_DD")
-        exit()
-    rawData_columns = []
-    rawData = pd.DataFrame(columns=rawData_columns)
-    
-    # Oracle DB 접속
-    conn_oracle = orcl.RDB_client(env)    
-
-    conn_oracle.cursor.execute(f"SELECT * FROM TBCS_HOLDY WHERE CALND_ID = 'COMMON'")
-    TBCS_HOLDY = pd.DataFrame(conn_oracle.cursor.fetchall(), columns=conn_oracle.get_column_names())
-    custom_bd = makeCustomBd(TBCS_HOLDY)
-
-    rawData['DD'] = make_biz_days(STRT_DD, END_DD, custom_bd).strftime('%Y%m%d')
-
-    # 종목정보를 TBCS_DRV_ISU 에서 가져오기
-    conn_oracle.cursor.execute(f"SELECT STRT_DD, END_DD, ISU_CD, ISU_KOR_NM, PROD_ID, ULY_ID, FORPRC_ULY_ID, SPD_COMPST_CD, ULY_TP_CD, RGHT_TP_CD, EXER_PRC, EXP_DD, MKT_DTL_ID FROM TBCS_DRV_ISU WHERE END_DD >='{STRT_DD}' AND STRT_DD<='{END_DD}'")
-    TBCS_DRV_ISU = pd.DataFrame(conn_oracle.cursor.fetchall(), columns=conn_oracle.get_column_names())  
-
-    rawData2 = pd.merge(rawData, TBCS_DRV_ISU, how='cross')
-    rawData2 = rawData2[(rawData2['STRT_DD']<=rawData2['DD']) & (rawData2['END_DD']>=rawData2['DD'])]  
-    rawData2.drop(columns=['STRT_DD', 'END_DD'], inplace=True)
-
-    # 국채만기 정보를 TBCS_ULY 에서 가져오기
-    conn_oracle.cursor.execute(f"SELECT STRT_DD, END_DD, ULY_ID, STDGOOD_BND_EXP FROM TBCS_ULY WHERE END_DD >='{STRT_DD}' AND STRT_DD<='{END_DD}'")    
-    TBCS_ULY = pd.DataFrame(conn_oracle.cursor.fetchall(), columns=conn_oracle.get_column_names())  
-    rawData3 = pd.merge(rawData, TBCS_ULY, how='cross')
-    rawData3 = rawData3[(rawData3['STRT_DD']<=rawData3['DD']) & (rawData3['END_DD']>=rawData3['DD'])]  
-    rawData3.drop(columns=['STRT_DD', 'END_DD'], inplace=True) 
-    rawData = pd.merge(rawData2, rawData3, on=['DD', 'ULY_ID'], how='left')    
-
-    # 금시장 보관료를 TBCS_STORG_COST 에서 가져오기
-    conn_oracle.cursor.execute(f"SELECT DD, ULY_ID, STORG_COST FROM TBCS_STORG_COST WHERE DD BETWEEN '{STRT_DD}' AND '{END_DD}'")
-    TBCS_STORG_COST = pd.DataFrame(conn_oracle.cursor.fetchall(), columns=conn_oracle.get_column_names())
-    rawData = pd.merge(rawData, TBCS_STORG_COST, on=['DD', 'ULY_ID'], how='left')    
-
-    # 기초자산기준가격, 잔존일수, 금리, 국채수익률를 TBCS_THEO_PRC_VAR 에서 가져오기
-    conn_oracle.cursor.execute(f"SELECT CALC_DD, ISU_CD, ULY_PRC, REMAIN_DYS, DOM_RISKFRE_INT, FORN_RISKFRE_INT, BND_YD FROM TBCS_THEO_PRC_VAR WHERE CALC_DD BETWEEN '{previous_n_business_day(STRT_DD,1,custom_bd)}' AND '{END_DD}' AND THEO_PRC_USE_TP_CD='{THEO_PRC_USE_TP_CD}' AND SEQ='1'")
-    TBCS_THEO_PRC_VAR = pd.DataFrame(conn_oracle.cursor.fetchall(), columns=conn_oracle.get_column_names())
-    rawData = pd.merge(rawData, TBCS_THEO_PRC_VAR, left_on=['DD', 'ISU_CD'], right_on=['CALC_DD', 'ISU_CD'], how='left')
-    
-    conn_oracle.cursor.execute(f"SELECT DD, ISU_CD, FINAL_VOLT, FINAL_VOLT_TP_CD FROM TBCS_VOLT WHERE DD BETWEEN '{STRT_DD}' AND '{END_DD}'")  # 
-    TBCS_VOLT = pd.DataFrame(conn_oracle.cursor.fetchall(), columns=conn_oracle.get_column_names())
-    rawData = pd.merge(rawData, TBCS_VOLT, on=['DD','ISU_CD'], how='left')
+    Return:
+        custom_bd : 영업일 달력(BusinessCalendar)
+        TBCS_HOLDY : 휴장일 DataFrame
+    """
+    with stageTimer.stage(timer, "fetch:TBCS_HOLDY") as stage:
+        if cache is None:
+            TBCS_HOLDY = loadData.fetch_table(pool, loadData.HOLDY_SQL)
+        else:
+            TBCS_HOLDY = cache.load_static('TBCS_HOLDY', lambda: loadData.fetch_table(pool, loadData.HOLDY_SQL))
+        stage.frame(TBCS_HOLDY)
+    return makeBizCalendar(TBCS_HOLDY), TBCS_HOLDY
+
+
+def load_source_tables(pool, strt_dd, end_dd, theo_prc_use_tp_cd=THEO_PRC_USE_TP_CD, prc_tp_cd=PRC_TP_CD, cache=None, timer=None):
+    """ 이론가 산출에 필요한 테이블을 DB에서 조회
+    * 휴장일(TBCS_HOLDY)로 영업일 달력을 먼저 만들고, 나머지 테이블은 커넥션 풀로 동시에 조회
+    * cache(snapshotCache.SnapshotCache)를 주면 캐시에 없는 일자만 DB에서 조회
+
+    Return:
+        custom_bd : 영업일 달력(BusinessCalendar)
+        tables : 테이블명별 DataFrame dict
+    """
+    custom_bd, TBCS_HOLDY = load_calendar(pool, cache, timer)
+
+    prev_dd = previous_n_business_day(strt_dd, 1, custom_bd)
+    if cache is None:
+        tables = loadData.fetch_tables(pool, loadData.make_queries(strt_dd, end_dd, prev_dd, theo_prc_use_tp_cd, prc_tp_cd), timer=timer)
+    else:
+        windows = loadData.make_windows(strt_dd, end_dd, prev_dd, theo_prc_use_tp_cd)
+        tables = loadData.fetch_tables_cached(pool, cache, custom_bd, windows, theo_prc_use_tp_cd, prc_tp_cd, timer=timer)
+    tables['TBCS_HOLDY'] = TBCS_HOLDY
+    return custom_bd, tables
+
+
+def build_raw_data(tables, custom_bd, strt_dd, end_dd, theo_prc_use_tp_cd=THEO_PRC_USE_TP_CD, timer=None):
+    """ 조회한 테이블을 일자(DD), 종목(ISU_CD) 기준으로 붙여 이론가 산출 기초정보(rawData)를 생성
+    * timer(stageTimer.StageTimer)를 주면 테이블별 'merge:테이블명' 단계로 기록
+    """
+    with stageTimer.stage(timer, "compact:tables") as stage:
+        tables = {name: compact_table(table) for name, table in tables.items()}
+        stage.rows = sum(len(table) for table in tables.values())
+    rawData = compact_table(pd.DataFrame({'DD': make_biz_days(strt_dd, end_dd, custom_bd)}))
+
+    # 종목정보(TBCS_DRV_ISU)
+    with stageTimer.stage(timer, "merge:TBCS_DRV_ISU") as stage:
+        rawData2 = stage.frame(merge_reference(rawData, tables['TBCS_DRV_ISU']))
+
+    # 국채만기 정보(TBCS_ULY)
+    with stageTimer.stage(timer, "merge:TBCS_ULY") as stage:
+        rawData3 = merge_reference(rawData, tables['TBCS_ULY'])
+        rawData = stage.frame(pd.merge(rawData2, rawData3, on=['DD', 'ULY_ID'], how='left'))
 
-    # 산출된 이론가 값을 DB(TBCS_THEO_PRC)에서 가져오기
-    if THEO_PRC_USE_TP_CD == '01':  
-        conn_oracle.cursor.execute(f"SELECT DD, ISU_CD, VOLT_TP_CD, SETL_THEO_PRC AS THEO_PRC_DB, '01' AS THEO_PRC_USE_TP_CD FROM TBCS_THEO_PRC WHERE DD BETWEEN '{STRT_DD}' AND '{END_DD}'")  # 
-        TBCS_THEO_PRC = pd.DataFrame(conn_oracle.cursor.fetchall(), columns=conn_oracle.get_column_names())         
-        FILTERED_TBCS_THEO_PRC = TBCS_THEO_PRC[TBCS_THEO_PRC['VOLT_TP_CD'].isin(['00', 'BV'])].sort_values(by=['ISU_CD', 'VOLT_TP_CD'], ascending=[True, False]).drop_duplicates(subset=['DD','ISU_CD'], keep='first')
-        rawData = pd.merge(rawData, FILTERED_TBCS_THEO_PRC, on=['DD','ISU_CD'], how='left')    
+    # 금시장 보관료(TBCS_STORG_COST)
+    with stageTimer.stage(timer, "merge:TBCS_STORG_COST") as stage:
+        rawData = stage.frame(merge_left(rawData, tables['TBCS_STORG_COST'], on=['DD', 'ULY_ID']))
+
+    # 기초자산기준가격, 잔존일수, 금리, 국채수익률(TBCS_THEO_PRC_VAR)
+    with stageTimer.stage(timer, "merge:TBCS_THEO_PRC_VAR") as stage:
+        rawData = stage.frame(merge_left(rawData, tables['TBCS_THEO_PRC_VAR'], on=['DD', 'ISU_CD'], right_on=['CALC_DD', 'ISU_CD']))
+    with stageTimer.stage(timer, "merge:TBCS_VOLT") as stage:
+        rawData = stage.frame(merge_left(rawData, tables['TBCS_VOLT'], on=['DD', 'ISU_CD']))
+
+    # 산출된 이론가 값(TBCS_THEO_PRC)
+    if theo_prc_use_tp_cd == '01':  
+        with stageTimer.stage(timer, "merge:TBCS_THEO_PRC") as stage:
+            TBCS_THEO_PRC = tables['TBCS_THEO_PRC']
+            FILTERED_TBCS_THEO_PRC = TBCS_THEO_PRC[TBCS_THEO_PRC['VOLT_TP_CD'].isin(['00', 'BV'])].sort_values(by=['ISU_CD', 'VOLT_TP_CD'], ascending=[True, False]).drop_duplicates(subset=['DD','ISU_CD'], keep='first')
+            rawData = stage.frame(merge_left(rawData, FILTERED_TBCS_THEO_PRC, on=['DD', 'ISU_CD']))
 
     # 기초자산기준가격은 TBCS_ULY_BAS_PRC에서 가져오기
     # conn_oracle.cursor.execute((f"SELECT DISTINCT TBCS_BYDD_DRV_ISU.DD, TBCS_ULY_BAS_PRC.FORPRC_ULY_ID, TBCS_ULY_BAS_PRC.TRD_PERSIS_ULY_BAS_PRC from TBCS_BYDD_DRV_ISU, TBCS_ULY_BAS_PRC "
@@ -240,31 +447,131 @@ if __name__ == "__main__":
 
     # print(rawData.columns)
     #         
-    rawData = rawData.apply(howCalcTheo, axis=1)
+    with stageTimer.stage(timer, "classify") as stage:
+        rawData['HOW_CALC_CD'] = howCalcTheo_batch(rawData)
+        stage.rows = len(rawData)
         
-    # 배당 현재가치는 TBCS_DVAL에서 가져오기
-    conn_oracle.cursor.execute((f"SELECT TBCS_BYDD_DRV_ISU.DD, TBCS_BYDD_DRV_ISU.ISU_CD, TBCS_DVAL.FSETLPRC_DIV_PRSNT_VAL, TBCS_DVAL.FSETLPRC_DIV_FUT_VAL, TBCS_DVAL.FBASPRC_DIV_PRSNT_VAL, TBCS_DVAL.FBASPRC_DIV_FUT_VAL, TBCS_DVAL.AFADJ_DIV_PRSNT_VAL, TBCS_DVAL.AFADJ_DIV_FUT_VAL, TBCS_DVAL.AFEXDIV_DIV_PRSNT_VAL, TBCS_DVAL.AFEXDIV_DIV_FUT_VAL FROM TBCS_BYDD_DRV_ISU, TBCS_DVAL "
-        f"where TBCS_BYDD_DRV_ISU.DD BETWEEN '{STRT_DD}' AND '{END_DD}' AND TBCS_BYDD_DRV_ISU.DD = TBCS_DVAL.DD "
-        f"AND TBCS_BYDD_DRV_ISU.PROD_ID = TBCS_DVAL.PROD_ID "
-        f"AND TBCS_BYDD_DRV_ISU.EXPMM = TBCS_DVAL.EXPMM"))
-    rows = pd.DataFrame(conn_oracle.cursor.fetchall(), columns=conn_oracle.get_column_names())
-    rawData = pd.merge(rawData, rows, on=['DD', 'ISU_CD'], how='left')
-    rawData = rawData.apply(read_div_val, axis=1)    
+    # 배당 현재가치(TBCS_DVAL)
+    with stageTimer.stage(timer, "merge:TBCS_DVAL") as stage:
+        rawData = stage.frame(merge_left(rawData, tables['TBCS_DVAL'], on=['DD', 'ISU_CD']))
+    with stageTimer.stage(timer, "div_val") as stage:
+        rawData['DIV_VAL'] = read_div_val_batch(rawData)
+        stage.rows = len(rawData)
         
-    # RFR 금리 가져오기
-    conn_oracle.cursor.execute((f"SELECT DD, ISU_CD, LSTTRD_DD, APPL_STRT_DD, APPL_END_DD, FINAL_YN, FINAL_INT, MM3_GOVBND_STRIP_INT, FWD_INT, INT_SPD, THEO_INT FROM TBCS_THEO_PRC_RFR_FUT WHERE DD BETWEEN '{STRT_DD}' AND '{END_DD}' AND PRC_TP_CD = '{PRC_TP_CD}'"))
-    TBCS_THEO_PRC_RFR_FUT = pd.DataFrame(conn_oracle.cursor.fetchall(), columns=conn_oracle.get_column_names())
-    rawData = pd.merge(rawData, TBCS_THEO_PRC_RFR_FUT, on=['DD', 'ISU_CD'], how='left')
-
-    rawData = rawData.apply(calucTheoPriceFromDF, axis=1)
-    rawData = rawData.reset_index(drop=True)
-    rawData.to_excel(f"rawdata_theoPrcFromCSDB_{env}_{STRT_DD}_{END_DD}.xlsx")
-    
-    result = rawData[['DD', 'ISU_CD', 'ULY_ID', 'FORPRC_ULY_ID', 'ULY_TP_CD', 'PROD_ID', 'ISU_KOR_NM',
-     'THEO_PRC_USE_TP_CD', 'RGHT_TP_CD', 'EXER_PRC', 'ULY_PRC', 'REMAIN_DYS', 'DOM_RISKFRE_INT', 'FORN_RISKFRE_INT', 'FINAL_VOLT', 'FINAL_VOLT_TP_CD', 'DIV_VAL', 'BND_YD', "STORG_COST",
-      'THEO_PRC_DB', 'THEO_PRC', 'THEO_PRC_DIFF_DB_AND_PYTHON', 'HOW_CALC_CD']]
-    result_columns = ["일자", "종목코드","기초자산ID", "가격용기초자산ID", "기초자산유형코드", "상품ID", "종목한글명",
-     "이론가격용용도구분코드(01:정산가/증거금기준가용, 02:기준가/호가한도계산용)", "선물옵션구분코드", "행사가격", "기초자산가격", "잔존일수", "국내무위험금리", "해외무위험금리", "내재변동성", "변동성유형코드", "배당가치", "채권수익률", "금선물 g당 보관료",
-      "이론가격(DB)", "이론가격(산출)", "이론가격 차이(산출-DB)", "산출방법"]    
-    result.columns = result_columns
-    result.to_excel(f"result_theoPrcFromCSDB_{env}_{STRT_DD}_{END_DD}.xlsx")
+    # RFR 금리(TBCS_THEO_PRC_RFR_FUT)
+    with stageTimer.stage(timer, "merge:TBCS_THEO_PRC_RFR_FUT") as stage:
+        rawData = stage.frame(merge_left(rawData, tables['TBCS_THEO_PRC_RFR_FUT'], on=['DD', 'ISU_CD']))
+    with stageTimer.stage(timer, "compact:rawData") as stage:
+        return stage.frame(compact_raw_data(rawData))
+
+
+def load_input_set(pool, strt_dd, end_dd, theo_prc_use_tp_cd=THEO_PRC_USE_TP_CD, prc_tp_cd=PRC_TP_CD, timer=None):
+    """ build_raw_data 의 조인과 DB 이론가 중복제거를 DB 에서 처리한 결과(loadData.make_input_set_query)를 한 번에 조회하여
+        산출방법(HOW_CALC_CD), 배당가치(DIV_VAL)만 붙임. 컬럼 구성과 순서는 build_raw_data 와 같음
+    * 행은 일자, 종목코드 순 (build_raw_data 와 같은 행이지만, 일자 안의 행 순서는 다를 수 있음)
+    """
+    with stageTimer.stage(timer, "fetch:INPUT_SET", strt_dd=strt_dd, end_dd=end_dd) as stage:
+        rawData = stage.frame(compact_table(loadData.fetch_table(pool, *loadData.make_input_set_query(strt_dd, end_dd, theo_prc_use_tp_cd, prc_tp_cd))))
+    with stageTimer.stage(timer, "classify") as stage:
+        rawData.insert(rawData.columns.get_loc('FSETLPRC_DIV_PRSNT_VAL'), 'HOW_CALC_CD', howCalcTheo_batch(rawData))
+        stage.rows = len(rawData)
+    with stageTimer.stage(timer, "div_val") as stage:
+        rawData.insert(rawData.columns.get_loc('AFEXDIV_DIV_FUT_VAL') + 1, 'DIV_VAL', read_div_val_batch(rawData))
+        stage.rows = len(rawData)
+    with stageTimer.stage(timer, "compact:rawData") as stage:
+        return stage.frame(compact_raw_data(rawData))
+
+
+def run_pipeline(pool, strt_dd, end_dd, sinks, cache=None, use_pushdown=USE_PUSHDOWN_QUERY,
+                 theo_prc_use_tp_cd=THEO_PRC_USE_TP_CD, prc_tp_cd=PRC_TP_CD, timer=None, implied_volt=CALC_IMPLIED_VOLT):
+    """ [strt_dd, end_dd] 기간의 기초정보를 조회하여 일자별로 이론가를 산출하고 sinks 에 씀 (write_by_day 참고)
+    * 조회가 끝나면 풀(pool)을 닫음
+    * timer(stageTimer.StageTimer)를 주면 조회, 조인, 산출, 저장 단계별 소요시간과 메모리를 기록
+    """
+    try:
+        if use_pushdown:
+            rawData = load_input_set(pool, strt_dd, end_dd, theo_prc_use_tp_cd, prc_tp_cd, timer=timer)
+        else:
+            custom_bd, tables = load_source_tables(pool, strt_dd, end_dd, theo_prc_use_tp_cd, prc_tp_cd, cache=cache, timer=timer)
+            rawData = build_raw_data(tables, custom_bd, strt_dd, end_dd, theo_prc_use_tp_cd, timer=timer)
+    finally:
+        pool.close()
+    write_by_day(rawData, sinks, timer, implied_volt)
+
+
+def _dd(value: str):
+    """ 명령행 일자 인자 확인 (YYYYMMDD)"""
+    try:
+        if len(value) != 8:
+            raise ValueError(value)
+        datetime.datetime.strptime(value, '%Y%m%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date (YYYYMMDD) : {value}")
+    return value
+
+
+def parse_args(argv=None):
+    """ 명령행 인자. 값을 주지 않은 옵션은 모듈 상수(STRT_DD, END_DD, env, THEO_PRC_USE_TP_CD 등)를 기본값으로 사용
+    """
+    formats = [ext.lstrip('.') for ext in writeOutput.SINKS]
+    parser = argparse.ArgumentParser(description="DB 기초정보로 이론가를 산출하여 DB 이론가와 비교")
+    parser.add_argument("--strt-dd", type=_dd, default=None, help=f"시작일자 YYYYMMDD (기본 : {STRT_DD})")
+    parser.add_argument("--end-dd", type=_dd, default=None, help=f"종료일자 YYYYMMDD (기본 : --strt-dd 를 주면 그 하루, 아니면 {END_DD})")
+    parser.add_argument("--env", default=env, choices=list(orcl.ENV_INFO), help="오라클 환경명")
+    parser.add_argument("--use-tp-cd", default=THEO_PRC_USE_TP_CD, choices=['01', '02'],
+                        help="이론가격용용도구분코드 (01 : 정산가/증거금기준가용, 02 : 기준가/호가한도계산용)")
+    parser.add_argument("--prc-tp-cd", default=PRC_TP_CD, help="RFR 금리(TBCS_THEO_PRC_RFR_FUT) 가격구분코드")
+    parser.add_argument("--out-dir", default=".", help="출력파일 경로")
+    parser.add_argument("--rawdata-format", default=RAWDATA_FORMAT, choices=formats)
+    parser.add_argument("--result-format", default=RESULT_FORMAT, choices=formats)
+    parser.add_argument("--cache", action=argparse.BooleanOptionalAction, default=USE_SNAPSHOT_CACHE, help="로컬 스냅샷 캐시 사용")
+    parser.add_argument("--cache-dir", default=snapshotCache.SNAPSHOT_DIR)
+    parser.add_argument("--pushdown", action=argparse.BooleanOptionalAction, default=USE_PUSHDOWN_QUERY,
+                        help="DB 에서 조인까지 마친 결과를 한 번에 조회 (캐시 사용 안함)")
+    parser.add_argument("--implied-volt", action=argparse.BooleanOptionalAction, default=CALC_IMPLIED_VOLT,
+                        help="DB 이론가로 옵션 내재변동성을 역산하여 FINAL_VOLT 와 비교")
+    parser.add_argument("--report", action=argparse.BooleanOptionalAction, default=RUN_REPORT, help="실행 보고서(JSON) 저장")
+    parser.add_argument("--profile", action=argparse.BooleanOptionalAction, default=PROFILE, help="실행 보고서에 cProfile 결과 포함")
+    parser.add_argument("--trace-memory", action=argparse.BooleanOptionalAction, default=TRACE_MEMORY, help="실행 보고서에 tracemalloc 할당량 포함")
+    args = parser.parse_args(argv)
+
+    if args.strt_dd is None:
+        args.strt_dd = STRT_DD
+        args.end_dd = args.end_dd or END_DD
+    else:
+        args.end_dd = args.end_dd or args.strt_dd
+    if args.end_dd < args.strt_dd:
+        parser.error("Date error : END_DD should be equal or greater than STRT_DD")
+    return args
+
+
+def main(argv=None):
+    """ [시작일자, 종료일자] 기간의 모든 종목에 대해 이론가를 산출하여 일자별로 바로 파일에 씀
+    * DB 접속은 캐시에 없는 데이터를 처음 조회할 때 함 (orcl.RDB_pool)
+    """
+    args = parse_args(argv)
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    def path(prefix, ext):
+        return os.path.join(args.out_dir, f"{prefix}_theoPrcFromCSDB_{args.env}_{args.strt_dd}_{args.end_dd}.{ext}")
+
+    pool = orcl.RDB_pool(args.env)
+    cache = snapshotCache.SnapshotCache(args.env, args.cache_dir) if args.cache and not args.pushdown else None
+
+    # 실행 보고서(report)를 저장하면 단계별 소요시간/메모리를 기록
+    timer = stageTimer.StageTimer(profile=args.profile, trace_memory=args.trace_memory, env=args.env, strt_dd=args.strt_dd, end_dd=args.end_dd,
+                                  theo_prc_use_tp_cd=args.use_tp_cd, use_pushdown=args.pushdown) if args.report else None
+    with timer if timer is not None else contextlib.nullcontext(), \
+            writeOutput.make_sink(path("rawdata", args.rawdata_format), dtypes=COLUMN_DTYPES) as raw_sink, \
+            writeOutput.make_sink(path("result", args.result_format), dtypes=RESULT_DTYPES) as result_sink:
+        run_pipeline(pool, args.strt_dd, args.end_dd, [(raw_sink, None), (result_sink, make_result)], cache=cache,
+                     use_pushdown=args.pushdown, theo_prc_use_tp_cd=args.use_tp_cd, prc_tp_cd=args.prc_tp_cd, timer=timer,
+                     implied_volt=args.implied_volt)
+    if timer is not None:
+        timer.save(path("runreport", "json"), profile_path=path("runreport", "pstats") if args.profile else None)
+    return 0
+
+
+### 실행시, 기본적으로 STRT_DD~END_DD 기간의 모든 종목에 대해 이론가를 산출 (옵션은 python calcTheoPrice_db.py --help)
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""옵션 가격(DB 이론가, 시장가격 등)으로부터 내재변동성 역산(배열 입력)
+  * 별표15/16(이항모델), 별표17(Garman-Kohlhagen) 옵션을 옵션체인 전체에 대해 한 번에 역산
+  * 행별로 [VOLT_LOW, VOLT_HIGH] 구간을 유지하면서 Newton 법으로 갱신하고,
+    Newton 값이 구간을 벗어나거나 구간이 절반 이상 줄지 않으면 이분법으로 대체 (가격은 변동성에 대해 증가함수)
+  * 수렴한 행은 다음 반복에서 제외하므로 반복마다 남은 행만 가격을 다시 계산
+"""
+
+import math
+import numpy as np
+import calcTheoPrice
+
+VOLT_LOW = 1e-4         # 역산 구간 하한
+VOLT_HIGH = 5.0         # 역산 구간 상한
+VOLT_INIT = 0.3         # 초기값
+PRC_TOL = 1e-10         # 가격 허용오차 (max(1, 목표가격) 에 대한 비율)
+VOLT_TOL = 1e-10        # 구간 폭 허용오차
+MAX_ITER = 100
+
+
+def _price(is_tree, uly_prc, exer_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, div_val, volt_annual, FUTOPT_TP_CD):
+    """ 별표15/16(is_tree) 또는 별표17 옵션 이론가"""
+    if is_tree:
+        return calcTheoPrice.calcTheoPrice_binomial_batch(uly_prc, exer_prc, remain_dys, dom_riskfre_int, div_val, volt_annual, FUTOPT_TP_CD)
+    return calcTheoPrice.calcTheoPrice_bs_batch(uly_prc, exer_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, volt_annual, FUTOPT_TP_CD)
+
+
+def _vega(is_tree, uly_prc, exer_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, div_val, volt_annual):
+    """ Newton 법에 쓰는 vega
+    * 별표17 : 해석적 vega
+    * 별표15/16 : 이항모델이 수렴하는 Black-Scholes 모형(기초자산 = 기초자산가격-배당, 배당수익률 0)의 해석적 vega
+    """
+    t = calcTheoPrice.remainDysAnnual(remain_dys)
+    if is_tree:
+        uly_prc = uly_prc - div_val
+        forn_riskfre_int = np.zeros_like(uly_prc)
+    volt_sqrt_t = volt_annual * np.sqrt(t)
+    d1 = (np.log(uly_prc / exer_prc) + (dom_riskfre_int - forn_riskfre_int + (volt_annual ** 2)/2) * t) / volt_sqrt_t
+    return uly_prc * np.exp(-1*forn_riskfre_int*t) * np.exp(-0.5 * d1**2) / math.sqrt(2*math.pi) * np.sqrt(t)
+
+
+def _solve(is_tree, target_prc, uly_prc, exer_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, div_val, FUTOPT_TP_CD,
+           volt_init, max_iter):
+    """ 한 가지 모형의 행들에 대한 역산. (내재변동성, 수렴여부) 배열"""
+    n = len(target_prc)
+    args = (uly_prc, exer_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, div_val)
+    lo = np.full(n, VOLT_LOW)
+    if is_tree:
+        # 이항모델은 변동성이 |r|*sqrt(dt) 보다 작으면 위험중립확률이 [0, 1] 을 벗어나므로 구간 하한을 올림
+        dt = calcTheoPrice.remainDysAnnual(remain_dys) / calcTheoPrice.TIME_STEP
+        lo = np.maximum(lo, np.abs(dom_riskfre_int) * np.sqrt(dt) * (1 + 1e-6))
+    hi = np.full(n, VOLT_HIGH)
+    prc_tol = PRC_TOL * np.maximum(1.0, np.abs(target_prc))
+
+    # 목표가격이 구간 양 끝의 가격 사이에 없으면 역산 불가
+    prc_lo = _price(is_tree, *args, lo, FUTOPT_TP_CD)
+    prc_hi = _price(is_tree, *args, hi, FUTOPT_TP_CD)
+    feasible = (target_prc >= prc_lo - prc_tol) & (target_prc <= prc_hi + prc_tol)
+
+    volt = np.clip(np.where(np.isfinite(volt_init) & (volt_init > 0), volt_init, VOLT_INIT), VOLT_LOW, VOLT_HIGH)
+    converged = np.zeros(n, dtype=bool)
+    active = feasible.copy()
+    width = np.full(n, np.inf)      # 직전 반복의 구간 폭
+    for _ in range(max_iter):
+        idx = np.flatnonzero(active)
+        if len(idx) == 0:
+            break
+        sub = [a[idx] for a in args]
+        v = volt[idx]
+        diff = _price(is_tree, *sub, v, FUTOPT_TP_CD[idx]) - target_prc[idx]
+
+        done = np.abs(diff) <= prc_tol[idx]
+        lo[idx] = np.where(diff < 0, v, lo[idx])
+        hi[idx] = np.where(diff > 0, v, hi[idx])
+        done |= (hi[idx] - lo[idx]) <= VOLT_TOL
+        converged[idx[done]] = True
+        active[idx[done]] = False
+
+        # Newton 값이 구간 안에 있고 직전 반복에서 구간이 절반 이상 줄었으면 Newton, 아니면 이분법
+        # (가격이 거의 0 인 외가격 옵션처럼 Newton 이 한쪽에서 느리게 접근하는 경우를 막음)
+        vega = _vega(is_tree, *sub, v)
+        newton = v - diff / vega
+        bisect = 0.5 * (lo[idx] + hi[idx])
+        use_newton = np.isfinite(newton) & (newton > lo[idx]) & (newton < hi[idx]) & (hi[idx] - lo[idx] <= 0.5 * width[idx])
+        width[idx] = hi[idx] - lo[idx]
+        volt[idx] = np.where(done, v, np.where(use_newton, newton, bisect))
+
+    volt[~converged] = np.nan
+    return volt, converged
+
+
+def impliedVolt_batch(target_prc, uly_prc, exer_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, div_val, FUTOPT_TP_CD, how_calc_cd,
+                      volt_init=None, max_iter: int = MAX_ITER):
+    """ 옵션 가격(target_prc)에 대한 내재변동성 역산(배열 입력)
+
+        Args:
+            target_prc : 옵션 가격
+            volt_init : 초기값(예: FINAL_VOLT). 없으면 VOLT_INIT
+            나머지는 calcTheoPrice.calcTheoPrice_option 과 같으며, 각 인자는 같은 길이의 배열
+
+        Return:
+            volt : 내재변동성 배열 (역산 대상이 아니거나 수렴하지 않으면 NaN)
+            converged : 수렴여부 배열
+    """
+    n = len(np.atleast_1d(np.asarray(FUTOPT_TP_CD, dtype=object)))
+    FUTOPT_TP_CD = calcTheoPrice._asCodeArray(FUTOPT_TP_CD, n)
+    how_calc_cd = calcTheoPrice._asCodeArray(how_calc_cd, n)
+    target_prc, uly_prc, exer_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, div_val = [
+        np.broadcast_to(calcTheoPrice._asFloatArray(v), (n,)) for v in (target_prc, uly_prc, exer_prc, remain_dys, dom_riskfre_int, forn_riskfre_int, div_val)]
+    volt_init = np.full(n, np.nan) if volt_init is None else np.broadcast_to(calcTheoPrice._asFloatArray(volt_init), (n,))
+
+    volt = np.full(n, np.nan)
+    converged = np.zeros(n, dtype=bool)
+    is_option = (FUTOPT_TP_CD == 'C') | (FUTOPT_TP_CD == 'P')
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for is_tree, codes in ((True, ["별표15", "별표16"]), (False, ["별표17"])):
+            idx = np.flatnonzero(is_option & np.isin(how_calc_cd, codes) & np.isfinite(target_prc))
+            if len(idx) == 0:
+                continue
+            volt[idx], converged[idx] = _solve(is_tree, target_prc[idx], uly_prc[idx], exer_prc[idx], remain_dys[idx], dom_riskfre_int[idx],
+                                               forn_riskfre_int[idx], div_val[idx], FUTOPT_TP_CD[idx], volt_init[idx], max_iter)
+    return volt, converged
@@ -0,0 +1,140 @@
+"""입력이 바뀐 종목만 다시 산출하는 증분 이론가 산출
+  * (DD, ISU_CD, THEO_PRC_USE_TP_CD) 별로 마지막 입력값의 hash 와 이론가를 보관
+  * reprice(rawData) : 새 입력 전체와 비교하여 hash 가 바뀌었거나 새로 생긴 행만 다시 산출
+  * update_underlying / update_isu : 기초자산(FORPRC_ULY_ID) 또는 종목(ISU_CD)의 입력값만 바꾸고
+    해당 종목들만 다시 산출 (기초자산 가격이 바뀌면 그 기초자산의 모든 파생상품으로 전파)
+"""
+
+import numbers
+import numpy as np
+import pandas as pd
+import loadData
+import calcTheoPrice_db
+
+KEY_COLS = ['DD', 'ISU_CD', 'THEO_PRC_USE_TP_CD']
+
+# 이론가 산출에 쓰이는 입력 컬럼 (이 값들이 같으면 이론가도 같음)
+INPUT_COLS = ['ULY_PRC', 'EXER_PRC', 'REMAIN_DYS', 'DOM_RISKFRE_INT', 'FORN_RISKFRE_INT', 'DIV_VAL', 'FINAL_VOLT',
+              'RGHT_TP_CD', 'HOW_CALC_CD', 'STDGOOD_BND_EXP', 'BND_YD', 'STORG_COST', 'SPD_COMPST_CD'] + loadData.RFR_COLS
+
+
+def _rowHash(frame: pd.DataFrame):
+    """ 행별 hash (uint64)"""
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def _keyHash(rawData: pd.DataFrame):
+    """ 행 키 hash. 같은 키가 여러 행이면 키 안에서의 순번을 붙여 구분"""
+    keys = rawData[KEY_COLS].copy()
+    keys['_OCC'] = keys.groupby(KEY_COLS, dropna=False, sort=False).cumcount()
+    return _rowHash(keys)
+
+
+class IncrementalPricer:
+
+    def __init__(self, price=calcTheoPrice_db.calucTheoPriceFromDF_batch):
+        """ price : rawData(부분)를 받아 THEO_PRC, THEO_PRC_DIFF_DB_AND_PYTHON 컬럼을 붙여 돌려주는 산출 함수
+        """
+        self.price = price
+        self.rawData = None         # 마지막 입력과 이론가
+        self.input_hash = None      # 행별 입력 hash
+        self.key_index = None       # 행 키 hash -> 행 위치
+        self.dirty_count = 0        # 마지막 호출에서 다시 산출한 행 수
+        self._groups = {}
+
+    def reprice(self, rawData: pd.DataFrame):
+        """ 새 입력 전체(rawData)의 이론가 산출. 직전 입력과 비교하여 바뀐 행만 산출하고 나머지는 직전 이론가를 사용
+        """
+        rawData = rawData.reset_index(drop=True)
+        key_hash = _keyHash(rawData)
+        input_hash = _rowHash(rawData[INPUT_COLS])
+
+        theo_prc = np.full(len(rawData), np.nan)
+        if self.rawData is None:
+            dirty = np.ones(len(rawData), dtype=bool)
+        else:
+            pos = self.key_index.get_indexer(key_hash)
+            dirty = (pos < 0) | (self.input_hash[np.maximum(pos, 0)] != input_hash)
+            theo_prc[~dirty] = self.rawData['THEO_PRC'].to_numpy()[pos[~dirty]]
+        if dirty.any():
+            theo_prc[dirty] = self.price(rawData.loc[dirty].copy())['THEO_PRC'].to_numpy()
+
+        rawData['THEO_PRC'] = theo_prc
+        rawData['THEO_PRC_DIFF_DB_AND_PYTHON'] = calcTheoPrice_db.theo_prc_diff(rawData)
+
+        self.rawData = rawData
+        self.input_hash = input_hash.copy()
+        self.key_index = pd.Index(key_hash)
+        self.dirty_count = int(dirty.sum())
+        self._groups = {}
+        return rawData
+
+    def _rows(self, col, value, dd=None):
+        """ col 값이 value 인 행 위치 (dd 를 주면 그 일자만)"""
+        if col not in self._groups:
+            self._groups[col] = self.rawData.groupby(col, sort=False, observed=True).indices
+        rows = self._groups[col].get(value, np.empty(0, dtype=np.intp))
+        if dd is not None:
+            dd_col = self.rawData['DD'].to_numpy()
+            rows = rows[dd_col[rows] == np.asarray(dd).astype(dd_col.dtype)]     # 'YYYYMMDD' 문자열도 정수 일자와 비교
+        return rows
+
+    def _fitColumn(self, col, value):
+        """ value 를 넣을 수 있도록 rawData[col] 형식을 넓힘 (compact_raw_data 로 줄인 형식)
+        * category : 없는 범주면 범주 추가
+        * 정수 : 범위를 넘으면 Int64, 소수면 Float64
+        * 숫자 컬럼에 숫자가 아닌 값이면 ValueError
+        """
+        column = self.rawData[col]
+        if pd.isna(value):
+            if isinstance(column.dtype, np.dtype) and column.dtype.kind in 'iu':     # numpy 정수는 NA 를 넣을 수 없음
+                self.rawData[col] = column.astype('Int64')
+            return
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            if value not in column.cat.categories:
+                self.rawData[col] = column.cat.add_categories([value])
+            return
+        if not pd.api.types.is_numeric_dtype(column.dtype):
+            return
+        if not isinstance(value, numbers.Real) or isinstance(value, bool):
+            raise ValueError(f"{col} must be a number : {value!r}")
+        if pd.api.types.is_integer_dtype(column.dtype):
+            info = np.iinfo(getattr(column.dtype, 'numpy_dtype', column.dtype))
+            if not float(value).is_integer():
+                self.rawData[col] = column.astype('Float64')
+            elif not info.min <= value <= info.max:
+                self.rawData[col] = column.astype('Int64')
+
+    def _updateRows(self, rows, values: dict):
+        """ rows 행의 입력값을 values 로 바꾸고 그 행만 다시 산출"""
+        for col, value in values.items():
+            if col not in INPUT_COLS:
+                raise ValueError(f"{col} is not a pricing input")
+            self._fitColumn(col, value)
+        for col, value in values.items():
+            self.rawData.iloc[rows, self.rawData.columns.get_loc(col)] = value
+        self.dirty_count = len(rows)
+        if len(rows) == 0:
+            return self.rawData.iloc[rows]
+
+        priced = self.price(self.rawData.iloc[rows].copy())
+        for col in ('THEO_PRC', 'THEO_PRC_DIFF_DB_AND_PYTHON'):
+            self.rawData.iloc[rows, self.rawData.columns.get_loc(col)] = priced[col].to_numpy()
+        self.input_hash[rows] = _rowHash(self.rawData.iloc[rows][INPUT_COLS])
+        return self.rawData.iloc[rows]
+
+    def update_underlying(self, forprc_uly_id, dd=None, **values):
+        """ 기초자산(FORPRC_ULY_ID)의 입력값(예: ULY_PRC=...)을 바꾸고, 그 기초자산의 모든 파생상품만 다시 산출
+
+        Return:
+            다시 산출한 행
+        """
+        return self._updateRows(self._rows('FORPRC_ULY_ID', forprc_uly_id, dd), values)
+
+    def update_isu(self, isu_cd, dd=None, **values):
+        """ 종목(ISU_CD)의 입력값(예: FINAL_VOLT=...)을 바꾸고 그 종목만 다시 산출
+
+        Return:
+            다시 산출한 행
+        """
+        return self._updateRows(self._rows('ISU_CD', isu_cd, dd), values)
@@ -0,0 +1,217 @@
+"""이론가 산출 기초정보를 DB에서 조회
+  * 서로 의존하지 않는 테이블 조회는 커넥션 풀(orcl.RDB_pool)로 동시에 실행하고, 테이블명별 DataFrame 으로 돌려줌
+  * 전체 조회시간이 각 조회시간의 합이 아니라 가장 오래 걸리는 조회의 시간으로 정해짐
+  * 스냅샷 캐시(snapshotCache.SnapshotCache)를 주면 캐시에 없는 일자만 DB에서 조회
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import stageTimer
+
+HOLDY_SQL = "SELECT * FROM TBCS_HOLDY WHERE CALND_ID = 'COMMON'"
+
+# 테이블별 일자 구분 컬럼 (None 이면 STRT_DD~END_DD 유효기간이 있는 기준정보 테이블)
+PARTITION_COLS = {
+    'TBCS_DRV_ISU': None,
+    'TBCS_ULY': None,
+    'TBCS_STORG_COST': 'DD',
+    'TBCS_THEO_PRC_VAR': 'CALC_DD',
+    'TBCS_VOLT': 'DD',
+    'TBCS_DVAL': 'DD',
+    'TBCS_THEO_PRC_RFR_FUT': 'DD',
+    'TBCS_THEO_PRC': 'DD',
+}
+
+
+# 테이블별 조회 SQL (바인드 변수 사용: 일자가 바뀌어도 SQL 문장이 같아 DB 에서 한 번만 parse 하고 statement cache 를 재사용)
+TABLE_SQL = {
+    # 종목정보
+    'TBCS_DRV_ISU': "SELECT STRT_DD, END_DD, ISU_CD, ISU_KOR_NM, PROD_ID, ULY_ID, FORPRC_ULY_ID, SPD_COMPST_CD, ULY_TP_CD, RGHT_TP_CD, EXER_PRC, EXP_DD, MKT_DTL_ID FROM TBCS_DRV_ISU WHERE END_DD >= :strt_dd AND STRT_DD <= :end_dd",
+    # 국채만기 정보
+    'TBCS_ULY': "SELECT STRT_DD, END_DD, ULY_ID, STDGOOD_BND_EXP FROM TBCS_ULY WHERE END_DD >= :strt_dd AND STRT_DD <= :end_dd",
+    # 금시장 보관료
+    'TBCS_STORG_COST': "SELECT DD, ULY_ID, STORG_COST FROM TBCS_STORG_COST WHERE DD BETWEEN :strt_dd AND :end_dd",
+    # 기초자산기준가격, 잔존일수, 금리, 국채수익률
+    'TBCS_THEO_PRC_VAR': "SELECT CALC_DD, ISU_CD, ULY_PRC, REMAIN_DYS, DOM_RISKFRE_INT, FORN_RISKFRE_INT, BND_YD FROM TBCS_THEO_PRC_VAR WHERE CALC_DD BETWEEN :strt_dd AND :end_dd AND THEO_PRC_USE_TP_CD = :theo_prc_use_tp_cd AND SEQ = '1'",
+    # 변동성
+    'TBCS_VOLT': "SELECT DD, ISU_CD, FINAL_VOLT, FINAL_VOLT_TP_CD FROM TBCS_VOLT WHERE DD BETWEEN :strt_dd AND :end_dd",
+    # 배당 현재가치
+    'TBCS_DVAL': ("SELECT TBCS_BYDD_DRV_ISU.DD, TBCS_BYDD_DRV_ISU.ISU_CD, TBCS_DVAL.FSETLPRC_DIV_PRSNT_VAL, TBCS_DVAL.FSETLPRC_DIV_FUT_VAL, TBCS_DVAL.FBASPRC_DIV_PRSNT_VAL, TBCS_DVAL.FBASPRC_DIV_FUT_VAL, TBCS_DVAL.AFADJ_DIV_PRSNT_VAL, TBCS_DVAL.AFADJ_DIV_FUT_VAL, TBCS_DVAL.AFEXDIV_DIV_PRSNT_VAL, TBCS_DVAL.AFEXDIV_DIV_FUT_VAL FROM TBCS_BYDD_DRV_ISU, TBCS_DVAL "
+        "where TBCS_BYDD_DRV_ISU.DD BETWEEN :strt_dd AND :end_dd AND TBCS_BYDD_DRV_ISU.DD = TBCS_DVAL.DD "
+        "AND TBCS_BYDD_DRV_ISU.PROD_ID = TBCS_DVAL.PROD_ID "
+        "AND TBCS_BYDD_DRV_ISU.EXPMM = TBCS_DVAL.EXPMM"),
+    # RFR 금리
+    'TBCS_THEO_PRC_RFR_FUT': "SELECT DD, ISU_CD, LSTTRD_DD, APPL_STRT_DD, APPL_END_DD, FINAL_YN, FINAL_INT, MM3_GOVBND_STRIP_INT, FWD_INT, INT_SPD, THEO_INT FROM TBCS_THEO_PRC_RFR_FUT WHERE DD BETWEEN :strt_dd AND :end_dd AND PRC_TP_CD = :prc_tp_cd",
+    # 산출된 이론가 값(DB)
+    'TBCS_THEO_PRC': "SELECT DD, ISU_CD, VOLT_TP_CD, SETL_THEO_PRC AS THEO_PRC_DB, '01' AS THEO_PRC_USE_TP_CD FROM TBCS_THEO_PRC WHERE DD BETWEEN :strt_dd AND :end_dd",
+    # 수익률곡선 (yieldCurve.CurveCache.from_frame 용, 기본 조회대상은 아님)
+    'TBCS_YD_PD_STRUCT': "SELECT DD, CURR_ISO_CD, BENCHMK_NM, YD_PD_STRUCT_BAS_DYS, EXP_YD FROM TBCS_YD_PD_STRUCT WHERE DD BETWEEN :strt_dd AND :end_dd",
+}
+
+
+def make_query(table, strt_dd, end_dd, theo_prc_use_tp_cd, prc_tp_cd):
+    """ 테이블 하나의 [strt_dd, end_dd] 기간 조회 (SQL, 바인드 변수 dict)
+    """
+    sql = TABLE_SQL[table]
+    params = {'strt_dd': strt_dd, 'end_dd': end_dd}
+    if ':theo_prc_use_tp_cd' in sql:
+        params['theo_prc_use_tp_cd'] = theo_prc_use_tp_cd
+    if ':prc_tp_cd' in sql:
+        params['prc_tp_cd'] = prc_tp_cd
+    return sql, params
+
+
+def make_windows(strt_dd, end_dd, prev_dd, theo_prc_use_tp_cd):
+    """ 영업일 달력(직전 영업일 prev_dd)이 정해진 뒤 조회할 테이블별 조회기간
+    """
+    windows = {table: (strt_dd, end_dd) for table in PARTITION_COLS}
+    windows['TBCS_THEO_PRC_VAR'] = (prev_dd, end_dd)
+    if theo_prc_use_tp_cd != '01':
+        del windows['TBCS_THEO_PRC']
+    return windows
+
+
+def make_queries(strt_dd, end_dd, prev_dd, theo_prc_use_tp_cd, prc_tp_cd):
+    """ 영업일 달력(직전 영업일 prev_dd)이 정해진 뒤 조회할 테이블별 (SQL, 바인드 변수)
+    """
+    return {table: make_query(table, window[0], window[1], theo_prc_use_tp_cd, prc_tp_cd)
+            for table, window in make_windows(strt_dd, end_dd, prev_dd, theo_prc_use_tp_cd).items()}
+
+
+def fetch_table(pool, sql, params=None):
+    """ 풀에서 커넥션을 빌려 SQL 하나를 DataFrame 으로 조회
+    """
+    with pool.acquire() as client:
+        return client.fetch_frame(sql, params)
+
+
+def fetch_tables(pool, queries: dict, max_workers: int = None, timer=None):
+    """ 테이블명별 (SQL, 바인드 변수) (queries)를 쓰레드 풀에서 동시에 조회하여 테이블명별 DataFrame dict 로 돌려줌
+    * 동시 실행 수는 max_workers 또는 커넥션 풀 크기(pool.max)를 넘지 않음
+    * timer(stageTimer.StageTimer)를 주면 조회마다 'fetch:테이블명' 단계로 기록
+    """
+    if not queries:
+        return {}
+
+    def fetch(name, query):
+        table, window = (name, {}) if isinstance(name, str) else (name[0], {'strt_dd': name[1], 'end_dd': name[2]})
+        with stageTimer.stage(timer, f"fetch:{table}", **window) as stage:
+            return stage.frame(fetch_table(pool, *query))
+
+    max_workers = min(max_workers or pool.max, pool.max, len(queries))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='loadData') as executor:
+        futures = {name: executor.submit(fetch, name, query) for name, query in queries.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def cache_table_name(table, theo_prc_use_tp_cd, prc_tp_cd):
+    """ 조회조건(용도구분코드, 가격구분코드)에 따라 내용이 달라지는 테이블은 캐시 이름에 조건을 붙임
+    * 기준정보 테이블은 일자(DD)별로 펼친 행을 저장하므로 이름을 구분 (예전 형식의 캐시를 읽지 않도록)
+    """
+    if PARTITION_COLS[table] is None:
+        return f"{table}_BYDD"
+    if table == 'TBCS_THEO_PRC_VAR':
+        return f"{table}_{theo_prc_use_tp_cd}"
+    if table == 'TBCS_THEO_PRC_RFR_FUT':
+        return f"{table}_{prc_tp_cd}"
+    return table
+
+
+def split_partitions(table, frame, days):
+    """ 조회결과를 일자별로 나눔. 기준정보 테이블은 그 일자에 유효한 행에 일자(DD) 컬럼을 붙여 그 일자의 partition 으로 봄
+    * 기준정보가 중간에 바뀌어도 일자마다 그 때 조회한 행만 남으므로, 여러 번 나누어 조회한 기간을 합쳐도 중복되지 않음
+    """
+    partition_col = PARTITION_COLS[table]
+    if partition_col is None:
+        return {dd: frame[(frame['STRT_DD'] <= dd) & (frame['END_DD'] >= dd)].assign(DD=dd) for dd in days}
+    groups = dict(tuple(frame.groupby(partition_col, sort=False)))
+    return {dd: groups.get(dd, frame.iloc[0:0]) for dd in days}
+
+
+def fetch_tables_cached(pool, cache, custom_bd, windows: dict, theo_prc_use_tp_cd, prc_tp_cd, max_workers: int = None, timer=None):
+    """ fetch_tables 와 같으나, 캐시(cache)에 있는 일자는 캐시에서 읽고 없는 일자만 DB에서 조회하여 캐시에 저장
+    * 캐시에 없는 일자는 연속된 영업일 구간별로 묶어 한 번에 조회
+    * 기준정보 테이블(TBCS_DRV_ISU 등)은 일자별로 펼친 행(DD 컬럼 포함)을 돌려줌 (calcTheoPrice_db.merge_reference)
+    * 일자별 테이블이 모두 비어 있는 일자는 DB 에 아직 적재되지 않은 것으로 보고 캐시에 저장하지 않음 (다음 실행때 다시 조회)
+
+    Args:
+        windows : 테이블명별 (조회시작일, 조회종료일)
+    """
+    days = {table: list(custom_bd.make_biz_days(*window)) for table, window in windows.items()}
+
+    queries = {}
+    for table, table_days in days.items():
+        name = cache_table_name(table, theo_prc_use_tp_cd, prc_tp_cd)
+        for strt_dd, end_dd in cache.missing_ranges(name, table_days):
+            queries[(table, strt_dd, end_dd)] = make_query(table, strt_dd, end_dd, theo_prc_use_tp_cd, prc_tp_cd)
+
+    fetched = {}
+    for (table, strt_dd, end_dd), frame in fetch_tables(pool, queries, max_workers, timer).items():
+        run_days = [dd for dd in days[table] if strt_dd <= dd <= end_dd]
+        for dd, partition in split_partitions(table, frame, run_days).items():
+            fetched[(table, dd)] = partition
+
+    # 적재된 일자 : 이번에 조회한 일자별 테이블에 행이 있거나, 이미 캐시에 일자별 테이블이 있는 일자
+    daily_tables = [table for table in days if PARTITION_COLS[table] is not None]
+    loaded = {dd for (table, dd), partition in fetched.items() if PARTITION_COLS[table] is not None and len(partition)}
+    loaded |= {dd for _, dd in fetched if any(cache.has(cache_table_name(table, theo_prc_use_tp_cd, prc_tp_cd), dd) for table in daily_tables)}
+    pending = {}
+    for (table, dd), partition in fetched.items():
+        if dd in loaded:
+            cache.write(cache_table_name(table, theo_prc_use_tp_cd, prc_tp_cd), dd, partition)
+        else:
+            pending.setdefault(table, []).append(partition)
+
+    tables = {}
+    for table, table_days in days.items():
+        with stageTimer.stage(timer, f"cache:{table}") as stage:
+            frames = pending.get(table, [])
+            cached_days = [dd for dd in table_days if (table, dd) not in fetched or dd in loaded]
+            frame = cache.read_many(cache_table_name(table, theo_prc_use_tp_cd, prc_tp_cd), cached_days)
+            if frames:
+                # 캐시에 저장하지 않은 일자는 조회결과를 그대로 붙여 일자순으로 정렬
+                frame = pd.concat([frame] + frames if cached_days else frames, ignore_index=True)
+                frame = frame.sort_values(PARTITION_COLS[table] or 'DD', kind='stable', ignore_index=True)
+            tables[table] = stage.frame(frame)
+    return tables
+
+
+# RFR 금리(TBCS_THEO_PRC_RFR_FUT) 컬럼
+RFR_COLS = ['LSTTRD_DD', 'APPL_STRT_DD', 'APPL_END_DD', 'FINAL_YN', 'FINAL_INT', 'MM3_GOVBND_STRIP_INT', 'FWD_INT', 'INT_SPD', 'THEO_INT']
+
+
+def make_input_set_query(strt_dd, end_dd, theo_prc_use_tp_cd, prc_tp_cd):
+    """ 이론가 산출 기초정보 전체를 DB 에서 한 번에 만드는 (SQL, 바인드 변수)
+    * 일자 x 종목(유효기간), 국채만기, 보관료, 산출변수, 변동성, DB 이론가, 배당, RFR 금리의 조인과
+      DB 이론가의 VOLT_TP_CD '00'/'BV' 중복제거('BV' 우선)를 서버에서 처리하여 완성된 결과만 전송
+    * 컬럼 구성은 calcTheoPrice_db.build_raw_data 에서 HOW_CALC_CD, DIV_VAL 을 뺀 것과 같음
+    * 일자는 일별 종목정보(TBCS_BYDD_DRV_ISU)에 있는 영업일
+    * 행은 일자, 종목코드 순 (build_raw_data 와 행 집합은 같지만, 일자 안의 순서는 다를 수 있음)
+    """
+    use_theo_prc = theo_prc_use_tp_cd == '01'
+    sql = (
+        "WITH DAYS AS (SELECT DISTINCT DD FROM TBCS_BYDD_DRV_ISU WHERE DD BETWEEN :strt_dd AND :end_dd), "
+        "ISU AS (SELECT DAYS.DD, I.ISU_CD, I.ISU_KOR_NM, I.PROD_ID, I.ULY_ID, I.FORPRC_ULY_ID, I.SPD_COMPST_CD, I.ULY_TP_CD, I.RGHT_TP_CD, I.EXER_PRC, I.EXP_DD, I.MKT_DTL_ID "
+        "FROM DAYS JOIN TBCS_DRV_ISU I ON I.STRT_DD <= DAYS.DD AND I.END_DD >= DAYS.DD), "
+        "ULY AS (SELECT DAYS.DD, U.ULY_ID, U.STDGOOD_BND_EXP FROM DAYS JOIN TBCS_ULY U ON U.STRT_DD <= DAYS.DD AND U.END_DD >= DAYS.DD), "
+        + ("PRC AS (SELECT DD, ISU_CD, VOLT_TP_CD, SETL_THEO_PRC AS THEO_PRC_DB, '01' AS THEO_PRC_USE_TP_CD, ROW_NUMBER() OVER (PARTITION BY DD, ISU_CD ORDER BY VOLT_TP_CD DESC) AS RN "
+           "FROM TBCS_THEO_PRC WHERE DD BETWEEN :strt_dd AND :end_dd AND VOLT_TP_CD IN ('00', 'BV')), " if use_theo_prc else "")
+        + "DVAL AS (" + TABLE_SQL['TBCS_DVAL'] + ") "
+        "SELECT ISU.*, ULY.STDGOOD_BND_EXP, S.STORG_COST, "
+        "V.CALC_DD, V.ULY_PRC, V.REMAIN_DYS, V.DOM_RISKFRE_INT, V.FORN_RISKFRE_INT, V.BND_YD, "
+        "VT.FINAL_VOLT, VT.FINAL_VOLT_TP_CD, "
+        + ("PRC.VOLT_TP_CD, PRC.THEO_PRC_DB, PRC.THEO_PRC_USE_TP_CD, " if use_theo_prc else "")
+        + "DVAL.FSETLPRC_DIV_PRSNT_VAL, DVAL.FSETLPRC_DIV_FUT_VAL, DVAL.FBASPRC_DIV_PRSNT_VAL, DVAL.FBASPRC_DIV_FUT_VAL, DVAL.AFADJ_DIV_PRSNT_VAL, DVAL.AFADJ_DIV_FUT_VAL, DVAL.AFEXDIV_DIV_PRSNT_VAL, DVAL.AFEXDIV_DIV_FUT_VAL, "
+        + ", ".join(f"R.{col}" for col in RFR_COLS) + " "
+        "FROM ISU "
+        "LEFT JOIN ULY ON ULY.DD = ISU.DD AND ULY.ULY_ID = ISU.ULY_ID "
+        "LEFT JOIN TBCS_STORG_COST S ON S.DD = ISU.DD AND S.ULY_ID = ISU.ULY_ID "
+        "LEFT JOIN TBCS_THEO_PRC_VAR V ON V.CALC_DD = ISU.DD AND V.ISU_CD = ISU.ISU_CD AND V.THEO_PRC_USE_TP_CD = :theo_prc_use_tp_cd AND V.SEQ = '1' "
+        "LEFT JOIN TBCS_VOLT VT ON VT.DD = ISU.DD AND VT.ISU_CD = ISU.ISU_CD "
+        + ("LEFT JOIN PRC ON PRC.DD = ISU.DD AND PRC.ISU_CD = ISU.ISU_CD AND PRC.RN = 1 " if use_theo_prc else "")
+        + "LEFT JOIN DVAL ON DVAL.DD = ISU.DD AND DVAL.ISU_CD = ISU.ISU_CD "
+        "LEFT JOIN TBCS_THEO_PRC_RFR_FUT R ON R.DD = ISU.DD AND R.ISU_CD = ISU.ISU_CD AND R.PRC_TP_CD = :prc_tp_cd "
+        "ORDER BY ISU.DD, ISU.ISU_CD"
+    )
+    params = {'strt_dd': strt_dd, 'end_dd': end_dd, 'theo_prc_use_tp_cd': theo_prc_use_tp_cd, 'prc_tp_cd': prc_tp_cd}
+    return sql, params
@@ -5,44 +5,70 @@
     구자민
 """
 
-import oracledb
+import contextlib
 import os
+import queue
+import threading
+import pandas as pd
+
+FETCH_ARRAYSIZE = 10000     # 한 번에 가져오는 행 수 (cursor.arraysize)
+STMT_CACHE_SIZE = 40        # 커넥션별로 parse 결과를 재사용하는 SQL 문장 수 (바인드 변수 SQL 과 함께 사용)
+USE_ARROW_FETCH = False     # python-oracledb 의 DataFrame(Arrow) 조회 사용 여부 (실제 오라클 서버에서 검증 전이므로 기본은 사용하지 않음)
+
+# 오라클 인스턴트 클라이언트 설치 경로
+INSTANT_LOCATION = r"D:\app\client\NO160\product\19.0.0\client_1\instantclient"
+
+# 오라클 접속 정보
+ENV_INFO = {            
+    'PD_CS_CCP' : {'name' : '가동 장내청산','id': "USCS_CCP",'passwd': "", 'hostname': ""},
+    'PD_CS_OTC' : {'name' : '가동 장외청산','id': "USCS_OTC",'passwd': "", 'hostname': ""},
+    'PD_RK_CCP' : {'name' : '가동 장내리스크','id': "USRK_CCP",'passwd': "", 'hostname': ""},
+    'PD_RK_OTC' : {'name' : '가동 장외리스크','id': "USRK_OTC",'passwd': "", 'hostname': ""}
+}
+
+def _oracledb():
+    """python-oracledb 모듈 (오라클에 처음 접속할 때 import. 로컬 대체 DB(SQLite 등)만 사용하면 설치하지 않아도 됨)
+    """
+    import oracledb
+    return oracledb
+
+def set_client_path():
+    """오라클 인스턴트 클라이언트 경로를 환경변수에 등록 (한 번만)
+    """
+    if INSTANT_LOCATION not in os.environ["PATH"]:
+        os.environ["PATH"] = INSTANT_LOCATION + ";" + os.environ["PATH"]
 
 class RDB_client:
 
     def make_connection(self, env_name:str):
         """환경명을 기입하면 해당 오라클DB에 접속
         """
-
-        # 오라클 인스턴트 클라이언트 설치 경로
-        INSTANT_LOCATION = r"D:\app\client\NO160\product\19.0.0\client_1\instantclient"
         # 출력파일의 상위 경로
         DIRECTORY_LOCATION = r".\NextGen\output"
         # 환경변수 등록
-        os.environ["PATH"] = INSTANT_LOCATION + ";" + os.environ["PATH"]
+        set_client_path()
 
-        # 오라클 접속 정보
-        env_info = {            
-            'PD_CS_CCP' : {'name' : '가동 장내청산','id': "USCS_CCP",'passwd': "", 'hostname': ""},
-            'PD_CS_OTC' : {'name' : '가동 장외청산','id': "USCS_OTC",'passwd': "", 'hostname': ""},
-            'PD_RK_CCP' : {'name' : '가동 장내리스크','id': "USRK_CCP",'passwd': "", 'hostname': ""},
-            'PD_RK_OTC' : {'name' : '가동 장외리스크','id': "USRK_OTC",'passwd': "", 'hostname': ""}
-        }
-        self.name = env_info[env_name]['name']
-        self.user_name = env_info[env_name]['id']
-        self.password = env_info[env_name]['passwd']
-        self.host_info = env_info[env_name]['hostname']
+        self.name = ENV_INFO[env_name]['name']
+        self.user_name = ENV_INFO[env_name]['id']
+        self.password = ENV_INFO[env_name]['passwd']
+        self.host_info = ENV_INFO[env_name]['hostname']
         
-        self.connection = oracledb.connect(user=self.user_name, password=self.password, dsn=self.host_info)
+        self.connection = _oracledb().connect(user=self.user_name, password=self.password, dsn=self.host_info,
+                                              stmtcachesize=STMT_CACHE_SIZE)
         self.cursor = self.connection.cursor()
 
         return self
 
 
-    def execute_sql(self, sql: str):
+    def execute_sql(self, sql: str, params=None):
         """SQL 실행
+        * 조회조건은 SQL 문자열에 넣지 말고 바인드 변수(:strt_dd 등)와 params(dict)로 넘김
+          (SQL 문장이 같으면 DB 에서 다시 parse 하지 않고 statement cache 를 재사용)
         """
-        self.cursor.execute(sql)
+        if params is None:
+            self.cursor.execute(sql)
+        else:
+            self.cursor.execute(sql, params)
 
     def get_column_names(self):
         """컬럼명 가져오기
@@ -53,6 +79,46 @@ class RDB_client:
         """전체 데이터 가져오기
         """
         return self.cursor.fetchall()
+
+    def fetch_frame(self, sql: str, params=None, batch_size: int = FETCH_ARRAYSIZE):
+        """SQL 실행결과를 DataFrame 으로 가져오기
+        * USE_ARROW_FETCH 이고 python-oracledb 에 DataFrame(Arrow) 조회 기능이 있고 pyarrow 가 설치되어 있으면 이를 사용
+        * 아니면 batch_size 행씩 가져와 batch 마다 컬럼 배열로 바꾸므로, 전체 행의 tuple list 를 만들지 않음
+        """
+        if USE_ARROW_FETCH and hasattr(self.connection, 'fetch_df_all'):
+            frame = self._fetch_frame_arrow(sql, params, batch_size)
+            if frame is not None:
+                return frame
+
+        self.cursor.arraysize = batch_size
+        if hasattr(self.cursor, 'prefetchrows'):
+            self.cursor.prefetchrows = batch_size + 1
+        self.execute_sql(sql, params)
+        columns = self.get_column_names()
+
+        chunks = [[] for _ in columns]
+        while True:
+            rows = self.cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for chunk, values in zip(chunks, zip(*rows)):
+                chunk.append(pd.Series(values))
+            del rows
+        if not chunks or not chunks[0]:
+            return pd.DataFrame(columns=columns)
+        return pd.DataFrame({name: pd.concat(chunk, ignore_index=True).infer_objects() for name, chunk in zip(columns, chunks)}, columns=columns)
+
+    def _fetch_frame_arrow(self, sql: str, params, batch_size: int):
+        """python-oracledb 의 fetch_df_all 로 Arrow 배열을 받아 DataFrame 생성 (pyarrow 가 없으면 SQL 을 실행하지 않고 None)
+        * 결과가 없어도 컬럼명이 있는 빈 DataFrame 을 돌려주므로 SQL 을 다시 실행하지 않음
+        * 실제 오라클 서버에서는 검증하지 않았음 (USE_ARROW_FETCH 로 켤 때 fetch_frame 의 cursor 조회 결과와 비교 필요)
+        """
+        try:
+            import pyarrow
+        except ImportError:
+            return None
+        odf = self.connection.fetch_df_all(sql, parameters=params, arraysize=batch_size)
+        return pyarrow.Table.from_arrays(odf.column_arrays(), names=odf.column_names()).to_pandas()
     
     def get_data(self):
         """전체 데이터 중 첫줄만 가져오기
@@ -86,6 +152,97 @@ class RDB_client:
         """
         self.make_connection(env_name)
 
+    @classmethod
+    def from_connection(cls, connection, name:str = "LOCAL"):
+        """이미 연결된 DB-API 커넥션(예: 로컬 대체용 sqlite3)으로 클래스 생성
+        """
+        client = cls.__new__(cls)
+        client.name = name
+        client.user_name = name
+        client.password = ""
+        client.host_info = ""
+        client.connection = connection
+        client.cursor = connection.cursor()
+        return client
+
+
+class RDB_pool:
+
+    def __init__(self, env_name:str = None, min:int = 1, max:int = 4, connect=None, name:str = "LOCAL"):
+        """커넥션 풀 생성
+        * env_name 을 주면 해당 오라클DB에 대한 python-oracledb 세션 풀을 만듦
+        * connect 에 커넥션을 만드는 함수를 주면(예: 로컬 대체용 sqlite3) 필요할 때마다 최대 max 개까지 만들어 재사용
+        * 실제 접속은 처음 acquire 할 때 함 (캐시만으로 처리되면 DB에 접속하지 않음)
+        """
+        self.env_name = env_name
+        self.min = min
+        self.max = max
+        self.pool = None
+        self.connect = connect
+        self.name = ENV_INFO[env_name]['name'] if env_name is not None else name
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max)
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _oracle_pool(self):
+        """python-oracledb 세션 풀 (처음 호출할 때 생성)
+        """
+        with self._lock:
+            if self.pool is None:
+                set_client_path()
+                info = ENV_INFO[self.env_name]
+                self.pool = _oracledb().create_pool(user=info['id'], password=info['passwd'], dsn=info['hostname'],
+                                                    min=self.min, max=self.max, increment=1, stmtcachesize=STMT_CACHE_SIZE)
+            return self.pool
+
+    @contextlib.contextmanager
+    def acquire(self):
+        """풀에서 커넥션을 하나 빌려 RDB_client 로 돌려주고, with 블록이 끝나면 반납
+        """
+        if self.env_name is not None:
+            pool = self._oracle_pool()
+            connection = pool.acquire()
+            try:
+                client = RDB_client.from_connection(connection, self.name)
+                try:
+                    yield client
+                finally:
+                    client.cursor.close()
+            finally:
+                pool.release(connection)
+            return
+
+        self._slots.acquire()
+        try:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                connection = self.connect()
+                with self._lock:
+                    self._connections.append(connection)
+            try:
+                client = RDB_client.from_connection(connection, self.name)
+                try:
+                    yield client
+                finally:
+                    client.cursor.close()
+            finally:
+                self._idle.put(connection)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """풀 닫기
+        """
+        if self.pool is not None:
+            self.pool.close()
+        else:
+            with self._lock:
+                for connection in self._connections:
+                    connection.close()
+                self._connections.clear()
+
 
 def main():
     print("테스트")
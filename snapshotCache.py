@@ -0,0 +1,104 @@
+"""DB 조회결과의 로컬 스냅샷 캐시
+  * (환경명, 테이블명, 일자 partition) 별로 Arrow IPC(Feather v2) 파일 하나에 저장
+  * 읽을 때는 memory map 으로 열어 숫자 컬럼은 복사 없이 DataFrame 으로 변환
+  * 한 번 조회한 일자는 다시 DB에서 조회하지 않으므로, 같은 기간을 재실행하면 DB에 접속하지 않음
+  * pyarrow 가 필요
+"""
+
+import os
+import tempfile
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:         # 캐시를 사용하지 않는 경우에는 필요없음
+    pa = None
+
+SNAPSHOT_DIR = ".snapshot"      # 기본 캐시 경로
+STATIC_PARTITION = "ALL"        # 일자 구분이 없는 테이블(휴장일 등)의 partition 명
+
+
+class SnapshotCache:
+
+    def __init__(self, env_name: str, root: str = SNAPSHOT_DIR):
+        """env_name 환경의 스냅샷을 root 아래에 저장하는 캐시 생성
+        """
+        if pa is None:
+            raise ImportError("SnapshotCache requires pyarrow")
+        self.env_name = env_name
+        self.root = root
+
+    def path(self, table: str, partition: str):
+        """(테이블명, partition) 의 파일 경로
+        """
+        return os.path.join(self.root, self.env_name, table, f"{partition}.arrow")
+
+    def has(self, table: str, partition: str):
+        """캐시에 있는지 여부
+        """
+        return os.path.exists(self.path(table, partition))
+
+    def write(self, table: str, partition: str, frame: pd.DataFrame):
+        """DataFrame 을 (테이블명, partition) 으로 저장. 임시파일에 쓴 뒤 이름을 바꾸어, 중단되어도 깨진 파일이 남지 않음
+        """
+        path = self.path(table, partition)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        table_arrow = pa.Table.from_pandas(frame, preserve_index=False)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as sink, pa.ipc.new_file(sink, table_arrow.schema) as writer:
+                writer.write_table(table_arrow)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def read(self, table: str, partition: str):
+        """(테이블명, partition) 을 memory map 으로 읽어 DataFrame 으로 돌려줌
+        """
+        return self._read_arrow(table, partition).to_pandas()
+
+    def _read_arrow(self, table: str, partition: str):
+        with pa.memory_map(self.path(table, partition), "r") as source:
+            return pa.ipc.open_file(source).read_all()
+
+    def read_many(self, table: str, partitions):
+        """여러 partition 을 읽어 하나의 DataFrame 으로 돌려줌 (partitions 순서대로)
+        """
+        tables = [self._read_arrow(table, partition) for partition in partitions]
+        if not tables:
+            return pd.DataFrame()
+        return pa.concat_tables(tables, promote_options="permissive").to_pandas()
+
+    def missing_ranges(self, table: str, days):
+        """일자 목록(days, 정렬된 영업일) 중 캐시에 없는 일자를 연속 구간 [(시작일, 종료일), ...] 으로 묶어 돌려줌
+        """
+        ranges = []
+        run = None
+        for dd in days:
+            if self.has(table, dd):
+                run = None
+            elif run is None:
+                run = [dd, dd]
+                ranges.append(run)
+            else:
+                run[1] = dd
+        return [tuple(run) for run in ranges]
+
+    def invalidate(self, partition: str):
+        """모든 테이블에서 partition(일자)을 지워, 다음 조회때 DB에서 다시 가져오게 함 (당일 데이터가 바뀐 경우 등)
+        """
+        env_dir = os.path.join(self.root, self.env_name)
+        if not os.path.isdir(env_dir):
+            return
+        for table in os.listdir(env_dir):
+            if self.has(table, partition):
+                os.remove(self.path(table, partition))
+
+    def load_static(self, table: str, fetch, refresh: bool = False):
+        """일자 구분이 없는 테이블을 캐시에서 읽고, 없거나 refresh 이면 fetch() 로 조회하여 저장
+        """
+        if refresh or not self.has(table, STATIC_PARTITION):
+            self.write(table, STATIC_PARTITION, fetch())
+        return self.read(table, STATIC_PARTITION)
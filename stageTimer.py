@@ -0,0 +1,246 @@
+"""이론가 산출 실행의 단계별 소요시간/메모리 기록
+  * with timer.stage("merge:TBCS_VOLT") as stage: ... 로 단계마다 소요시간, 처리 행 수, bytes, RSS 증가량, 최대 RSS 증가량을 기록
+  * 별표별 종목 수와 이론가 산출시간을 따로 모음 (timer.formula)
+  * 결과는 JSON 실행 보고서(report, save)로 저장
+  * 옵션 : profile=True 이면 cProfile(StageTimer 를 시작한 쓰레드만), trace_memory=True 이면 tracemalloc 으로 python 메모리 할당량도 기록
+  * timer 가 None 이면 stage() 는 아무것도 측정하지 않는 _NullStage 를 돌려줌 (계측하지 않는 실행의 부담이 없도록)
+"""
+
+import contextlib
+import cProfile
+import datetime
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import psutil
+except ImportError:         # 없으면 resource, /proc 으로 확인 (Windows 에서는 RSS 를 기록하지 않음)
+    psutil = None
+
+try:
+    import resource
+except ImportError:         # Windows
+    resource = None
+
+PROFILE_TOP = 30            # 보고서에 넣는 cProfile 상위 함수 수
+
+
+def _max_rss():
+    """ 프로세스 최대 RSS (bytes)"""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def memory_usage():
+    """ (현재 RSS, 최대 RSS) bytes. 확인할 수 없으면 None
+    """
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        peak = getattr(info, 'peak_wset', None)         # Windows
+        return info.rss, peak if peak is not None else _max_rss()
+    rss = None
+    with contextlib.suppress(OSError, ValueError, IndexError):
+        with open('/proc/self/statm') as f:
+            rss = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    return rss, _max_rss()
+
+
+def frame_bytes(frame):
+    """ DataFrame 메모리 크기 (문자열 포함)"""
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+def _delta(after, before):
+    return after - before if after is not None and before is not None else None
+
+
+class Stage:
+
+    def __init__(self, name: str, info: dict):
+        """ 단계 하나의 기록. rows, bytes 는 단계 안에서 설정
+        """
+        self.name = name
+        self.info = info
+        self.rows = None
+        self.bytes = None
+
+    def frame(self, frame):
+        """ frame 의 행 수와 크기를 이 단계의 처리량으로 기록하고 frame 을 그대로 돌려줌
+        """
+        self.rows = len(frame)
+        self.bytes = frame_bytes(frame)
+        return frame
+
+
+class _NullStage:
+    """ timer 가 없을 때의 Stage. 행 수, 크기를 계산하지 않음
+    """
+    rows = None
+    bytes = None
+
+    def frame(self, frame):
+        return frame
+
+
+class StageTimer:
+
+    def __init__(self, profile: bool = False, trace_memory: bool = False, **run_info):
+        """ 실행 단위 기록. with 문으로 감싼 구간이 실행시간, cProfile, tracemalloc 측정 구간이 됨
+        * run_info : 보고서에 같이 남길 실행조건 (기간, 환경명 등)
+        """
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.run_info = run_info
+        self.stages = []
+        self.formulas = {}
+        self.profiler = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._strt = time.perf_counter()
+        self._strt_time = None
+        self._seconds = None
+        self._strt_memory = (None, None)
+        self._end_memory = (None, None)
+        self._traced_peak = None
+
+    def __enter__(self):
+        self._strt_time = datetime.datetime.now()
+        self._strt_memory = memory_usage()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.profile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self._strt = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._seconds = time.perf_counter() - self._strt
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self.trace_memory and tracemalloc.is_tracing():
+            self._traced_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        self._end_memory = memory_usage()
+
+    @contextlib.contextmanager
+    def stage(self, name: str, **info):
+        """ 단계 하나의 소요시간, 처리량(Stage.rows, Stage.bytes), 메모리 증가량 기록
+        * 단계 안에서 시작한 단계는 parent 로 바깥 단계명을 기록 (쓰레드별)
+        * RSS, tracemalloc 값은 프로세스 전체 기준이므로 동시에 실행되는 단계(쓰레드별 조회 등)가 있으면 서로의 증가량이 섞임
+        """
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        stage = Stage(name, info)
+        parent = stack[-1].name if stack else None
+        stack.append(stage)
+        rss, peak = memory_usage()
+        traced = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else None
+        strt = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            seconds = time.perf_counter() - strt
+            stack.pop()
+            rss_after, peak_after = memory_usage()
+            record = {
+                'name': name, 'parent': parent, 'thread': threading.current_thread().name,
+                'strt': round(strt - self._strt, 6), 'seconds': seconds, 'rows': stage.rows, 'bytes': stage.bytes,
+                'rss_delta': _delta(rss_after, rss), 'peak_rss_delta': _delta(peak_after, peak),
+            }
+            if traced is not None and tracemalloc.is_tracing():
+                traced_after = tracemalloc.get_traced_memory()
+                record['py_alloc_delta'] = traced_after[0] - traced[0]
+                record['py_peak_delta'] = traced_after[1] - traced[1]
+            record.update(stage.info)
+            with self._lock:
+                self.stages.append(record)
+
+    @contextlib.contextmanager
+    def formula(self, how_calc_cd, rows: int):
+        """ 별표(how_calc_cd)별 종목 수와 이론가 산출시간 누적
+        """
+        strt = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - strt
+            with self._lock:
+                stat = self.formulas.setdefault(str(how_calc_cd), {'calls': 0, 'rows': 0, 'seconds': 0.0})
+                stat['calls'] += 1
+                stat['rows'] += int(rows)
+                stat['seconds'] += seconds
+
+    def summary(self):
+        """ 단계명별 합계 (횟수, 소요시간, 행 수, bytes)
+        * 다른 단계 안에서 실행된 단계도 각각 합산하므로 단계명 간 합계는 전체 실행시간과 다를 수 있음
+        """
+        result = {}
+        for record in self.stages:
+            stat = result.setdefault(record['name'], {'count': 0, 'seconds': 0.0, 'rows': 0, 'bytes': 0})
+            stat['count'] += 1
+            stat['seconds'] += record['seconds']
+            stat['rows'] += record['rows'] or 0
+            stat['bytes'] += record['bytes'] or 0
+        return result
+
+    def profile_stats(self, top: int = PROFILE_TOP):
+        """ cProfile 누적시간 상위 top 개 함수
+        """
+        if self.profiler is None:
+            return None
+        stats = pstats.Stats(self.profiler, stream=io.StringIO())
+        rows = []
+        for (filename, line, func), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+            rows.append({'function': f"{os.path.basename(filename)}:{line}({func})", 'ncalls': ncalls,
+                         'tottime': tottime, 'cumtime': cumtime})
+        return sorted(rows, key=lambda row: row['cumtime'], reverse=True)[:top]
+
+    def report(self):
+        """ 실행 보고서 dict
+        """
+        seconds = self._seconds if self._seconds is not None else time.perf_counter() - self._strt
+        run = dict(self.run_info)
+        run.update({
+            'strt_time': self._strt_time.isoformat(timespec='seconds') if self._strt_time else None,
+            'seconds': seconds,
+            'strt_rss': self._strt_memory[0], 'end_rss': self._end_memory[0],
+            'peak_rss': self._end_memory[1] if self._end_memory[1] is not None else memory_usage()[1],
+            'profile': self.profile, 'trace_memory': self.trace_memory,
+        })
+        if self._traced_peak is not None:
+            run['py_peak'] = self._traced_peak
+        report = {'run': run, 'summary': self.summary(), 'formulas': self.formulas, 'stages': self.stages}
+        profile = self.profile_stats()
+        if profile is not None:
+            report['profile'] = profile
+        return report
+
+    def save(self, path: str, profile_path: str = None):
+        """ 보고서를 JSON 으로 저장 (profile_path 를 주면 cProfile 결과도 pstats 파일로 저장)
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=1, default=str)
+        if profile_path is not None and self.profiler is not None:
+            self.profiler.dump_stats(profile_path)
+        return path
+
+
+@contextlib.contextmanager
+def stage(timer, name: str, **info):
+    """ timer.stage(name, **info). timer 가 None 이면 아무것도 측정하지 않는 _NullStage 를 돌려줌
+    """
+    if timer is None:
+        yield _NullStage()
+    else:
+        with timer.stage(name, **info) as record:
+            yield record
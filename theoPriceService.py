@@ -0,0 +1,548 @@
+"""상주 이론가 산출 서비스 (당일 기초정보를 메모리에 두고 종목/옵션 체인 단위로 바로 산출)
+  * TheoPriceService : 일자(DD)의 기초정보(rawData)를 한 번 조회하여 ISU_CD 로 색인해 보관 (프로세스 안에서 직접 사용)
+  * quote(isu_cd, ULY_PRC=..., FINAL_VOLT=...) : 입력값을 바꾼(what-if) 이론가. 보관한 기초정보는 바꾸지 않음
+  * refresh() 는 기초정보를 다시 조회하여 입력이 바뀐 종목만 다시 산출 (incrementalPricer),
+    update_underlying/update_isu 는 실시간 입력값을 보관한 기초정보에 반영
+  * QuoteBatcher : 동시에 들어온 요청을 BATCH_WINDOW 동안 모아 calcTheoPrice 배열 함수 한 번으로 산출
+  * serve() : asyncio HTTP 서버 (GET /quote, /chain, /metrics, POST /refresh, /underlying)
+  * 요청별 지연시간은 LatencyStats 에 모아 metrics() 또는 GET /metrics 로 확인
+"""
+
+import argparse
+import asyncio
+import datetime
+import functools
+import json
+import math
+import threading
+import time
+from collections import deque
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+import pandas as pd
+import orcl
+import calcScenario
+import calcTheoPrice
+import calcTheoPrice_db
+import incrementalPricer
+import loadData
+import snapshotCache
+
+BATCH_WINDOW = 0.0005       # 요청을 모으는 시간 (초)
+MAX_BATCH = 256             # 한 번에 산출하는 최대 요청 수 (다 차면 BATCH_WINDOW 를 기다리지 않음)
+METRIC_SAMPLES = 10000      # 지연시간 통계에 쓰는 최근 요청 수 (요청 종류별)
+REFRESH_INTERVAL = 0        # 기초정보 자동 갱신 주기 (초, 0 이면 갱신하지 않음)
+HOST = "127.0.0.1"
+PORT = 8765
+
+# 산출에 쓰는 컬럼 (calcTheoPrice_batch, calcTheoPriceRFR_batch 입력과 스프레드 여부)
+PRICE_COLS = calcScenario.PRICE_INPUT_COLS + ['SPD_COMPST_CD', 'DD'] + loadData.RFR_COLS
+# 요청에서 바꿀 수 있는 입력값
+OVERRIDE_COLS = ['ULY_PRC', 'EXER_PRC', 'REMAIN_DYS', 'DOM_RISKFRE_INT', 'FORN_RISKFRE_INT', 'DIV_VAL', 'FINAL_VOLT', 'BND_YD', 'STORG_COST']
+# 응답에 넣는 컬럼
+QUOTE_COLS = ['ISU_CD', 'PROD_ID', 'EXP_DD', 'RGHT_TP_CD', 'EXER_PRC', 'HOW_CALC_CD', 'ULY_PRC', 'FINAL_VOLT']
+CHAIN_KEY_COLS = ['PROD_ID', 'EXP_DD']
+DATE_COLS = ['DD'] + [col for col in loadData.RFR_COLS if col in calcTheoPrice_db.DATE_COLS]
+
+env = calcTheoPrice_db.env
+
+
+def priceArrays(arrays: dict):
+    """ 컬럼별 배열(PRICE_COLS)로 이론가 산출 (calcTheoPrice_db.calucTheoPriceFromDF_batch 와 같은 규칙)
+    """
+    theo_prc = calcTheoPrice.calcTheoPrice_batch(*(arrays[col] for col in calcScenario.PRICE_INPUT_COLS))
+    is_rfr = arrays['HOW_CALC_CD'] == "별표9의2"
+    if is_rfr.any():
+        theo_prc[is_rfr] = calcTheoPrice.calcTheoPriceRFR_batch(*(arrays[col][is_rfr] for col in
+            ['LSTTRD_DD', 'APPL_STRT_DD', 'APPL_END_DD', 'FINAL_YN', 'FINAL_INT', 'MM3_GOVBND_STRIP_INT', 'FWD_INT', 'INT_SPD', 'DD']))
+    theo_prc[arrays['SPD_COMPST_CD'] != ' '] = 0
+    return theo_prc
+
+
+class ReferenceData:
+
+    def __init__(self, rawData):
+        """ 이론가까지 붙은 하루치 rawData(incrementalPricer.IncrementalPricer.rawData)를 종목별 조회용으로 색인
+        * 산출 입력은 컬럼별 numpy 배열(arrays)로 바꾸어 두어, 요청마다 DataFrame 을 만들지 않음
+        * 바꾸지 않고 새로 만들어 교체하므로, 산출 중인 요청은 시작할 때의 기준정보를 끝까지 사용
+        * IncrementalPricer 는 rawData 를 제자리에서 고치므로, 배열은 모두 복사하여 읽기 전용으로 보관 (rawData 는 보관하지 않음)
+        """
+        self.arrays = {}
+        for col in PRICE_COLS:
+            values = rawData[col]
+            if col in DATE_COLS or not pd.api.types.is_numeric_dtype(values.dtype):
+                self.arrays[col] = _frozen(values.to_numpy(dtype=object, copy=True))
+            else:
+                self.arrays[col] = _frozen(np.array(calcTheoPrice._asFloatArray(values)))
+        # 응답에만 쓰는 컬럼 (산출 입력 배열에 있는 컬럼은 arrays 에서 꺼냄)
+        self.columns = {col: _frozen(rawData[col].to_numpy(dtype=object, copy=True)) for col in QUOTE_COLS if col not in self.arrays}
+        self.theo_prc = _frozen(rawData['THEO_PRC'].to_numpy(dtype=np.float64, copy=True))
+        self.isu_index = {isu_cd: pos for pos, isu_cd in enumerate(rawData['ISU_CD'].to_numpy(dtype=object))}
+        self.chains = {key: rows for key, rows in rawData.groupby(CHAIN_KEY_COLS, observed=True, sort=False).indices.items()}
+
+    def positions(self, isu_cds):
+        """ 종목코드 목록의 행 위치 (없는 종목이 있으면 KeyError)
+        """
+        try:
+            return np.fromiter((self.isu_index[isu_cd] for isu_cd in isu_cds), dtype=np.intp, count=len(isu_cds))
+        except KeyError as e:
+            raise KeyError(f"Unknown ISU_CD : {e.args[0]}") from None
+
+    def chain(self, prod_id, exp_dd):
+        """ 옵션 체인(상품 PROD_ID, 만기 EXP_DD)의 행 위치 (권리유형, 행사가격 순)
+        """
+        rows = self.chains.get((prod_id, int(exp_dd)))
+        if rows is None:
+            raise KeyError(f"Unknown chain : {prod_id} {exp_dd}")
+        return rows[np.lexsort((self.arrays['EXER_PRC'][rows], self.arrays['RGHT_TP_CD'][rows].astype(str)))]
+
+    def with_updates(self, rows, values: dict, theo_prc):
+        """ rows 행의 입력값(values)과 이론가(theo_prc)를 바꾼 새 ReferenceData (바뀐 배열만 복사)
+        """
+        updated = object.__new__(ReferenceData)
+        updated.__dict__.update(self.__dict__)
+        updated.arrays = dict(self.arrays)
+        for col, value in values.items():
+            array = self.arrays[col].copy()
+            array[rows] = value
+            updated.arrays[col] = _frozen(array)
+        updated.theo_prc = self.theo_prc.copy()
+        updated.theo_prc[rows] = theo_prc
+        _frozen(updated.theo_prc)
+        return updated
+
+    def price(self, rows, overrides: dict = None):
+        """ rows 행의 이론가. overrides(컬럼 : 값 또는 행별 배열)가 없으면 보관한 이론가를 그대로 돌려줌
+        """
+        if not overrides:
+            return self.theo_prc[rows]
+        arrays = {col: values[rows] for col, values in self.arrays.items()}
+        for col, value in overrides.items():
+            arrays[col] = np.broadcast_to(np.asarray(value, dtype=np.float64), (len(rows),))
+        return priceArrays(arrays)
+
+    def records(self, rows, theo_prc):
+        """ 응답용 종목별 dict 목록 (NaN 은 None)
+        """
+        columns = {col: self.arrays[col][rows] if col in self.arrays else self.columns[col][rows] for col in QUOTE_COLS}
+        records = []
+        for i in range(len(rows)):
+            record = {col: _jsonValue(columns[col][i]) for col in QUOTE_COLS}
+            record['THEO_PRC'] = _jsonValue(theo_prc[i])
+            records.append(record)
+        return records
+
+
+def _frozen(array):
+    """ 배열을 읽기 전용으로 바꾸어 돌려줌 (기준정보 배열을 제자리에서 고치지 못하게 함)"""
+    array.flags.writeable = False
+    return array
+
+
+def _jsonValue(value):
+    if value is None or value is np.nan or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, np.generic):
+        return _jsonValue(value.item())
+    try:
+        if value != value:          # pd.NA 등
+            return None
+    except TypeError:
+        return None
+    return value
+
+
+def checkOverrides(overrides: dict):
+    """ 요청 입력값 확인 (OVERRIDE_COLS 만 허용, 숫자로 변환)
+    """
+    checked = {}
+    for col, value in overrides.items():
+        if col not in OVERRIDE_COLS:
+            raise ValueError(f"{col} cannot be overridden (allowed : {', '.join(OVERRIDE_COLS)})")
+        checked[col] = np.asarray(value, dtype=np.float64)
+    return checked
+
+
+class LatencyStats:
+
+    def __init__(self, samples: int = METRIC_SAMPLES):
+        """ 요청 종류(name)별 최근 samples 개 요청의 지연시간 통계
+        """
+        self.samples = samples
+        self.latencies = {}
+        self.counts = {}
+        self.items = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, items: int = 1):
+        """ 요청 하나의 지연시간(초)과 처리 종목 수 기록
+        """
+        with self._lock:
+            if name not in self.latencies:
+                self.latencies[name] = deque(maxlen=self.samples)
+                self.counts[name] = 0
+                self.items[name] = 0
+            self.latencies[name].append(seconds)
+            self.counts[name] += 1
+            self.items[name] += items
+
+    def snapshot(self):
+        """ 요청 종류별 건수, 처리 종목 수, 최근 요청의 지연시간(ms) 평균/백분위수/최대
+        """
+        with self._lock:
+            latencies = {name: np.array(values) for name, values in self.latencies.items()}
+            counts, items = dict(self.counts), dict(self.items)
+        result = {}
+        for name, values in latencies.items():
+            p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000
+            result[name] = {'count': counts[name], 'items': items[name], 'mean_ms': values.mean() * 1000,
+                            'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'max_ms': values.max() * 1000}
+        return result
+
+
+class TheoPriceService:
+
+    def __init__(self, pool, dd: str = None, cache=None, theo_prc_use_tp_cd=calcTheoPrice_db.THEO_PRC_USE_TP_CD,
+                 prc_tp_cd=calcTheoPrice_db.PRC_TP_CD, use_pushdown=calcTheoPrice_db.USE_PUSHDOWN_QUERY):
+        """ 상주 이론가 산출 서비스
+        * pool : orcl.RDB_pool (서비스가 끝날 때(close) 닫음)
+        * dd : 기준일자 (없으면 오늘)
+        * cache : 휴장일(달력) 조회에만 사용. 당일 기초정보는 장중에 바뀌므로 항상 DB에서 조회
+        """
+        self.pool = pool
+        self.dd = dd or datetime.date.today().strftime('%Y%m%d')
+        self.theo_prc_use_tp_cd = theo_prc_use_tp_cd
+        self.prc_tp_cd = prc_tp_cd
+        self.use_pushdown = use_pushdown
+        self.custom_bd, self.holdy = calcTheoPrice_db.load_calendar(pool, cache)
+        self.pricer = incrementalPricer.IncrementalPricer()
+        self.stats = LatencyStats()
+        self.ref = None
+        self._lock = threading.Lock()       # 기준정보를 바꾸는 작업(refresh, update)끼리만 직렬화
+        self.refresh()
+
+    def _load(self, dd: str):
+        """ dd 일자의 기초정보(rawData) 조회
+        """
+        if self.use_pushdown:
+            return calcTheoPrice_db.load_input_set(self.pool, dd, dd, self.theo_prc_use_tp_cd, self.prc_tp_cd)
+        prev_dd = calcTheoPrice_db.previous_n_business_day(dd, 1, self.custom_bd)
+        tables = loadData.fetch_tables(self.pool, loadData.make_queries(dd, dd, prev_dd, self.theo_prc_use_tp_cd, self.prc_tp_cd))
+        tables['TBCS_HOLDY'] = self.holdy
+        return calcTheoPrice_db.build_raw_data(tables, self.custom_bd, dd, dd, self.theo_prc_use_tp_cd)
+
+    def refresh(self, dd: str = None):
+        """ 기초정보를 다시 조회하여 입력이 바뀐 종목만 다시 산출하고 기준정보를 교체 (dd 를 주면 그 일자로 바꿈)
+
+        Return:
+            다시 산출한 종목 수
+        """
+        strt = time.perf_counter()
+        dd = dd or self.dd
+        rawData = self._load(dd)            # DB 조회 중에는 잠그지 않음 (그동안 update 가 기다리지 않도록)
+        with self._lock:
+            self.ref = ReferenceData(self.pricer.reprice(rawData))
+            self.dd = dd
+            repriced = self.pricer.dirty_count
+        self.stats.record('refresh', time.perf_counter() - strt, repriced)
+        return repriced
+
+    def _update(self, update, key, values: dict):
+        """ IncrementalPricer 의 update 함수로 입력값을 바꾸어 다시 산출하고, 바뀐 행만 반영한 기준정보로 교체"""
+        values = {col: float(value) for col, value in checkOverrides(values).items()}
+        repriced = update(key, **values)
+        self.ref = self.ref.with_updates(repriced.index.to_numpy(), values, repriced['THEO_PRC'].to_numpy())
+        return len(repriced)
+
+    def update_underlying(self, forprc_uly_id, **values):
+        """ 기초자산(FORPRC_ULY_ID)의 입력값(예: ULY_PRC=...)을 바꾸고, 그 기초자산의 모든 파생상품만 다시 산출
+
+        Return:
+            다시 산출한 종목 수
+        """
+        strt = time.perf_counter()
+        with self._lock:
+            count = self._update(self.pricer.update_underlying, forprc_uly_id, values)
+        self.stats.record('update', time.perf_counter() - strt, count)
+        return count
+
+    def update_isu(self, isu_cd, **values):
+        """ 종목(ISU_CD)의 입력값(예: FINAL_VOLT=...)을 바꾸고 그 종목만 다시 산출
+
+        Return:
+            다시 산출한 종목 수
+        """
+        strt = time.perf_counter()
+        with self._lock:
+            count = self._update(self.pricer.update_isu, isu_cd, values)
+        self.stats.record('update', time.perf_counter() - strt, count)
+        return count
+
+    def quote_many(self, isu_cds, **overrides):
+        """ 종목코드 목록의 이론가 배열. overrides(예: ULY_PRC=..., FINAL_VOLT=...)는 요청 안에서만 사용
+        """
+        strt = time.perf_counter()
+        ref = self.ref
+        theo_prc = ref.price(ref.positions(isu_cds), checkOverrides(overrides))
+        self.stats.record('quote', time.perf_counter() - strt, len(theo_prc))
+        return theo_prc
+
+    def quote(self, isu_cd, **overrides):
+        """ 종목 하나의 이론가
+        """
+        return float(self.quote_many([isu_cd], **overrides)[0])
+
+    def chain(self, prod_id, exp_dd, **overrides):
+        """ 옵션 체인(상품 PROD_ID, 만기 EXP_DD) 전체의 이론가 (종목별 dict 목록, 권리유형, 행사가격 순)
+        """
+        strt = time.perf_counter()
+        ref = self.ref
+        rows = ref.chain(prod_id, exp_dd)
+        records = ref.records(rows, ref.price(rows, checkOverrides(overrides)))
+        self.stats.record('chain', time.perf_counter() - strt, len(rows))
+        return records
+
+    def metrics(self):
+        """ 기준정보 상태와 요청 종류별 지연시간 통계
+        """
+        ref = self.ref
+        return {'dd': self.dd, 'isu_count': len(ref.theo_prc) if ref is not None else 0, 'latency': self.stats.snapshot()}
+
+    def close(self):
+        """ DB 커넥션 풀 닫기
+        """
+        self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class QuoteBatcher:
+
+    def __init__(self, service: TheoPriceService, window: float = BATCH_WINDOW, max_batch: int = MAX_BATCH):
+        """ asyncio 요청 모음. window 초 동안(또는 max_batch 건이 찰 때까지) 들어온 요청을 한 번의 배열 산출로 처리
+        * 입력값을 바꾸지 않은 요청은 보관한 이론가를 바로 돌려주므로 모으지 않음
+        """
+        self.service = service
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = []
+        self._handle = None
+
+    async def quote(self, isu_cds, **overrides):
+        """ 종목코드 목록의 이론가 배열 (TheoPriceService.quote_many 와 같음)
+        """
+        overrides = checkOverrides(overrides)
+        if not overrides:
+            return self.service.quote_many(isu_cds)
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((list(isu_cds), overrides, future, time.perf_counter()))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._handle is None:
+            self._handle = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        """ 모인 요청을 한 번에 산출"""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        ref = self.service.ref
+        requests, positions, bounds = [], [], [0]
+        for isu_cds, overrides, future, strt in pending:
+            try:
+                rows = ref.positions(isu_cds)
+            except KeyError as e:
+                future.set_exception(e)
+                continue
+            requests.append((overrides, future, strt))
+            positions.append(rows)
+            bounds.append(bounds[-1] + len(rows))
+        if not requests:
+            return
+
+        try:
+            rows = np.concatenate(positions)
+            arrays = {col: values[rows] for col, values in ref.arrays.items()}
+            for (overrides, _, _), strt, end in zip(requests, bounds[:-1], bounds[1:]):
+                for col, value in overrides.items():
+                    arrays[col][strt:end] = value
+            theo_prc = priceArrays(arrays)
+        except Exception as e:
+            for _, future, _ in requests:
+                future.set_exception(e)
+            return
+
+        now = time.perf_counter()
+        for (_, future, strt_time), strt, end in zip(requests, bounds[:-1], bounds[1:]):
+            future.set_result(theo_prc[strt:end])
+            self.service.stats.record('quote', now - strt_time, end - strt)
+        self.service.stats.record('batch', now - pending[0][3], len(requests))
+
+
+class HttpFrontEnd:
+
+    def __init__(self, service: TheoPriceService, batcher: QuoteBatcher = None):
+        """ asyncio HTTP/1.1 서버 (JSON 응답, keep-alive 지원)
+          * GET /quote?isu_cd=A,B&ULY_PRC=...&FINAL_VOLT=...
+          * GET /chain?prod_id=...&exp_dd=...&ULY_PRC=...
+          * GET /metrics
+          * POST /refresh[?dd=YYYYMMDD]
+          * POST /underlying?forprc_uly_id=...&ULY_PRC=... , POST /isu?isu_cd=...&FINAL_VOLT=...
+        """
+        self.service = service
+        self.batcher = batcher or QuoteBatcher(service)
+        self.routes = {
+            ('GET', '/quote'): self.get_quote,
+            ('GET', '/chain'): self.get_chain,
+            ('GET', '/metrics'): self.get_metrics,
+            ('POST', '/refresh'): self.post_refresh,
+            ('POST', '/underlying'): self.post_underlying,
+            ('POST', '/isu'): self.post_isu,
+        }
+
+    @staticmethod
+    def _split(params: dict, *names):
+        """ 요청 인자를 (names 값, 나머지 = 입력값 override) 로 나눔"""
+        params = {key: values[-1] for key, values in params.items()}
+        try:
+            values = [params.pop(name) for name in names]
+        except KeyError as e:
+            raise ValueError(f"missing parameter : {e.args[0]}") from None
+        return values, params
+
+    async def get_quote(self, params):
+        (isu_cds,), overrides = self._split(params, 'isu_cd')
+        isu_cds = isu_cds.split(',')
+        theo_prc = await self.batcher.quote(isu_cds, **overrides)
+        return {'dd': self.service.dd, 'quotes': [{'ISU_CD': isu_cd, 'THEO_PRC': _jsonValue(prc)} for isu_cd, prc in zip(isu_cds, theo_prc)]}
+
+    async def get_chain(self, params):
+        (prod_id, exp_dd), overrides = self._split(params, 'prod_id', 'exp_dd')
+        return {'dd': self.service.dd, 'quotes': self.service.chain(prod_id, exp_dd, **overrides)}
+
+    async def get_metrics(self, params):
+        return self.service.metrics()
+
+    async def post_refresh(self, params):
+        dd = params.get('dd', [None])[-1]
+        repriced = await asyncio.get_running_loop().run_in_executor(None, self.service.refresh, dd)
+        return {'dd': self.service.dd, 'repriced': repriced}
+
+    async def post_underlying(self, params):
+        (forprc_uly_id,), values = self._split(params, 'forprc_uly_id')
+        update = functools.partial(self.service.update_underlying, forprc_uly_id, **values)
+        return {'dd': self.service.dd, 'repriced': await asyncio.get_running_loop().run_in_executor(None, update)}
+
+    async def post_isu(self, params):
+        (isu_cd,), values = self._split(params, 'isu_cd')
+        update = functools.partial(self.service.update_isu, isu_cd, **values)
+        return {'dd': self.service.dd, 'repriced': await asyncio.get_running_loop().run_in_executor(None, update)}
+
+    async def handle(self, reader, writer):
+        """ 커넥션 하나의 요청 처리 (클라이언트가 닫거나 Connection: close 일 때까지)"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                strt = time.perf_counter()
+                method, target, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                url = urlsplit(target)
+                params = parse_qs(url.query)
+                if body and headers.get('content-type', '').startswith('application/x-www-form-urlencoded'):
+                    params.update(parse_qs(body.decode()))
+                route = self.routes.get((method, url.path))
+                if route is None:
+                    status, result = 404, {'error': f"no route : {method} {url.path}"}
+                else:
+                    try:
+                        status, result = 200, await route(params)
+                    except KeyError as e:
+                        status, result = 404, {'error': str(e.args[0])}
+                    except ValueError as e:
+                        status, result = 400, {'error': str(e)}
+
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                payload = json.dumps(result, ensure_ascii=False, default=_jsonValue).encode()
+                writer.write((f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                              f"Content-Type: application/json; charset=utf-8\r\nContent-Length: {len(payload)}\r\n"
+                              f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode() + payload)
+                await writer.drain()
+                self.service.stats.record(f"http {url.path}", time.perf_counter() - strt)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _refreshLoop(service: TheoPriceService, interval: float):
+    """ interval 초마다 기초정보 갱신 (DB 조회는 별도 쓰레드에서 실행)"""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        await loop.run_in_executor(None, service.refresh)
+
+
+async def serve(service: TheoPriceService, host: str = HOST, port: int = PORT, refresh_interval: float = REFRESH_INTERVAL,
+                window: float = BATCH_WINDOW, max_batch: int = MAX_BATCH):
+    """ HTTP 서버 실행 (취소될 때까지)
+    """
+    front = HttpFrontEnd(service, QuoteBatcher(service, window, max_batch))
+    server = await asyncio.start_server(front.handle, host, port)
+    refresh = asyncio.create_task(_refreshLoop(service, refresh_interval)) if refresh_interval > 0 else None
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if refresh is not None:
+            refresh.cancel()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="상주 이론가 산출 서비스 (HTTP)")
+    parser.add_argument("--dd", default=None, help="기준일자 YYYYMMDD (기본 : 오늘)")
+    parser.add_argument("--env", default=env, choices=list(orcl.ENV_INFO), help="오라클 환경명")
+    parser.add_argument("--use-tp-cd", default=calcTheoPrice_db.THEO_PRC_USE_TP_CD, choices=['01', '02'])
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--refresh-interval", type=float, default=REFRESH_INTERVAL, help="기초정보 자동 갱신 주기 (초, 0 이면 갱신 안함)")
+    parser.add_argument("--batch-window", type=float, default=BATCH_WINDOW, help="요청을 모으는 시간 (초)")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    cache = snapshotCache.SnapshotCache(args.env) if calcTheoPrice_db.USE_SNAPSHOT_CACHE else None
+    with TheoPriceService(orcl.RDB_pool(args.env), args.dd, cache, args.use_tp_cd) as service:
+        print(f"theoPriceService {service.dd} : {len(service.ref.theo_prc)} ISU, http://{args.host}:{args.port}")
+        try:
+            asyncio.run(serve(service, args.host, args.port, args.refresh_interval, args.batch_window, args.max_batch))
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    main()
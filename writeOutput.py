@@ -0,0 +1,158 @@
+"""산출결과를 파일로 저장
+  * 결과를 한 번에 모아 to_excel 하지 않고, 일자별 결과가 나올 때마다 sink.write(frame) 으로 이어서 씀
+  * 파일 형식별 sink : Parquet(ParquetSink), CSV(CsvSink), 엑셀(XlsxSink, openpyxl write-only 모드)
+  * make_sink(path) 는 확장자로 sink 를 고름
+  * Parquet 는 컬럼 타입이 파일 전체에서 같아야 하므로 dtypes 로 컬럼별 타입을 미리 정할 수 있음
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet
+except ImportError:         # Parquet 로 저장하지 않는 경우에는 필요없음
+    pa = None
+
+XLSX_MAX_ROWS = 1048575     # 엑셀 시트 최대 행 수 (헤더 제외)
+
+
+class OutputSink:
+    """ 출력 sink 의 공통 인터페이스. with 문으로 쓰면 끝날 때 close 됨
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = 0
+
+    def write(self, frame: pd.DataFrame):
+        """ frame 을 파일 뒤에 이어서 씀
+        """
+        if len(frame.columns):
+            self._write(frame)
+            self.rows += len(frame)
+
+    def _write(self, frame: pd.DataFrame):
+        raise NotImplementedError
+
+    def close(self):
+        """ 파일 닫기
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ParquetSink(OutputSink):
+    """ Parquet 파일. write 한 번이 row group 하나가 됨 (pyarrow 필요)
+    * dtypes : 컬럼별 pandas dtype ({컬럼명: 'float64', ...}). 지정한 컬럼은 첫 chunk 의 값과 상관없이 이 타입으로 쓰고,
+      나머지 컬럼은 첫 chunk 에서 타입을 정함. 모든 chunk 는 같은 schema 로 변환하여 씀
+    """
+
+    def __init__(self, path: str, compression: str = "zstd", dtypes: dict = None):
+        if pa is None:
+            raise ImportError("ParquetSink requires pyarrow")
+        super().__init__(path)
+        self.compression = compression
+        self.dtypes = dict(dtypes or {})
+        self.schema = None
+        self.writer = None
+
+    def _write(self, frame: pd.DataFrame):
+        if self.writer is None:
+            # dtypes 로 바꾼 첫 chunk 로 schema 를 정함 (pandas metadata 도 dtypes 를 따르므로 읽을 때 같은 타입이 됨)
+            schema = pa.Schema.from_pandas(frame.astype({col: dtype for col, dtype in self.dtypes.items() if col in frame.columns}),
+                                           preserve_index=False)
+            # 첫 chunk 에서 값이 모두 없는 컬럼은 타입을 알 수 없으므로 (dtypes 에 없으면) 문자열로 둠
+            # category 는 chunk 마다 범주가 다를 수 있으므로 값 타입으로 씀 (Parquet 가 다시 dictionary encoding 함)
+            for i, field in enumerate(schema):
+                if pa.types.is_null(field.type):
+                    schema = schema.set(i, field.with_type(pa.string()))
+                elif pa.types.is_dictionary(field.type):
+                    schema = schema.set(i, field.with_type(field.type.value_type))
+            self.schema = schema
+            self.writer = pa.parquet.ParquetWriter(self.path, self.schema, compression=self.compression)
+        self.writer.write_table(pa.Table.from_pandas(frame[self.schema.names], schema=self.schema, preserve_index=False))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+class CsvSink(OutputSink):
+    """ CSV 파일. 헤더는 처음 한 번만 씀 (엑셀에서 한글이 깨지지 않도록 기본 인코딩은 utf-8-sig)
+    """
+
+    def __init__(self, path: str, encoding: str = "utf-8-sig"):
+        super().__init__(path)
+        self.encoding = encoding
+        self.file = None
+        self.columns = None
+
+    def _write(self, frame: pd.DataFrame):
+        if self.file is None:
+            self.file = open(self.path, "w", encoding=self.encoding, newline="")
+            self.columns = list(frame.columns)
+            frame.to_csv(self.file, index=False)
+        else:
+            frame[self.columns].to_csv(self.file, index=False, header=False)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class XlsxSink(OutputSink):
+    """ 엑셀 파일. openpyxl write-only 모드로 행을 바로 써서, 전체 시트를 메모리에 만들지 않음
+    * 시트 최대 행 수(XLSX_MAX_ROWS)를 넘으면 ValueError (잘린 파일은 저장하지 않음)
+    """
+
+    def __init__(self, path: str, sheet_name: str = "Sheet1"):
+        import openpyxl
+        super().__init__(path)
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(sheet_name)
+        self.columns = None
+
+    def _write(self, frame: pd.DataFrame):
+        if self.rows + len(frame) > XLSX_MAX_ROWS:
+            self.sheet.close()
+            self.workbook = None
+            raise ValueError(f"{self.path} : {self.rows + len(frame):,} rows exceed the xlsx sheet limit ({XLSX_MAX_ROWS:,}), use parquet or csv")
+        if self.columns is None:
+            self.columns = list(frame.columns)
+            self.sheet.append([str(col) for col in self.columns])
+        values = frame[self.columns].astype(object)
+        values = values.where(values.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            self.sheet.append([value.item() if isinstance(value, np.generic) else value for value in row])
+
+    def close(self):
+        if self.workbook is not None:
+            self.workbook.save(self.path)
+            self.workbook = None
+
+
+SINKS = {
+    ".parquet": ParquetSink,
+    ".csv": CsvSink,
+    ".xlsx": XlsxSink,
+}
+
+
+def make_sink(path: str, dtypes: dict = None, **kwargs):
+    """ 확장자(.parquet, .csv, .xlsx)에 맞는 sink 생성
+    * dtypes(컬럼별 타입)는 Parquet 에만 쓰고 CSV, 엑셀에서는 무시
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in SINKS:
+        raise ValueError(f"Unsupported output format : {path}")
+    if ext == ".parquet" and dtypes is not None:
+        kwargs['dtypes'] = dtypes
+    return SINKS[ext](path, **kwargs)
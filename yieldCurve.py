@@ -0,0 +1,114 @@
+"""수익률곡선(TBCS_YD_PD_STRUCT)
+  * (DD, CURR_ISO_CD, BENCHMK_NM) 별로 곡선(YieldCurve)을 한 번만 만들어 LRU 캐시(CurveCache)에 보관
+  * 만기(일수) 배열에 대한 금리를 한 번에 산출 (선형보간, 구간 밖은 선형외삽)
+  * 통화선물(별표12) 결제월 전체의 스왑포인트 내재 원화금리를 한 번에 산출
+"""
+
+import threading
+from collections import OrderedDict
+import numpy as np
+import calcTheoPrice
+
+CURVE_CACHE_SIZE = 256      # 캐시에 보관하는 곡선 수
+CURVE_KEY_COLS = ['DD', 'CURR_ISO_CD', 'BENCHMK_NM']
+
+
+class YieldCurve:
+
+    def __init__(self, tenor_days, rates):
+        """만기(일수)별 금리로 곡선 생성
+        """
+        tenor_days = np.asarray(tenor_days, dtype=np.float64)
+        order = np.argsort(tenor_days, kind='stable')
+        self.tenor_days = tenor_days[order]
+        self.rates = np.asarray(rates, dtype=np.float64)[order]
+        self.tenor_days.flags.writeable = False
+        self.rates.flags.writeable = False
+
+    def rate(self, tenor_days):
+        """만기(일수, 스칼라 또는 배열)의 금리
+        """
+        return calcTheoPrice.interpLinear(self.tenor_days, self.rates, tenor_days)
+
+
+class CurveCache:
+
+    def __init__(self, fetch, maxsize: int = CURVE_CACHE_SIZE):
+        """fetch(dd, curr_iso_cd, benchmk_nm) -> (만기일수 배열, 금리 배열) 로 곡선을 만들어 최근 maxsize 개를 보관하는 캐시
+        """
+        self.fetch = fetch
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._curves = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, yd_pd_struct, maxsize: int = CURVE_CACHE_SIZE, scale: float = 0.01):
+        """TBCS_YD_PD_STRUCT 조회결과(DD, CURR_ISO_CD, BENCHMK_NM, YD_PD_STRUCT_BAS_DYS, EXP_YD)로 캐시 생성
+        * scale : EXP_YD 단위 변환 (기본은 % -> 소수)
+        """
+        groups = yd_pd_struct.groupby(CURVE_KEY_COLS, sort=False).indices
+        tenor_days = yd_pd_struct['YD_PD_STRUCT_BAS_DYS'].to_numpy(dtype=np.float64)
+        rates = yd_pd_struct['EXP_YD'].to_numpy(dtype=np.float64) * scale
+
+        def fetch(dd, curr_iso_cd, benchmk_nm):
+            idx = groups.get((dd, curr_iso_cd, benchmk_nm))
+            if idx is None:
+                raise KeyError(f"No yield curve : {dd}, {curr_iso_cd}, {benchmk_nm}")
+            return tenor_days[idx], rates[idx]
+
+        return cls(fetch, maxsize)
+
+    def curve(self, dd, curr_iso_cd, benchmk_nm):
+        """(DD, CURR_ISO_CD, BENCHMK_NM) 의 곡선. 캐시에 없으면 만들어 보관하고, maxsize 를 넘으면 가장 오래 쓰지 않은 곡선을 버림
+        """
+        key = (dd, curr_iso_cd, benchmk_nm)
+        with self._lock:
+            curve = self._curves.get(key)
+            if curve is not None:
+                self._curves.move_to_end(key)
+                self.hits += 1
+                return curve
+        curve = YieldCurve(*self.fetch(*key))
+        with self._lock:
+            self.misses += 1
+            self._curves[key] = curve
+            self._curves.move_to_end(key)
+            while len(self._curves) > self.maxsize:
+                self._curves.popitem(last=False)
+        return curve
+
+    def rate(self, dd, curr_iso_cd, benchmk_nm, tenor_days):
+        """행별 (DD, CURR_ISO_CD, BENCHMK_NM, 만기일수)의 금리 (스칼라는 전 행에 같은 값 사용)
+        * 같은 곡선을 쓰는 행은 묶어서 한 번에 산출
+        """
+        tenor_days = np.atleast_1d(np.asarray(tenor_days, dtype=np.float64))
+        n = len(tenor_days)
+        keys = [np.broadcast_to(np.asarray(v, dtype=object), (n,)) for v in (dd, curr_iso_cd, benchmk_nm)]
+        codes, uniques = calcTheoPrice._factorizeRows(*keys)
+        result = np.empty(n)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques[0]) + 1))
+        for code, key in enumerate(zip(*uniques)):
+            idx = order[bounds[code]:bounds[code + 1]]
+            result[idx] = self.curve(*key).rate(tenor_days[idx])
+        return result
+
+    def clear(self):
+        """캐시 비우기
+        """
+        with self._lock:
+            self._curves.clear()
+
+
+def impliedKRWint_batch(curves: CurveCache, dd, swap_point, uly_prc, remain_dys, forn_curr_iso_cd, forn_benchmk_nm):
+    """통화선물 결제월 전체의 스왑포인트 내재 원화금리
+    * 해외금리는 해외통화 곡선에서 잔존일수에 해당하는 금리를 사용
+
+        Return:
+            원화금리 배열
+    """
+    remain_dys = calcTheoPrice._asFloatArray(remain_dys)
+    rf = curves.rate(dd, forn_curr_iso_cd, forn_benchmk_nm, remain_dys)
+    return calcTheoPrice.calcKRWintBySwapPoint_batch(swap_point, uly_prc, remain_dys, rf)